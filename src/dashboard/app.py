@@ -1,35 +1,67 @@
+# First import, so startup timings include every other import of the app
+from src.dashboard.utils.instrumentation import (
+    mark_startup,
+    profile_rerun,
+    span,
+    start_metrics_server,
+)
 import streamlit as st
 from streamlit_autorefresh import st_autorefresh
 import time
-import pickle
+import logging
 
-from src.dashboard.components.sidebar import render_sidebar
+from src.dashboard.components.sidebar import render_sidebar, render_connection_status
+from src.dashboard.components.diagnostics import render_diagnostics_panel
+import pandas as pd
 from src.dashboard.utils.database import (
-    load_latest_data,
-    load_historical_data,
+    load_fleet_latest,
+    get_bucket_seconds,
     get_data_freshness,
 )
+from src.dashboard.utils.loader import start_dashboard_load
+from src.dashboard.utils.refresh import RefreshScheduler
+from src.dashboard.utils.db_schema import run_startup_check
+from src.dashboard.utils.change_feed import (
+    buffered_fleet_latest,
+    buffered_results,
+    get_buffer,
+    get_change_feed,
+    start_change_feed,
+)
 from src.dashboard.utils.helpers import get_machine_status
 from src.dashboard.config.settings import (
     DB_URI,
     DEFAULT_TIME_RANGE,
+    DEFAULT_MACHINE,
+    MACHINES,
+    METRICS_PORT,
+    PROFILE_DIR,
+    CHANGE_FEED_MODE,
+    CHANGE_FEED_UI_CHECK_SECONDS,
+    DIAGNOSTICS_QUERY_PARAM,
 )
 from src.dashboard.utils.predicting import inference
+from src.dashboard.utils.model_registry import get_model, warm_up_models
 from src.dashboard.tabs.overview import overview_tab
 from src.dashboard.tabs.temperature import temperature_tab
 from src.dashboard.tabs.production import production_tab
-from src.dashboard.tabs.leakage import leakage_tab
+from src.dashboard.tabs.leakage import leak_episodes_panel, leakage_tab
+from src.dashboard.tabs.fleet import fleet_tab
+from src.dashboard.tabs.drift import drift_tab
+from src.dashboard.tabs.reports import reports_tab
+from src.dashboard.utils.drift import get_drift_monitor
+from src.dashboard.utils.rolling import get_rolling_stats
+
+logger = logging.getLogger(__name__)
 
 
 def load_model():
-    """Load model with caching"""
-    if "model" not in st.session_state:
-        try:
-            with open("src/models/v1/ilapak3/lgbm-model-ilapak3-v1.0.0.pkl", "rb") as f:
-                st.session_state.model = pickle.load(f)
-        except Exception as e:
-            st.error(f"❌ Error loading model: {str(e)}")
-            st.stop()
+    """Attach the selected machine's model, loaded once per process"""
+    try:
+        st.session_state.model = get_model(st.session_state.machine_id)
+    except Exception as e:
+        st.error(f"❌ Error loading model: {str(e)}")
+        st.stop()
 
 
 def initialize_session_state():
@@ -38,10 +70,14 @@ def initialize_session_state():
         "last_update": time.time(),
         "auto_refresh_enabled": True,
         "time_range": DEFAULT_TIME_RANGE,
+        "machine_id": DEFAULT_MACHINE,
         "data_refresh_count": 0,
         "last_data_hash": None,
     }
 
+    if "refresh_scheduler" not in st.session_state:
+        st.session_state.refresh_scheduler = RefreshScheduler()
+
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
@@ -63,8 +99,22 @@ def check_data_changes(latest_df):
     return False
 
 
+def update_stream_monitors(machine_id, time_range, historical_df, latest_df):
+    """Feed new rows into the shared drift monitor and rolling statistics"""
+    # Only rows newer than the last observed one are added. Sampled long ranges
+    # would give wrong diffs and windows, so only unsampled history seeds them.
+    seed = get_bucket_seconds(time_range) is None
+    monitors = [get_drift_monitor(machine_id), get_rolling_stats(machine_id)]
+    for monitor in monitors:
+        if monitor is None:
+            continue
+        if seed and monitor.last_time is None:
+            monitor.observe(historical_df)
+        monitor.observe(latest_df)
+
+
 def render_data_freshness_indicator(latest_df):
-    """Show data freshness status"""
+    """Show data freshness status, refreshing is left to the scheduler"""
     freshness = get_data_freshness(latest_df)
 
     if freshness["is_fresh"]:
@@ -77,7 +127,8 @@ def render_data_freshness_indicator(latest_df):
             st.warning(f"🟡 Data Delay: {delay_min:.1f} minutes")
         else:
             st.error(f"🔴 Data Stale: {delay_min:.1f} minutes behind")
-            st.rerun()
+
+    return freshness
 
 
 def render_metrics(latest_df):
@@ -136,7 +187,18 @@ def render_metrics(latest_df):
         )
 
     with col6:
-        if status == "Running":
+        # The change feed scores new rows on arrival, reuse that when it matches
+        feed_prediction = get_buffer().latest_prediction(st.session_state.machine_id)
+        if feed_prediction and feed_prediction["times"] != latest_df["times"].iloc[0]:
+            feed_prediction = None
+
+        if status == "Running" and feed_prediction:
+            st.metric(
+                "Leakage Prediction",
+                feed_prediction["prediction"],
+                f"Confidence: {feed_prediction['probability'] * 100:.1f}%",
+            )
+        elif status == "Running":
             try:
                 pred, probs = inference(latest_df, st.session_state.model)
                 max_prob = probs.max() * 100 if len(probs) > 0 else 0
@@ -151,10 +213,39 @@ def render_metrics(latest_df):
             st.metric("Leakage Prediction", "-", "Hanya tersedia saat mesin Running")
 
 
+@st.fragment(run_every=CHANGE_FEED_UI_CHECK_SECONDS)
+def watch_change_feed(machine_id):
+    """Rerun the page as soon as the change feed buffers a new row"""
+    version = get_buffer().version(machine_id)
+    seen = st.session_state.get("feed_version")
+    st.session_state.feed_version = version
+    if seen is not None and seen != version:
+        st.rerun(scope="app")
+
+
 def main():
+    mark_startup("imports")
+    start_metrics_server(METRICS_PORT)
+    # Unpickling pulls in sklearn and LightGBM, so it starts before the first
+    # rerun needs the model
+    warm_up_models(list(MACHINES))
+    run_startup_check(DB_URI)
+
+    try:
+        start_change_feed(CHANGE_FEED_MODE, DB_URI, list(MACHINES))
+    except Exception as e:
+        # Fall back to polling, the feed is retried on the next rerun
+        logger.error(f"Change feed unavailable: {str(e)}")
+
+    with profile_rerun(PROFILE_DIR), span("rerun"):
+        render_dashboard()
+    mark_startup("first_rerun")
+
+
+def render_dashboard():
     # Page configuration
     st.set_page_config(
-        page_title="PdM Dashboard - Ilapak 3",
+        page_title="PdM Dashboard",
         layout="wide",
         initial_sidebar_state="collapsed",
     )
@@ -203,33 +294,59 @@ def main():
 
     # Initialize
     initialize_session_state()
-    load_model()
 
     # Sidebar
     with st.sidebar:
         time_range = render_sidebar()
 
+    machine = MACHINES[st.session_state.machine_id]
+
     # Main header
     st.markdown(
-        '<h1 class="main-header">🏭 Predictive Maintenance Dashboard - Ilapak 3</h1>',
+        f'<h1 class="main-header">🏭 Predictive Maintenance Dashboard - {machine["name"]}</h1>',
         unsafe_allow_html=True,
     )
+    mark_startup("first_paint")
 
-    # Auto-refresh logic dengan interval tetap 1 menit
-    count = st_autorefresh(
-        interval=60 * 1000, key="dashboard_refresh"  # 1 menit dalam milidetik
-    )
+    # Usually already loaded by the warm-up thread
+    load_model()
+
+    # Auto-refresh interval is decided by the scheduler (live/backoff/push)
+    scheduler = st.session_state.refresh_scheduler
+    count = st_autorefresh(interval=scheduler.interval_ms(), key="dashboard_refresh")
     if count > 0:
         st.session_state.last_update = time.time()
 
+    # With the change feed on, the latest rows are already in memory
+    latest_df = pd.DataFrame()
+    preloaded = {}
+    if get_change_feed() is not None:
+        watch_change_feed(st.session_state.machine_id)
+        latest_df = get_buffer().snapshot(st.session_state.machine_id, limit=20)
+        preloaded = buffered_results(st.session_state.machine_id, time_range)
+
+    # Latest, historical and health queries run concurrently
+    previous_load = st.session_state.get("dashboard_load")
+    if previous_load is not None:
+        previous_load.cancel()
+    load = start_dashboard_load(
+        DB_URI,
+        machine["table"],
+        time_range,
+        max_records=1000,
+        load_latest=latest_df.empty,
+        preloaded=preloaded,
+    )
+    st.session_state.dashboard_load = load
+
     # Load data with error handling
-    try:
-        with st.spinner("Loading data..."):
-            latest_df = load_latest_data(DB_URI, limit=20)
-            historical_df = load_historical_data(DB_URI, time_range, max_records=1000)
-    except Exception as e:
-        st.error(f"❌ Error loading data: {str(e)}")
-        st.stop()
+    if latest_df.empty:
+        try:
+            with st.spinner("Loading data..."):
+                latest_df = load.result("latest")
+        except Exception as e:
+            st.error(f"❌ Error loading data: {str(e)}")
+            st.stop()
 
     if latest_df.empty:
         st.error("❌ No data available. Check database connection.")
@@ -239,16 +356,46 @@ def main():
     data_changed = check_data_changes(latest_df)
 
     # Data freshness indicator
-    render_data_freshness_indicator(latest_df)
+    freshness = render_data_freshness_indicator(latest_df)
+    scheduler.observe(
+        freshness["last_update"],
+        freshness["is_fresh"],
+        tick_count=count,
+        push=get_change_feed() is not None,
+    )
 
     # Main metrics
     render_metrics(latest_df)
+    mark_startup("first_metrics")
 
-    # Tabs with real-time data
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["📊 Overview", "🌡️ Temperature", "📈 Production", "🚨 Leakage Detection"]
+    with st.sidebar:
+        render_connection_status(load)
+
+    # Status metrics are already on screen, charts fill in once history arrives
+    try:
+        with st.spinner("Loading history..."):
+            historical_df = load.result("historical")
+    except Exception as e:
+        st.error(f"❌ Error loading historical data: {str(e)}")
+        historical_df = pd.DataFrame()
+
+    update_stream_monitors(
+        st.session_state.machine_id, time_range, historical_df, latest_df
     )
 
+    # Tabs with real-time data
+    tab_names = [
+        "📊 Overview",
+        "🌡️ Temperature",
+        "📈 Production",
+        "🚨 Leakage Detection",
+        "🧭 Drift",
+        "📋 Reports",
+    ]
+    if len(MACHINES) > 1:
+        tab_names.append("🏭 Fleet")
+    tab1, tab2, tab3, tab4, tab5, tab6, *fleet = st.tabs(tab_names)
+
     # Pass data to tabs
     with tab1:
         overview_tab(historical_df, latest_df, time_range)
@@ -261,6 +408,26 @@ def main():
 
     with tab4:
         leakage_tab(historical_df, latest_df, time_range)
+        leak_episodes_panel(DB_URI, st.session_state.machine_id)
+
+    with tab5:
+        drift_tab(st.session_state.machine_id)
+
+    with tab6:
+        reports_tab(DB_URI, st.session_state.machine_id)
+
+    if fleet:
+        with fleet[0]:
+            fleet_df = pd.DataFrame()
+            if get_change_feed() is not None:
+                fleet_df = buffered_fleet_latest(list(MACHINES))
+            if fleet_df.empty:
+                fleet_df = load_fleet_latest(DB_URI, list(MACHINES))
+            fleet_tab(fleet_df)
+
+    # Hidden timing panel, opened with ?diagnostics=1
+    if st.query_params.get(DIAGNOSTICS_QUERY_PARAM):
+        render_diagnostics_panel({"historical": historical_df, "latest": latest_df})
 
     # Footer info
     # Fixed minimal elegant footer
@@ -1,7 +1,7 @@
-from plotly.subplots import make_subplots
-import plotly.graph_objects as go
+from src.dashboard.utils.instrumentation import traced
 
 
+@traced()
 def create_realtime_chart(
     df,
     columns,
@@ -11,6 +11,9 @@ def create_realtime_chart(
     secondary_y_cols: list = None,
 ):
     """Create real-time line chart with optional dual Y-axis support"""
+    # Plotly is imported on first use so it does not delay the first paint
+    from plotly.subplots import make_subplots
+    import plotly.graph_objects as go
 
     if len(df) > max_points:
         df_sample = df.iloc[:: len(df) // max_points]
@@ -0,0 +1,81 @@
+import streamlit as st
+import pandas as pd
+from typing import Dict, Optional
+from src.dashboard.config.settings import MACHINES
+from src.dashboard.utils.compact import estimate_window_mb, memory_report
+from src.dashboard.utils.cache import get_cache
+from src.dashboard.utils.gate import get_gate_stats
+from src.dashboard.utils.instrumentation import get_registry, startup_report
+from src.dashboard.utils.shadow import get_shadow_scorer
+
+
+def render_memory_report(frames: Dict[str, pd.DataFrame]):
+    """Memory of this rerun's frames and the projected 30-day fleet window"""
+    st.caption("Memory: frames of this rerun")
+    st.dataframe(memory_report(frames).round(2), use_container_width=True)
+
+    sample = max(frames.values(), key=len)
+    estimate = estimate_window_mb(sample, days=30, machines=len(MACHINES))
+    st.caption(
+        f"An unsampled 30-day window of {len(MACHINES)} line(s) would take "
+        f"~{estimate:.0f} MB"
+    )
+
+
+def render_diagnostics_panel(frames: Optional[Dict[str, pd.DataFrame]] = None):
+    """Render span timings collected since the process started"""
+    registry = get_registry()
+
+    with st.expander("🩺 Diagnostics", expanded=True):
+        summary = registry.summary()
+        if not summary:
+            st.info("No spans recorded yet")
+            return
+
+        startup = startup_report()
+        if startup:
+            st.caption("Startup: seconds from process start to each phase")
+            st.dataframe(
+                pd.Series(startup, name="seconds").round(2).to_frame().T,
+                use_container_width=True,
+            )
+
+        stats_df = pd.DataFrame.from_dict(summary, orient="index")
+        stats_df.index.name = "span"
+        st.dataframe(
+            stats_df.sort_values("total_s", ascending=False).round(2),
+            use_container_width=True,
+        )
+
+        gate_stats = get_gate_stats()
+        if gate_stats:
+            st.caption("Fast path: rows answered without running the model")
+            st.dataframe(
+                pd.DataFrame.from_dict(gate_stats, orient="index").round(1),
+                use_container_width=True,
+            )
+
+        cache = get_cache()
+        footprint = cache.footprint()
+        st.caption(
+            f"Shared cache: {footprint['entries']} entries, "
+            f"{footprint['memory_mb']:.1f} / {footprint['budget_mb']:.0f} MB"
+        )
+        st.dataframe(cache.stats().round(2), use_container_width=True)
+
+        scorer = get_shadow_scorer()
+        if scorer is not None:
+            st.caption(
+                f"Shadow models: scored off the render path, "
+                f"{scorer.queue.qsize()} batches queued, {scorer.dropped} dropped"
+            )
+            st.dataframe(scorer.summary().round(1), use_container_width=True)
+
+        if frames:
+            render_memory_report(frames)
+
+        st.code(registry.render_prometheus(), language="text")
+
+        if st.button("Reset metrics"):
+            registry.reset()
+            st.rerun()
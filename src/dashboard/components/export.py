@@ -0,0 +1,127 @@
+import streamlit as st
+import glob
+import gzip
+import logging
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from src.dashboard.config.settings import (
+    DB_URI,
+    EXPORT_CHUNK_SIZE,
+    EXPORT_MAX_DAYS,
+    EXPORT_STALE_MINUTES,
+)
+from src.dashboard.utils.archive import write_parquet_chunks
+from src.dashboard.utils.database import get_engine, iter_time_range_chunks
+
+logger = logging.getLogger(__name__)
+
+EXPORT_PREFIX = "pdm-export-"
+
+EXPORT_FORMATS = {
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/octet-stream"),
+}
+
+
+def write_export(chunks, path: str, file_format: str) -> int:
+    """Write streamed chunks to ``path`` one at a time, returns the row count"""
+    rows = 0
+
+    if file_format == "parquet":
+        rows = write_parquet_chunks(chunks, path)
+    else:
+        with gzip.open(path, "wt", newline="") as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=i == 0)
+                rows += len(chunk)
+
+    return rows
+
+
+_sweep_done = False
+_sweep_lock = threading.Lock()
+
+
+def sweep_stale_exports(max_age_minutes: float = EXPORT_STALE_MINUTES) -> int:
+    """
+    Remove spool files of exports that never finished, once per process
+
+    Only files older than ``max_age_minutes`` go, another worker process may
+    still be writing a newer one. Returns the number of files removed.
+    """
+    global _sweep_done
+
+    with _sweep_lock:
+        if _sweep_done:
+            return 0
+        _sweep_done = True
+
+    removed = 0
+    cutoff = time.time() - max_age_minutes * 60
+    for path in glob.glob(os.path.join(tempfile.gettempdir(), f"{EXPORT_PREFIX}*")):
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError as e:
+            logger.warning(f"Could not remove stale export {path}: {str(e)}")
+    if removed:
+        logger.info(f"Removed {removed} stale export files")
+    return removed
+
+
+def render_export_panel(machine_id: str, table: str):
+    """Export raw datalog rows for a date range without loading them at once"""
+    sweep_stale_exports()
+    with st.expander("📥 Export Raw Data"):
+        today = date.today()
+        selected = st.date_input(
+            "Date range",
+            value=(today - timedelta(days=7), today),
+            max_value=today,
+        )
+        if len(selected) != 2:
+            return
+        start_day, end_day = selected
+
+        format_label = st.selectbox("Format", list(EXPORT_FORMATS))
+        extension, mime = EXPORT_FORMATS[format_label]
+
+        if (end_day - start_day).days + 1 > EXPORT_MAX_DAYS:
+            st.warning(f"🟡 Exports are limited to {EXPORT_MAX_DAYS} days")
+            return
+
+        if not st.button("Prepare Export"):
+            return
+
+        start = datetime.combine(start_day, datetime.min.time())
+        end = datetime.combine(end_day + timedelta(days=1), datetime.min.time())
+
+        # Spool to disk chunk by chunk instead of building one big frame
+        fd, path = tempfile.mkstemp(prefix=EXPORT_PREFIX, suffix=f".{extension}")
+        os.close(fd)
+        try:
+            with st.spinner("Exporting..."):
+                chunks = iter_time_range_chunks(
+                    get_engine(DB_URI), table, start, end, EXPORT_CHUNK_SIZE
+                )
+                rows = write_export(chunks, path, extension.split(".")[0])
+
+            st.caption(f"{rows:,} rows, {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+            # The button keeps its own copy of the file for this run only, so
+            # the spool file is removed right away and later reruns read nothing
+            with open(path, "rb") as f:
+                st.download_button(
+                    "⬇️ Download",
+                    data=f,
+                    file_name=f"{machine_id}-{start_day:%Y%m%d}-{end_day:%Y%m%d}.{extension}",
+                    mime=mime,
+                    on_click="ignore",
+                )
+        except Exception as e:
+            st.error(f"❌ Export failed: {str(e)}")
+        finally:
+            os.remove(path)
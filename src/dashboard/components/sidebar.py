@@ -1,12 +1,13 @@
 import streamlit as st
 from datetime import datetime
 import time
-from src.dashboard.utils.database import load_latest_data
-from src.dashboard.config.settings import DB_URI
+from src.dashboard.config.settings import MACHINES
+from src.dashboard.components.export import render_export_panel
+from src.dashboard.utils.loader import DashboardLoad
 
 
 def render_sidebar():
-    """Render the sidebar with controls and status information"""
+    """Render the sidebar controls"""
     st.header("⚙️ Dashboard Controls")
 
     # Manual refresh button
@@ -14,6 +15,17 @@ def render_sidebar():
         st.session_state.last_update = time.time()
         st.rerun()
 
+    # Machine selector
+    if len(MACHINES) > 1:
+        st.subheader("🏭 Machine")
+        machine_ids = list(MACHINES)
+        st.session_state.machine_id = st.selectbox(
+            "Select Machine",
+            machine_ids,
+            index=machine_ids.index(st.session_state.machine_id),
+            format_func=lambda machine_id: MACHINES[machine_id]["name"],
+        )
+
     # Time range selector for historical data
     st.subheader("📅 Time Range")
     time_range = st.selectbox(
@@ -32,21 +44,28 @@ def render_sidebar():
     if time_range in ["Last 7 Days", "Last 30 Days"]:
         st.info("📊 Data is sampled for better performance on longer time ranges")
 
-    # Status info
+    render_export_panel(
+        st.session_state.machine_id, MACHINES[st.session_state.machine_id]["table"]
+    )
+
+    return time_range
+
+
+def render_connection_status(load: DashboardLoad):
+    """Render status information from the concurrent health probe"""
     st.subheader("ℹ️ Status")
     st.write(
         f"**Last Updated:** {datetime.fromtimestamp(st.session_state.last_update).strftime('%H:%M:%S')}"
     )
+    st.write(f"**Refresh:** {st.session_state.refresh_scheduler.describe()}")
 
     # Connection status
     try:
-        test_df = load_latest_data(DB_URI)
-        if not test_df.empty:
+        latest_time = load.result("health")
+        if latest_time is not None:
             st.success("🟢 Database Connected")
-            st.write(f"**Latest Data:** {test_df.index[0].strftime('%H:%M:%S')}")
+            st.write(f"**Latest Data:** {latest_time.strftime('%H:%M:%S')}")
         else:
             st.warning("🟡 No Recent Data")
     except:
         st.error("🔴 Database Connection Failed")
-
-    return time_range
@@ -4,8 +4,9 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-# Database configuration
-DB_URI = "mysql+pymysql://{}:{}@{}/{}".format(
+# Database configuration, PDM_DB_URI points the dashboard at another database
+# (e.g. the replay database of a load test)
+DB_URI = os.getenv("PDM_DB_URI") or "mysql+pymysql://{}:{}@{}/{}".format(
     os.getenv("DB_USER"),
     os.getenv("DB_PASSWORD"),
     os.getenv("DB_HOST"),
@@ -15,6 +16,14 @@ DB_URI = "mysql+pymysql://{}:{}@{}/{}".format(
 # Dashboard configuration
 DEFAULT_TIME_RANGE = "Last 24 Hours"
 
+# Refresh scheduling, in seconds
+DATALOG_INTERVAL_SECONDS = 60  # PLC logger writes one row per minute
+DEFAULT_REFRESH_INTERVAL = 60
+MIN_REFRESH_INTERVAL = 10
+REFRESH_MAX_INTERVAL = 15 * 60
+REFRESH_JITTER = 0.1
+PUSH_REFRESH_INTERVAL = 5 * 60
+
 # Temperature thresholds
 TEMP_WARNING_THRESHOLD = 150
 TEMP_DANGER_THRESHOLD = 250
@@ -23,3 +32,148 @@ TEMP_DANGER_THRESHOLD = 250
 PERFORMANCE_WARNING_THRESHOLD = 70
 QUALITY_WARNING_THRESHOLD = 95
 OEE_WARNING_THRESHOLD = 70
+
+# Machine registry
+# Comma separated machine ids, e.g. PDM_MACHINES="ilapak3,ilapak4,ilapak5"
+MACHINE_IDS = [
+    machine_id.strip()
+    for machine_id in os.getenv("PDM_MACHINES", "ilapak3").split(",")
+    if machine_id.strip()
+]
+DEFAULT_MACHINE = MACHINE_IDS[0]
+
+# Lines without their own trained model reuse the Ilapak 3 model
+MODEL_PATH_TEMPLATE = "src/models/{major}/{model}/lgbm-model-{model}-{version}.pkl"
+# Feature distributions the model was trained on, used by the drift monitor
+BASELINE_PATH_TEMPLATE = "src/models/{major}/{model}/baseline-{model}-{version}.json"
+
+# Shadow models, scored next to a machine's model on the same features and only
+# logged. Comma separated "model:version" (resolved like the primary model) or
+# .pkl paths, e.g. PDM_SHADOW_MODELS="ilapak3:v1.1.0,src/models/rf-ilapak3.pkl".
+# PDM_SHADOWS_<MACHINE> replaces the list for one machine.
+SHADOW_MODELS = os.getenv("PDM_SHADOW_MODELS", "")
+SHADOW_QUEUE_SIZE = 32  # batches waiting for the shadow worker, newer ones drop
+
+MACHINES = {
+    machine_id: {
+        "name": machine_id.replace("ilapak", "Ilapak "),
+        "table": f"datalog_{machine_id}",
+        "model": os.getenv(f"PDM_MODEL_{machine_id.upper()}", "ilapak3"),
+        "model_version": "v1.0.0",
+        "temp_warning_threshold": TEMP_WARNING_THRESHOLD,
+        "temp_danger_threshold": TEMP_DANGER_THRESHOLD,
+        "shadows": [
+            shadow.strip()
+            for shadow in os.getenv(
+                f"PDM_SHADOWS_{machine_id.upper()}", SHADOW_MODELS
+            ).split(",")
+            if shadow.strip()
+        ],
+    }
+    for machine_id in MACHINE_IDS
+}
+
+# Concurrent data loading, timeouts in seconds
+LOADER_MAX_WORKERS = 8
+LATEST_QUERY_TIMEOUT = 10
+HISTORICAL_QUERY_TIMEOUT = 30
+HEALTH_QUERY_TIMEOUT = 5
+
+# Change feed: "off" polls MySQL every minute, "queue" tails the trigger-fed
+# queue table, "poll" polls each table once per process, "shared" reads the
+# shared memory plane of the ingest job, "local" only accepts rows published
+# in-process (tests, replay)
+CHANGE_FEED_MODE = os.getenv("PDM_CHANGE_FEED", "off")
+CHANGE_FEED_QUEUE_TABLE = "datalog_changes"
+CHANGE_FEED_POLL_SECONDS = 1.0
+CHANGE_FEED_BUFFER_ROWS = 120
+# How often each session checks the in-memory buffer for new rows
+CHANGE_FEED_UI_CHECK_SECONDS = 1
+
+# Shared data plane: with PDM_CHANGE_FEED=shared, dashboard workers attach to
+# shared memory written by ``python -m src.dashboard.jobs.ingest``
+SHARED_PLANE_PREFIX = os.getenv("PDM_SHARED_PLANE_PREFIX", "pdm")
+SHARED_PLANE_ROWS = 1600  # > one day of datalog rows per machine
+SHARED_PLANE_SECONDS = 24 * 60 * 60  # history the ingest process seeds
+
+# Raw data export
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_MAX_DAYS = 31
+# Spool files older than this (left by a crashed export) are removed at startup
+EXPORT_STALE_MINUTES = 60
+
+# Archive: months older than HOT_RETENTION_MONTHS move to monthly Parquet files
+ARCHIVE_DIR = os.getenv("PDM_ARCHIVE_DIR", "data/archive")
+HOT_RETENTION_MONTHS = 3
+
+# Drift monitor: sliding window of running rows compared to the training baseline
+DRIFT_WINDOW_ROWS = 1440  # one day of datalog rows
+DRIFT_MIN_ROWS = 60
+DRIFT_PSI_WARNING = 0.1
+DRIFT_PSI_ALERT = 0.25
+
+# Rolling temperature statistics, window name -> length in seconds. The shift
+# window also restarts whenever the Shift column changes.
+ROLLING_WINDOWS = {"5 min": 5 * 60, "1 h": 60 * 60, "Shift": 8 * 60 * 60}
+ROLLING_SHIFT_WINDOW = "Shift"
+# Alert when the 5 min mean leaves the 1 h mean by this many 1 h std deviations
+ROLLING_ALERT_SIGMA = 3.0
+
+# Fast path: rows in steady state reuse the last model result instead of
+# running the model. Set PDM_FAST_PATH=off to score every row.
+FAST_PATH_ENABLED = os.getenv("PDM_FAST_PATH", "on") == "on"
+FAST_PATH_SCORE_EVERY = 10  # safety net: always score every Nth row
+FAST_PATH_Z_THRESHOLD = 3.0
+FAST_PATH_MIN_ROWS = 30  # rolling rows needed before z-scores are trusted
+FAST_PATH_MIN_TEMP_STD = 0.5  # °C, floor for flat temperature windows
+FAST_PATH_MIN_REJECT_STD = 1.0  # packs per row
+
+# Process-wide cache shared by all sessions: one memory budget, evicted least
+# recently used first, and a TTL in seconds per namespace (None never expires)
+CACHE_MAX_MB = int(os.getenv("PDM_CACHE_MB", "256"))
+CACHE_TTLS = {
+    "preprocess": 30,
+    "single_prediction": 15,
+    "batch_prediction": 60,
+    "explanations": None,  # per scored row, a row is explained once
+    "figures": None,  # keyed by data content, stale keys age out of the LRU
+    "queries": None,  # keyed by data version, see QUERY_CACHE_ENABLED
+}
+
+# Datalog query results shared by all sessions until the table changes: every
+# read first probes MAX(times) of its tables and reuses the cached result of the
+# same SQL while that is unchanged
+QUERY_CACHE_ENABLED = os.getenv("PDM_QUERY_CACHE", "on") == "on"
+
+# Explanations: LightGBM pred_contrib (TreeSHAP) of the predicted class, computed
+# when Warning/Leak rows are scored and kept for the strongest features only
+EXPLAIN_TOP_K = 3
+
+# Shift reports: finished shifts are stored once in the shift_reports table.
+# A shift without rows for this long is closed even if no later shift started.
+REPORT_SHIFT_CLOSE_HOURS = 9
+REPORT_MONTHS = 12  # months offered in the Reports tab
+
+# Leak episodes: consecutive Warning/Leak predictions merged with hysteresis. An
+# episode opens at EPISODE_OPEN_PROBABILITY, holds while alarms stay above
+# EPISODE_HOLD_PROBABILITY, and closes after EPISODE_CLOSE_ROWS other rows or a
+# gap in the predictions longer than EPISODE_MAX_GAP_MINUTES.
+EPISODE_OPEN_PROBABILITY = 0.5
+EPISODE_HOLD_PROBABILITY = 0.3
+EPISODE_CLOSE_ROWS = 3
+EPISODE_MAX_GAP_MINUTES = 10
+EPISODE_FIRST_SCAN_DAYS = 31  # predictions segmented on the first run
+
+# Replay and load test: notebooks/data/test.csv streamed into a local database
+REPLAY_CSV = "notebooks/data/test.csv"
+REPLAY_DB_URI = os.getenv("PDM_REPLAY_URI", "sqlite:///data/replay.db")
+REPLAY_HISTORY_HOURS = 24  # written at once before streaming starts
+REPLAY_MAX_GAP_SECONDS = 60  # longest wall-clock wait between two rows
+
+# Diagnostics
+# Port for the Prometheus-style /metrics endpoint, 0 disables it
+METRICS_PORT = int(os.getenv("PDM_METRICS_PORT") or 0)
+# Directory for per-rerun cProfile dumps, profiling is off when unset
+PROFILE_DIR = os.getenv("PDM_PROFILE_DIR")
+# Open the dashboard with ?diagnostics=1 to show the timing panel
+DIAGNOSTICS_QUERY_PARAM = "diagnostics"
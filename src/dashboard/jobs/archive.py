@@ -0,0 +1,181 @@
+"""
+Move cold datalog months out of the hot table into monthly Parquet archives
+
+    python -m src.dashboard.jobs.archive --dry-run
+    python -m src.dashboard.jobs.archive --keep-months 3 --machines ilapak3
+
+Archived rows stay queryable: the dashboard loaders union the archive with the
+hot table for ranges that cross the boundary.
+"""
+
+import argparse
+import logging
+import os
+from typing import List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.dashboard.config.settings import (
+    DB_URI,
+    EXPORT_CHUNK_SIZE,
+    HOT_RETENTION_MONTHS,
+    MACHINES,
+)
+from src.dashboard.utils.archive import (
+    archive_path,
+    iter_archive_chunks,
+    month_start,
+    next_month,
+    write_parquet_chunks,
+)
+from src.dashboard.utils.database import (
+    check_table,
+    get_engine,
+    iter_time_range_chunks,
+)
+
+logger = logging.getLogger(__name__)
+
+DELETE_BATCH_ROWS = 5000
+
+
+def count_rows(engine, table: str, start, end) -> int:
+    query = text(
+        f"SELECT COUNT(*) FROM {check_table(table)} "
+        f"WHERE times >= :start AND times < :end"
+    )
+    with engine.connect() as conn:
+        return conn.execute(query, {"start": start, "end": end}).scalar() or 0
+
+
+def delete_rows(engine, table: str, start, end) -> int:
+    """Delete [start, end) from the hot table in small batches"""
+    where = f"FROM {check_table(table)} WHERE times >= :start AND times < :end"
+    params = {"start": start, "end": end}
+
+    if engine.dialect.name != "mysql":
+        with engine.begin() as conn:
+            return conn.execute(text(f"DELETE {where}"), params).rowcount
+
+    # Short transactions keep locks off the rows the logger is still writing
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            result = conn.execute(
+                text(f"DELETE {where} LIMIT {DELETE_BATCH_ROWS}"), params
+            )
+        deleted += result.rowcount
+        if result.rowcount < DELETE_BATCH_ROWS:
+            return deleted
+
+
+def cold_months(engine, table: str, keep_months: int) -> List[pd.Timestamp]:
+    """Months of ``table`` older than the retention window, oldest first"""
+    with engine.connect() as conn:
+        oldest = conn.execute(text(f"SELECT MIN(times) FROM {table}")).scalar()
+    if oldest is None:
+        return []
+
+    cutoff = month_start(pd.Timestamp.now()) - pd.DateOffset(months=keep_months)
+    return list(pd.date_range(month_start(oldest), cutoff, freq="MS", inclusive="left"))
+
+
+def archive_month(
+    engine, table: str, month: pd.Timestamp, dry_run: bool = False
+) -> int:
+    """Archive one month of ``table``, returns the number of rows moved"""
+    # Plain datetimes bind on every DBAPI driver, pandas Timestamps do not
+    start = month_start(month).to_pydatetime()
+    end = next_month(month).to_pydatetime()
+    hot_rows = count_rows(engine, table, start, end)
+    if hot_rows == 0 or dry_run:
+        return hot_rows
+
+    path = archive_path(table, start)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    # A month that is already archived (e.g. late rows) is rewritten merged
+    existing = list(iter_archive_chunks(table, start, end, EXPORT_CHUNK_SIZE))
+    archived_times = set()
+    for chunk in existing:
+        archived_times.update(chunk["times"])
+
+    hot_streamed = 0
+
+    def chunks():
+        nonlocal hot_streamed
+        yield from existing
+        for chunk in iter_time_range_chunks(
+            engine, table, start, end, EXPORT_CHUNK_SIZE, include_archive=False
+        ):
+            hot_streamed += len(chunk)
+            chunk = chunk[~chunk["times"].isin(archived_times)]
+            if not chunk.empty:
+                yield chunk
+
+    tmp_path = f"{path}.tmp"
+    try:
+        write_parquet_chunks(chunks(), tmp_path)
+        # Rows written while streaming would be deleted without being archived
+        if (
+            hot_streamed != hot_rows
+            or count_rows(engine, table, start, end) != hot_rows
+        ):
+            raise RuntimeError(
+                f"{table} {start:%Y-%m}: row count changed while archiving, "
+                "nothing was deleted"
+            )
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    delete_rows(engine, table, start, end)
+    return hot_rows
+
+
+def run_archive(
+    uri: str,
+    machine_ids: List[str],
+    keep_months: int = HOT_RETENTION_MONTHS,
+    dry_run: bool = False,
+):
+    engine = get_engine(uri)
+    for machine_id in machine_ids:
+        table = MACHINES[machine_id]["table"]
+        months = cold_months(engine, table, keep_months)
+        if not months:
+            print(f"{table}: nothing older than {keep_months} months")
+        for month in months:
+            rows = archive_month(engine, table, month, dry_run=dry_run)
+            if not rows:
+                continue
+            action = "would archive" if dry_run else "archived"
+            print(f"{table} {month:%Y-%m}: {action} {rows} rows")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--keep-months",
+        type=int,
+        default=HOT_RETENTION_MONTHS,
+        help="Whole months to keep in the hot table besides the current one",
+    )
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Only report")
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    machine_ids = [m.strip() for m in args.machines.split(",") if m.strip()]
+    run_archive(args.uri, machine_ids, args.keep_months, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
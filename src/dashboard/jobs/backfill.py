@@ -0,0 +1,200 @@
+"""
+Backfill the prediction store from datalog history
+
+Partitions history by (machine, day) and scores the partitions in a process
+pool. Each worker opens its own database pool and loads each model once.
+Finished partitions are recorded in a checkpoint file, so an interrupted run
+resumes where it stopped.
+
+    python -m src.dashboard.jobs.backfill --days 90
+    python -m src.dashboard.jobs.backfill --start 2025-04-01 --end 2025-07-01 \\
+        --machines ilapak3,ilapak4 --workers 8
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Set, Tuple
+
+from sqlalchemy import create_engine
+
+from src.dashboard.config.settings import DB_URI, MACHINES
+from src.dashboard.utils.database import read_time_range
+from src.dashboard.utils.episodes import update_episodes
+from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.model_registry import get_machine, get_model
+from src.dashboard.utils.predicting import explain_frame, score_frame
+from src.dashboard.utils.prediction_store import (
+    ensure_prediction_table,
+    save_scored_partition,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECKPOINT = ".backfill-checkpoint.json"
+
+# Per-worker state, set up once by the pool initializer
+_worker_engine = None
+
+
+def _init_worker(uri: str):
+    global _worker_engine
+    # Connections must not be shared across forked processes
+    _worker_engine = create_engine(uri, pool_pre_ping=True, pool_size=1)
+
+
+def score_partition(machine_id: str, day: date) -> Tuple[str, date, int]:
+    """Score one machine-day and write it to the prediction store"""
+    machine = get_machine(machine_id)
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+
+    # One row of lookback keeps the first row's counter diffs correct
+    data = read_time_range(
+        _worker_engine, machine["table"], start, end, lookback_rows=1
+    )
+
+    if (data["times"] >= start).sum() == 0:
+        scored_rows = 0
+    else:
+        X = preprocess(data)
+        X = X[X["times"] >= start]
+        model = get_model(machine_id)
+        predictions = score_frame(X, model)
+        scored_rows = save_scored_partition(
+            _worker_engine,
+            machine_id,
+            machine["model_version"],
+            start,
+            end,
+            predictions,
+            explain_frame(X, model, predictions),
+        )
+
+    return machine_id, day, scored_rows
+
+
+def _partition_key(machine_id: str, day: date) -> str:
+    return f"{machine_id}|{day.isoformat()}"
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        return set(json.load(f)["done"])
+
+
+def save_checkpoint(path: str, done: Set[str]):
+    # Write then rename, so a crash never leaves a truncated checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"done": sorted(done)}, f)
+    os.replace(tmp_path, path)
+
+
+def plan_partitions(
+    machine_ids: List[str], start: date, end: date, done: Set[str]
+) -> List[Tuple[str, date]]:
+    """All (machine, day) pairs in [start, end) not in the checkpoint"""
+    days = [start + timedelta(days=i) for i in range((end - start).days)]
+    return [
+        (machine_id, day)
+        for day in days
+        for machine_id in machine_ids
+        if _partition_key(machine_id, day) not in done
+    ]
+
+
+def run_backfill(
+    uri: str,
+    machine_ids: List[str],
+    start: date,
+    end: date,
+    workers: Optional[int] = None,
+    checkpoint: str = DEFAULT_CHECKPOINT,
+) -> int:
+    """Score every pending partition, returns the number of rows written"""
+    ensure_prediction_table(create_engine(uri))
+
+    done = load_checkpoint(checkpoint)
+    partitions = plan_partitions(machine_ids, start, end, done)
+    logger.info(
+        f"{len(partitions)} partitions to score, {len(done)} already done "
+        f"({checkpoint})"
+    )
+
+    total_rows = 0
+    started = time.perf_counter()
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(uri,)
+    ) as executor:
+        futures = {
+            executor.submit(score_partition, machine_id, day): (machine_id, day)
+            for machine_id, day in partitions
+        }
+
+        for i, future in enumerate(as_completed(futures), start=1):
+            machine_id, day = futures[future]
+            try:
+                _, _, rows = future.result()
+            except Exception as e:
+                # Left out of the checkpoint, so the next run retries it
+                logger.error(f"Partition {machine_id} {day} failed: {str(e)}")
+                continue
+
+            total_rows += rows
+            done.add(_partition_key(machine_id, day))
+            save_checkpoint(checkpoint, done)
+            logger.info(f"[{i}/{len(partitions)}] {machine_id} {day}: {rows} rows")
+
+    elapsed = time.perf_counter() - started
+    logger.info(f"Backfill wrote {total_rows} predictions in {elapsed:.1f}s")
+
+    # Predictions from ``start`` on were rewritten, so are their episodes
+    if partitions:
+        engine = create_engine(uri)
+        for machine_id in machine_ids:
+            machine = get_machine(machine_id)
+            update_episodes(
+                engine,
+                machine_id,
+                machine["model_version"],
+                machine["table"],
+                since=datetime.combine(start, datetime.min.time()),
+            )
+    return total_rows
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=90, help="Days back from today")
+    parser.add_argument(
+        "--start", type=date.fromisoformat, help="First day (inclusive)"
+    )
+    parser.add_argument("--end", type=date.fromisoformat, help="Last day (exclusive)")
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    end = args.end or date.today() + timedelta(days=1)
+    start = args.start or end - timedelta(days=args.days)
+    machine_ids = [m.strip() for m in args.machines.split(",") if m.strip()]
+
+    logging.basicConfig(level=logging.INFO)
+    run_backfill(args.uri, machine_ids, start, end, args.workers, args.checkpoint)
+
+
+if __name__ == "__main__":
+    main()
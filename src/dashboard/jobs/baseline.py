@@ -0,0 +1,61 @@
+"""
+Build the drift baseline of a model from its training data
+
+    python -m src.dashboard.jobs.baseline --csv notebooks/data/test.csv
+    python -m src.dashboard.jobs.baseline --csv data/ilapak3.csv --machine ilapak3
+
+The baseline is written next to the model pickle, where the dashboard's drift
+monitor looks for it.
+"""
+
+import argparse
+import json
+import logging
+from datetime import datetime
+from typing import List, Optional
+
+import pandas as pd
+
+from src.dashboard.config.settings import DEFAULT_MACHINE, MACHINES
+from src.dashboard.utils.drift import build_baseline
+from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.model_registry import get_baseline_path
+
+
+def load_training_frame(path: str) -> pd.DataFrame:
+    """Training CSV as preprocessed running rows"""
+    df = pd.read_csv(path, parse_dates=["times"]).sort_values("times")
+    # Exported training sets keep only the converted *_sec columns, which
+    # preprocess uses as they are
+    X = preprocess(df)
+    return X[X["Status"] == 2]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--csv", required=True, help="Training data CSV")
+    parser.add_argument("--machine", default=DEFAULT_MACHINE, choices=list(MACHINES))
+    parser.add_argument("--bins", type=int, default=10)
+    parser.add_argument("--output", help="Default: next to the machine's model")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    X = load_training_frame(args.csv)
+    machine = MACHINES[args.machine]
+    baseline = {
+        "model": machine["model"],
+        "model_version": machine["model_version"],
+        "source": args.csv,
+        "rows": len(X),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "features": build_baseline(X, bins=args.bins),
+    }
+
+    output = args.output or get_baseline_path(args.machine)
+    with open(output, "w") as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Wrote baseline of {len(X)} rows to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""
+Benchmark candidate models for accuracy and inference cost on the test set
+
+    python -m src.dashboard.jobs.benchmark            # registered models + lstm_ae.keras
+    python -m src.dashboard.jobs.benchmark --models ilapak3:v1.0.0,models/xgb.pkl,models/lstm.keras
+
+Every candidate runs in its own process, so load time and memory include its
+libraries and do not leak into the next one. Rows come from the replay CSV
+through the dashboard's ``preprocess``; rows labelled -1 (stopped) are left out
+of the scores, as in the comparison notebook.
+
+A candidate is a ``model:version`` resolved like the dashboard's models, a
+``.pkl`` with ``predict_proba`` on preprocessed rows (a pipeline with its own
+``prep`` step, e.g. an exported XGBoost pipeline) or a ``.keras`` model:
+
+- output shaped like its input: an LSTM autoencoder over windows of
+  ``AE_FEATURES``, scored by reconstruction error against the alarm labels
+- otherwise a sequence classifier over windows of the primary model's ``prep``
+  features, scored like the pickles
+"""
+
+import argparse
+import logging
+import os
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.config.settings import MACHINES, REPLAY_CSV
+from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.model_registry import (
+    get_model,
+    get_shadow_path,
+    group_by_model,
+)
+from src.dashboard.utils.replay import load_replay_rows
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KERAS_MODELS = ["notebooks/lstm_ae.keras"]
+
+# Inputs of the LSTM autoencoder in notebooks/06_lstm_ae.ipynb
+AE_FEATURES = [
+    "Suhu Sealing Vertikal Bawah (oC)",
+    "Suhu Sealing Vertical Atas (oC)",
+    "Suhu Sealing Horizontal Depan/Kanan (oC)",
+    "Suhu Sealing Horizontal Belakang/Kiri (oC )",
+    "Counter Output (pack)",
+    "Counter Reject (pack)",
+    "Speed(rpm)",
+    "Availability(%)",
+    "Performance(%)",
+    "Quality(%)",
+    "OEE(%)",
+    "Jaws Position",
+    "Doser Drive Enable",
+    "Sealing Enable",
+    "Machine Alarm",
+]
+# Reconstruction error above this percentile of normal rows is an alarm
+AE_THRESHOLD_PERCENTILE = 99
+
+LABELS = [0, 1, 2]  # Normal, Warning, Leak
+
+
+def rss_bytes() -> float:
+    """
+    Resident memory of this process, NaN where /proc is not available
+
+    Measured around loading, so native allocations (LightGBM, TensorFlow) count.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return np.nan
+
+
+def load_test_set(csv_path: str) -> Tuple[pd.DataFrame, pd.Series]:
+    """Preprocessed rows and their Condition labels, stopped rows excluded"""
+    rows = load_replay_rows(csv_path)
+    X = preprocess(rows.drop(columns="Condition"))
+    y = rows.loc[X.index, "Condition"]
+    keep = (y != -1).to_numpy()
+    return X[keep], y[keep]
+
+
+def timed(func, *args) -> Tuple[float, object]:
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+
+def windows(values: np.ndarray, size: int) -> np.ndarray:
+    """(rows, features) -> (rows - size + 1, size, features), each ending at a row"""
+    view = np.lib.stride_tricks.sliding_window_view(values, size, axis=0)
+    return view.transpose(0, 2, 1).astype("float32")
+
+
+def class_scores(y: pd.Series, probs: np.ndarray) -> Dict:
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    return {
+        "task": "3-class",
+        "f1_macro": f1_score(y, probs.argmax(axis=1), labels=LABELS, average="macro"),
+        "roc_auc": roc_auc_score(
+            y, probs, labels=LABELS, multi_class="ovr", average="macro"
+        ),
+    }
+
+
+def anomaly_scores(y: pd.Series, errors: np.ndarray) -> Dict:
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    alarm = (y != 0).to_numpy()
+    threshold = np.percentile(errors[~alarm], AE_THRESHOLD_PERCENTILE)
+    return {
+        "task": "anomaly",
+        "f1_macro": f1_score(alarm, errors > threshold, average="macro"),
+        "roc_auc": roc_auc_score(alarm, errors),
+    }
+
+
+def latency(predict, samples: List) -> Tuple[float, float]:
+    """p50 and p95 milliseconds of scoring one sample at a time"""
+    seconds = [timed(predict, sample)[0] for sample in samples]
+    return tuple(np.percentile(seconds, [50, 95]) * 1000)
+
+
+def bench_pickle(path: str, X: pd.DataFrame, y: pd.Series, args) -> Dict:
+    def load():
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    before = rss_bytes()
+    load_seconds, model = timed(load)
+    result = {"load_s": load_seconds, "memory_mb": (rss_bytes() - before) / 1024**2}
+
+    # Like the dashboard's single inference, one row per call
+    rows = [X.iloc[[i]] for i in range(min(args.single_rows, len(X)))]
+    result["single_p50_ms"], result["single_p95_ms"] = latency(
+        model.predict_proba, rows
+    )
+    batch_seconds, probs = min(
+        (timed(model.predict_proba, X) for _ in range(args.repeats)),
+        key=lambda run: run[0],
+    )
+    result["batch_rows_per_s"] = len(X) / batch_seconds
+    result.update(class_scores(y, probs))
+    return result
+
+
+def bench_keras(path: str, X: pd.DataFrame, y: pd.Series, args) -> Dict:
+    def load():
+        # Imported here, so load time and memory include TensorFlow like the
+        # pickles include sklearn and LightGBM
+        import tensorflow as tf
+
+        return tf.keras.models.load_model(path)
+
+    before = rss_bytes()
+    load_seconds, model = timed(load)
+    result = {"load_s": load_seconds, "memory_mb": (rss_bytes() - before) / 1024**2}
+
+    size = model.input_shape[1]
+    autoencoder = tuple(model.output_shape) == tuple(model.input_shape)
+    if autoencoder:
+        from sklearn.preprocessing import RobustScaler
+
+        # The training scaler was not saved, refit it on the normal rows
+        features = X[AE_FEATURES].astype("float32")
+        scaler = RobustScaler().fit(features[(y == 0).to_numpy()])
+        values = scaler.transform(features)
+    else:
+        machine_id = next(iter(MACHINES))
+        values = get_model(machine_id).named_steps["prep"].transform(X)
+    sequences = windows(np.asarray(values), size)
+    labels = y.iloc[size - 1 :]
+
+    samples = [sequences[[i]] for i in range(min(args.single_rows, len(sequences)))]
+    result["single_p50_ms"], result["single_p95_ms"] = latency(
+        lambda sample: model(sample, training=False), samples
+    )
+    batch_seconds, output = min(
+        (
+            timed(lambda: model.predict(sequences, batch_size=256, verbose=0))
+            for _ in range(args.repeats)
+        ),
+        key=lambda run: run[0],
+    )
+    result["batch_rows_per_s"] = len(sequences) / batch_seconds
+
+    if autoencoder:
+        errors = ((output - sequences) ** 2).mean(axis=(1, 2))
+        result.update(anomaly_scores(labels, errors))
+    else:
+        result.update(class_scores(labels, output))
+    return result
+
+
+def run_candidate(spec: str, args) -> Dict:
+    """Benchmark one candidate, in a fresh worker process"""
+    path = spec if spec.endswith(".keras") else get_shadow_path(spec)
+    row = {"model": spec, "file_mb": np.nan, "memory_mb": np.nan}
+    try:
+        row["file_mb"] = os.path.getsize(path) / 1024**2
+        if not row["file_mb"]:
+            raise ValueError(f"{path} is empty, export the trained model first")
+        X, y = load_test_set(args.csv)
+        bench = bench_keras if path.endswith(".keras") else bench_pickle
+        row.update(bench(path, X, y, args))
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {str(e)}"
+    return row
+
+
+def default_candidates() -> List[str]:
+    registered = [
+        f"{MACHINES[ids[0]]['model']}:{MACHINES[ids[0]]['model_version']}"
+        for ids in group_by_model(list(MACHINES)).values()
+    ]
+    return registered + DEFAULT_KERAS_MODELS
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--models",
+        default=",".join(default_candidates()),
+        help="Comma separated model:version, .pkl or .keras candidates",
+    )
+    parser.add_argument("--csv", default=REPLAY_CSV)
+    parser.add_argument(
+        "--single-rows", type=int, default=200, help="Rows timed one at a time"
+    )
+    parser.add_argument("--repeats", type=int, default=3, help="Best of n batch runs")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    rows = []
+    for spec in [m.strip() for m in args.models.split(",") if m.strip()]:
+        logger.info(f"Benchmarking {spec}")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rows.append(pool.submit(run_candidate, spec, args).result())
+
+    columns = [
+        "task",
+        "f1_macro",
+        "roc_auc",
+        "single_p50_ms",
+        "single_p95_ms",
+        "batch_rows_per_s",
+        "memory_mb",
+        "file_mb",
+        "load_s",
+        "error",
+    ]
+    table = pd.DataFrame(rows).set_index("model").reindex(columns=columns)
+    if table["error"].isna().all():
+        table = table.drop(columns="error")
+    with pd.option_context("display.width", 200, "display.max_colwidth", 60):
+        print(table.round(3).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Segment stored predictions into leak episodes
+
+    python -m src.dashboard.jobs.episodes                       # new predictions
+    python -m src.dashboard.jobs.episodes --since 2025-04-01    # re-segment
+
+Reads the prediction store (see jobs/backfill.py), never the raw datalog except
+one row per episode for its sensor snapshot. Run it after each backfill or from
+cron; every run only reads predictions newer than the last one.
+"""
+
+import argparse
+import logging
+from datetime import date, datetime
+from typing import List, Optional
+
+from src.dashboard.config.settings import DB_URI, MACHINES
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.episodes import update_episodes
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--since",
+        type=date.fromisoformat,
+        help="Rebuild episodes from this day, e.g. after a backfill",
+    )
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    engine = get_engine(args.uri)
+    since = datetime.combine(args.since, datetime.min.time()) if args.since else None
+
+    for machine_id in [m.strip() for m in args.machines.split(",") if m.strip()]:
+        machine = MACHINES[machine_id]
+        stored = update_episodes(
+            engine, machine_id, machine["model_version"], machine["table"], since
+        )
+        print(f"{machine_id}: {stored} episodes written")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Check and create the datalog indexes the dashboard queries rely on
+
+    python -m src.dashboard.jobs.indexes            # report only
+    python -m src.dashboard.jobs.indexes --apply    # create missing indexes
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+
+from src.dashboard.config.settings import DB_URI, MACHINES
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.db_schema import create_missing_indexes, explain_full_scans
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--apply", action="store_true", help="Create missing indexes")
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    engine = get_engine(args.uri)
+
+    for machine_id in [m.strip() for m in args.machines.split(",") if m.strip()]:
+        table = MACHINES[machine_id]["table"]
+        statements = create_missing_indexes(engine, table, dry_run=not args.apply)
+        if not statements:
+            print(f"{table}: all indexes present")
+        for statement in statements:
+            print(f"{'applied' if args.apply else 'missing'}: {statement};")
+
+        for warning in explain_full_scans(engine, table):
+            print(f"warning: {warning}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Publish recent datalog rows and predictions to shared memory for dashboard workers
+
+    python -m src.dashboard.jobs.ingest                  # tail the change queue
+    python -m src.dashboard.jobs.ingest --source poll    # poll the datalog tables
+
+Start the dashboard workers on the same host with PDM_CHANGE_FEED=shared. They
+attach to the segments read-only and stop querying for new rows and history.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from typing import List, Optional
+
+import pandas as pd
+
+from src.dashboard.config.settings import (
+    DB_URI,
+    MACHINES,
+    SHARED_PLANE_ROWS,
+    SHARED_PLANE_SECONDS,
+)
+from src.dashboard.utils.change_feed import (
+    PollingFeed,
+    QueueTableFeed,
+    score_new_rows,
+    set_buffer,
+)
+from src.dashboard.utils.database import get_engine, iter_time_range_chunks
+from src.dashboard.utils.shared_plane import SharedRecentBuffer
+
+logger = logging.getLogger(__name__)
+
+
+def seed_plane(
+    plane: SharedRecentBuffer, uri: str, machine_ids: List[str], seconds: int
+):
+    """Load the last ``seconds`` of every machine, so workers can serve history"""
+    engine = get_engine(uri)
+    start = pd.Timestamp.now() - pd.Timedelta(seconds=seconds)
+    end = pd.Timestamp.now() + pd.Timedelta(days=1)
+    for machine_id in machine_ids:
+        chunks = list(
+            iter_time_range_chunks(
+                engine,
+                MACHINES[machine_id]["table"],
+                start.to_pydatetime(),
+                end.to_pydatetime(),
+                include_archive=False,
+            )
+        )
+        rows = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+        plane.append(machine_id, rows, covered_from=start)
+        score_new_rows(machine_id)
+        logger.info(f"Seeded {len(rows)} rows of {machine_id}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--source", choices=["queue", "poll"], default="queue")
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--rows", type=int, default=SHARED_PLANE_ROWS)
+    parser.add_argument("--poll-seconds", type=float, default=None)
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    machine_ids = [m.strip() for m in args.machines.split(",") if m.strip()]
+
+    plane = SharedRecentBuffer(machine_ids, capacity=args.rows, create=True)
+    set_buffer(plane)
+    logger.info(
+        f"Shared plane: {len(machine_ids)} machine(s), "
+        f"{plane.memory_bytes() / 1024**2:.1f} MB"
+    )
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    try:
+        seed_plane(plane, args.uri, machine_ids, SHARED_PLANE_SECONDS)
+        feed_class = QueueTableFeed if args.source == "queue" else PollingFeed
+        kwargs = {"poll_seconds": args.poll_seconds} if args.poll_seconds else {}
+        feed = feed_class(args.uri, machine_ids, **kwargs)
+        feed.start()
+        stopped.wait()
+        feed.stop()
+    finally:
+        plane.close()
+        logger.info("Shared plane released")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Load test the dashboard with headless sessions against a replayed datalog
+
+    PDM_DB_URI=sqlite:///data/replay.db python -m src.dashboard.jobs.loadtest --reset
+    PDM_DB_URI=sqlite:///data/replay.db PDM_MACHINES=ilapak3,line02,line03 \\
+        python -m src.dashboard.jobs.loadtest --sessions 20 --speed 60 --duration 300
+
+Replays notebooks/data/test.csv (see jobs/replay.py) while ``--sessions`` headless
+Streamlit sessions (``AppTest``) run the real app in this process, spread over
+the registered machines. Reports rerun times, database queries per second and
+the latency from each written leak onset to the first rerun showing the alert.
+"""
+
+import argparse
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import event
+
+from src.dashboard.config.settings import (
+    CHANGE_FEED_MODE,
+    DB_URI,
+    MACHINES,
+    REPLAY_CSV,
+    REPLAY_HISTORY_HOURS,
+)
+from src.dashboard.jobs.replay import speed_factor
+from src.dashboard.utils.change_feed import get_change_feed, start_change_feed
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.replay import Replayer, load_replay_rows
+
+logger = logging.getLogger(__name__)
+
+# app.py only defines main(), so sessions run it from a one-line script
+SESSION_SCRIPT = "from src.dashboard.app import main\n\nmain()\n"
+ALERT_TEXT = "High probability of leakage detected"
+
+
+class QueryCounter:
+    """Counts statements the dashboard engine sends to the database"""
+
+    def __init__(self, engine):
+        self.lock = threading.Lock()
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        with self.lock:
+            self.count += 1
+
+
+def run_session(
+    session: int,
+    machine_id: str,
+    deadline: float,
+    rerun_seconds: float,
+    runs: List[Dict],
+    lock: threading.Lock,
+):
+    """Rerun one headless session every ``rerun_seconds`` until ``deadline``"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_string(SESSION_SCRIPT, default_timeout=120)
+    at.session_state["machine_id"] = machine_id
+    while time.time() < deadline:
+        started = time.time()
+        try:
+            at.run()
+            errors = len(at.exception)
+            alert = any(ALERT_TEXT in warning.value for warning in at.warning)
+        except Exception as e:
+            logger.error(f"Session {session} rerun failed: {str(e)}")
+            errors, alert = 1, False
+        finished = time.time()
+
+        with lock:
+            runs.append(
+                {
+                    "session": session,
+                    "machine_id": machine_id,
+                    "started": started,
+                    "finished": finished,
+                    "alert": alert,
+                    "errors": errors,
+                }
+            )
+        time.sleep(max(rerun_seconds - (finished - started), 0))
+
+
+def detection_latencies(onsets: List[Dict], runs: pd.DataFrame) -> pd.Series:
+    """Seconds from each onset to the first later rerun per session showing the alert"""
+    latencies = []
+    for onset in onsets:
+        viewers = runs[runs["machine_id"] == onset["machine_id"]]
+        for _, session_runs in viewers.groupby("session"):
+            hits = session_runs[
+                (session_runs["started"] >= onset["written_at"]) & session_runs["alert"]
+            ]
+            if not hits.empty:
+                latencies.append(hits["finished"].min() - onset["written_at"])
+    return pd.Series(latencies, dtype="float64")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=120, help="Seconds")
+    parser.add_argument("--rerun-seconds", type=float, default=5)
+    parser.add_argument("--speed", type=speed_factor, default=60.0)
+    parser.add_argument("--csv", default=REPLAY_CSV)
+    parser.add_argument("--history-hours", type=float, default=REPLAY_HISTORY_HOURS)
+    parser.add_argument(
+        "--reset", action="store_true", help="Replace tables that already have rows"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if DB_URI.startswith("mysql"):
+        parser.error("set PDM_DB_URI to the replay database, not production")
+
+    machine_ids = list(MACHINES)
+    replayer = Replayer(
+        DB_URI,
+        load_replay_rows(args.csv),
+        machine_ids,
+        speed=args.speed,
+        history_hours=args.history_hours,
+    )
+    replayer.prepare(reset=args.reset)
+
+    # With PDM_CHANGE_FEED=local the replay pushes its rows to the sessions
+    if CHANGE_FEED_MODE == "local":
+        feed = start_change_feed(CHANGE_FEED_MODE, DB_URI, machine_ids)
+        replayer.on_write = lambda machine_id, rows, _: feed.publish(machine_id, rows)
+
+    queries = QueryCounter(get_engine(DB_URI))
+    runs: List[Dict] = []
+    lock = threading.Lock()
+    started = time.time()
+    deadline = started + args.duration
+
+    replayer.start()
+    sessions = [
+        threading.Thread(
+            target=run_session,
+            args=(
+                i,
+                machine_ids[i % len(machine_ids)],
+                deadline,
+                args.rerun_seconds,
+                runs,
+                lock,
+            ),
+            daemon=True,
+        )
+        for i in range(args.sessions)
+    ]
+    for thread in sessions:
+        thread.start()
+    for thread in sessions:
+        thread.join()
+    replayer.stop()
+    if get_change_feed() is not None:
+        get_change_feed().stop()
+    elapsed = time.time() - started
+
+    runs = pd.DataFrame(runs)
+    if runs.empty:
+        print("No session finished a rerun")
+        return
+    rerun = runs["finished"] - runs["started"]
+    latency = detection_latencies(replayer.onsets, runs)
+
+    summary = {
+        "sessions": args.sessions,
+        "machines": len(machine_ids),
+        "change_feed": CHANGE_FEED_MODE,
+        "speed": args.speed,
+        "rows_written": replayer.written * len(machine_ids),
+        "reruns": len(runs),
+        "rerun_errors": int((runs["errors"] > 0).sum()),
+        "rerun_p50_s": rerun.quantile(0.5),
+        "rerun_p95_s": rerun.quantile(0.95),
+        "rerun_max_s": rerun.max(),
+        "queries_per_s": queries.count / elapsed,
+        "leak_onsets": len(replayer.onsets),
+        "detections": len(latency),
+        "detection_p50_s": latency.quantile(0.5) if len(latency) else None,
+        "detection_p95_s": latency.quantile(0.95) if len(latency) else None,
+    }
+    print(pd.Series(summary).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Stream notebooks/data/test.csv into a local database as live datalog rows
+
+    python -m src.dashboard.jobs.replay                      # 1x into data/replay.db
+    python -m src.dashboard.jobs.replay --speed 60 --reset
+    PDM_MACHINES=ilapak3,line02,line03 python -m src.dashboard.jobs.replay --speed 100
+
+Every registered machine gets its own table, so set PDM_MACHINES to fan the
+replay out. Point the dashboard at the same database with PDM_DB_URI.
+"""
+
+import argparse
+import logging
+import signal
+import threading
+from typing import List, Optional
+
+from src.dashboard.config.settings import (
+    MACHINES,
+    REPLAY_CSV,
+    REPLAY_DB_URI,
+    REPLAY_HISTORY_HOURS,
+)
+from src.dashboard.utils.replay import Replayer, load_replay_rows
+
+logger = logging.getLogger(__name__)
+
+
+def speed_factor(value: str) -> float:
+    speed = float(value)
+    if not 1 <= speed <= 1000:
+        raise argparse.ArgumentTypeError("speed must be between 1 and 1000")
+    return speed
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--speed", type=speed_factor, default=1.0)
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--csv", default=REPLAY_CSV)
+    parser.add_argument("--history-hours", type=float, default=REPLAY_HISTORY_HOURS)
+    parser.add_argument(
+        "--reset", action="store_true", help="Replace tables that already have rows"
+    )
+    parser.add_argument("--uri", default=REPLAY_DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    machine_ids = [m.strip() for m in args.machines.split(",") if m.strip()]
+
+    replayer = Replayer(
+        args.uri,
+        load_replay_rows(args.csv),
+        machine_ids,
+        speed=args.speed,
+        history_hours=args.history_hours,
+    )
+    replayer.prepare(reset=args.reset)
+    logger.info(
+        f"Replaying {len(replayer.rows)} rows into {len(machine_ids)} table(s) "
+        f"at {args.speed:g}x, first row at {replayer.rows['times'].iloc[0]}"
+    )
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    replayer.start()
+    while replayer.thread.is_alive() and not stopped.wait(1):
+        pass
+    replayer.stop()
+    logger.info(
+        f"Wrote {replayer.written} rows per machine, "
+        f"{len(replayer.onsets) // max(len(machine_ids), 1)} leak onsets"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Build the shift OEE report of a month and store its finished shifts
+
+    python -m src.dashboard.jobs.reports                      # current month
+    python -m src.dashboard.jobs.reports --month 2025-04 --machines ilapak3
+
+Run it after every shift change from cron, so the Reports tab only has to scan
+the shift in progress.
+"""
+
+import argparse
+import logging
+from typing import List, Optional
+
+import pandas as pd
+
+from src.dashboard.config.settings import DB_URI, MACHINES
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.reports import daily_report, get_shift_report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--month",
+        default=pd.Timestamp.now().strftime("%Y-%m"),
+        help="Month as YYYY-MM (default: current month)",
+    )
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    engine = get_engine(args.uri)
+
+    month = pd.Timestamp(f"{args.month}-01")
+    first_day = month.date()
+    last_day = min((month + pd.offsets.MonthEnd(0)).date(), pd.Timestamp.now().date())
+
+    for machine_id in [m.strip() for m in args.machines.split(",") if m.strip()]:
+        shifts = get_shift_report(
+            engine, machine_id, MACHINES[machine_id]["table"], first_day, last_day
+        )
+        days = daily_report(shifts)
+        if days.empty:
+            print(f"{machine_id}: no shifts in {args.month}")
+            continue
+
+        print(
+            f"{machine_id}: {len(shifts)} shifts over {len(days)} days, "
+            f"{int(days['output'].sum()):,} packs, {int(days['reject'].sum()):,} rejects"
+        )
+        print(
+            days[["shifts", "output", "reject", "availability", "performance", "oee"]]
+            .round(1)
+            .to_string()
+        )
+
+
+if __name__ == "__main__":
+    main()
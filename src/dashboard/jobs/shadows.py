@@ -0,0 +1,46 @@
+"""
+Compare logged shadow models with each machine's primary model
+
+    python -m src.dashboard.jobs.shadows                 # last 7 days
+    python -m src.dashboard.jobs.shadows --days 30 --machines ilapak3
+
+Shadows are configured with PDM_SHADOW_MODELS (see config/settings.py) and
+scored by the dashboard processes; this job only reads their log.
+"""
+
+import argparse
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from src.dashboard.config.settings import DB_URI, MACHINES
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.model_registry import get_primary_name
+from src.dashboard.utils.shadow import load_shadow_comparison
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument(
+        "--machines",
+        default=",".join(MACHINES),
+        help="Comma separated machine ids (default: all registered)",
+    )
+    parser.add_argument("--uri", default=DB_URI)
+    args = parser.parse_args(argv)
+
+    engine = get_engine(args.uri)
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+
+    for machine_id in [m.strip() for m in args.machines.split(",") if m.strip()]:
+        comparison = load_shadow_comparison(engine, machine_id, start, end)
+        if comparison.empty:
+            print(f"{machine_id}: no shadow predictions in the last {args.days} days")
+            continue
+        print(f"{machine_id} (primary {get_primary_name(machine_id)}):")
+        print(comparison.round(1).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import streamlit as st
+from src.dashboard.config.settings import (
+    DRIFT_MIN_ROWS,
+    DRIFT_PSI_ALERT,
+    DRIFT_PSI_WARNING,
+)
+from src.dashboard.utils.drift import get_drift_monitor
+from src.dashboard.utils.instrumentation import traced
+
+
+@traced()
+def drift_tab(machine_id):
+    st.header("🧭 Model Input Drift")
+
+    monitor = get_drift_monitor(machine_id)
+    if monitor is None:
+        st.info(
+            "No training baseline for this model. Build one with "
+            "`python -m src.dashboard.jobs.baseline --csv <training data>`."
+        )
+        return
+
+    scores = monitor.scores()
+    if monitor.size < DRIFT_MIN_ROWS:
+        st.info(
+            f"🟡 Collecting rows: {monitor.size} / {DRIFT_MIN_ROWS} running rows "
+            "seen so far"
+        )
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Window", f"{monitor.size:,} rows")
+    with col2:
+        st.metric("Drifting Features", (scores["status"] == "Drift").sum())
+    with col3:
+        st.metric("Shifted Features", (scores["status"] == "Shift").sum())
+    with col4:
+        st.metric("Max PSI", f"{scores['psi'].max():.2f}")
+
+    if (scores["status"] == "Drift").any():
+        st.warning(
+            "🟠 Some inputs are far from the training data, treat leak predictions "
+            "with care"
+        )
+
+    import plotly.express as px
+
+    color_map = {"Stable": "#28a745", "Shift": "#ffc107", "Drift": "#dc3545"}
+    chart_df = scores.reset_index().sort_values("psi")
+    fig = px.bar(
+        chart_df,
+        x="psi",
+        y="feature",
+        color="status",
+        orientation="h",
+        color_discrete_map=color_map,
+        title="Population Stability Index per Feature",
+        labels={"psi": "PSI", "feature": "Feature", "status": "Status"},
+    )
+    fig.add_vline(x=DRIFT_PSI_WARNING, line_dash="dash", line_color="#ffc107")
+    fig.add_vline(x=DRIFT_PSI_ALERT, line_dash="dash", line_color="#dc3545")
+    fig.update_layout(height=600, legend_title="Status")
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.subheader("📋 Drift and Data Quality")
+    st.dataframe(
+        scores.style.format(
+            {
+                "psi": "{:.3f}",
+                "ks": "{:.3f}",
+                "median": "{:.2f}",
+                "baseline_median": "{:.2f}",
+                "missing_pct": "{:.1f}%",
+                "out_of_range_pct": "{:.1f}%",
+            }
+        ),
+        use_container_width=True,
+    )
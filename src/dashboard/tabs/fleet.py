@@ -0,0 +1,55 @@
+import streamlit as st
+import pandas as pd
+from src.dashboard.config.settings import MACHINES
+from src.dashboard.utils.helpers import get_machine_status
+from src.dashboard.utils.predicting import fleet_inference
+from src.dashboard.utils.instrumentation import traced
+
+
+@traced()
+def fleet_tab(fleet_df):
+    st.header("🏭 Fleet Overview")
+
+    if fleet_df.empty:
+        st.warning("🟡 No fleet data available")
+        return
+
+    # All lines are scored together, one predict call per model
+    predictions = fleet_inference(fleet_df)
+
+    rows = []
+    for machine_id, machine_df in fleet_df.groupby("machine_id", sort=True):
+        machine_df = machine_df.reset_index(drop=True)
+        status, status_icon, _ = get_machine_status(machine_df)
+        latest = machine_df.iloc[0]
+        prediction = predictions.loc[machine_id]
+
+        rows.append(
+            {
+                "Machine": MACHINES[machine_id]["name"],
+                "Status": f"{status_icon} {status}",
+                "Last Data": latest["times"],
+                "OEE(%)": latest["OEE(%)"],
+                "Speed(rpm)": latest["Speed(rpm)"],
+                "Counter Reject (pack)": latest["Counter Reject (pack)"],
+                "Prediction": prediction["prediction"],
+                "Confidence": prediction["probability"],
+            }
+        )
+
+    fleet_summary = pd.DataFrame(rows).set_index("Machine")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Lines Reporting", f"{len(fleet_summary)} / {len(MACHINES)}")
+    with col2:
+        running = fleet_summary["Status"].str.endswith("Running").sum()
+        st.metric("Running", running)
+    with col3:
+        alerts = fleet_summary["Prediction"].isin(["Warning", "Leak"]).sum()
+        st.metric("Leak Alerts", alerts)
+
+    st.dataframe(
+        fleet_summary.style.format({"Confidence": "{:.2%}", "OEE(%)": "{:.1f}"}),
+        use_container_width=True,
+    )
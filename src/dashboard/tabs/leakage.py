@@ -1,17 +1,34 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from src.dashboard.utils.predicting import batch_inference, inference
+from functools import lru_cache
+from src.dashboard.config.settings import MACHINES
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.episodes import load_episodes
+from src.dashboard.utils.predicting import (
+    batch_explanations,
+    batch_inference,
+    format_contributions,
+    inference,
+)
+from src.dashboard.utils.figure_cache import cached_figure
 from src.dashboard.utils.helpers import preprocess_dataframe
-from twilio.rest import Client
+from src.dashboard.utils.instrumentation import traced
+from src.dashboard.tabs.reports import month_options
 from dotenv import load_dotenv
 import os
 
 load_dotenv()
 
-client = Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
 
+@lru_cache(maxsize=1)
+def get_alert_client():
+    """Twilio client, the SDK is only imported when an alert is sent"""
+    from twilio.rest import Client
 
+    return Client(os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"))
+
+
+@traced()
 def leakage_tab(historical_df, latest_df, time_range):
     st.header("🚨 Leakage Prediction")
 
@@ -83,33 +100,45 @@ def leakage_tab(historical_df, latest_df, time_range):
     # Create prediction trend chart
     st.subheader("📈 Prediction Trend")
 
-    # Create color mapping for predictions
-    color_map = {
-        "Normal": "#28a745",
-        "Warning": "#ffc107",
-        "Leak": "#dc3545",
-    }
+    def build_trend():
+        import plotly.express as px
+
+        # Create color mapping for predictions
+        color_map = {
+            "Normal": "#28a745",
+            "Warning": "#ffc107",
+            "Leak": "#dc3545",
+        }
+
+        fig = px.scatter(
+            pred_df,
+            x=pred_df.index,
+            y="probability",
+            color="prediction",
+            color_discrete_map=color_map,
+            title=f"Leakage Prediction Trend - {time_range}",
+            labels={
+                "index": "Time",
+                "probability": "Prediction Probability",
+                "prediction": "Prediction",
+            },
+        )
 
-    fig = px.scatter(
-        pred_df,
-        x=pred_df.index,
-        y="probability",
-        color="prediction",
-        color_discrete_map=color_map,
-        title=f"Leakage Prediction Trend - {time_range}",
-        labels={
-            "index": "Time",
-            "probability": "Prediction Probability",
-            "prediction": "Prediction",
-        },
-    )
+        # Update layout
+        fig.update_layout(
+            xaxis_title="Time",
+            yaxis_title="Prediction Probability",
+            legend_title="Prediction",
+            hovermode="x unified",
+        )
+        return fig
 
-    # Update layout
-    fig.update_layout(
-        xaxis_title="Time",
-        yaxis_title="Prediction Probability",
-        legend_title="Prediction",
-        hovermode="x unified",
+    fig = cached_figure(
+        "prediction_trend",
+        st.session_state.machine_id,
+        time_range,
+        pred_df,
+        build_trend,
     )
 
     st.plotly_chart(fig, use_container_width=True)
@@ -117,6 +146,63 @@ def leakage_tab(historical_df, latest_df, time_range):
     # Display recent predictions table
     st.subheader("📋 Recent Predictions")
     recent_preds = pred_df.sort_index(ascending=False).head(10)
+    # Computed when the rows were scored, looked up here
+    explanations = batch_explanations(historical_df, st.session_state.model)
+    recent_preds["top_features"] = [
+        format_contributions(explanations.get(time)) for time in recent_preds.index
+    ]
     st.dataframe(
         recent_preds.style.format({"probability": "{:.2%}"}), use_container_width=True
     )
+
+
+@traced()
+def leak_episodes_panel(uri, machine_id):
+    """Stored leak episodes of a month, an indexed lookup without rescoring"""
+    st.subheader("🗂️ Leak Episodes")
+
+    month = st.selectbox(
+        "Month",
+        month_options(),
+        format_func=lambda value: value.strftime("%B %Y"),
+        key="episode_month",
+    )
+    try:
+        episodes = load_episodes(
+            get_engine(uri),
+            machine_id,
+            MACHINES[machine_id]["model_version"],
+            month.to_pydatetime(),
+            (month + pd.DateOffset(months=1)).to_pydatetime(),
+        )
+    except Exception as e:
+        st.error(f"❌ Error loading leak episodes: {str(e)}")
+        return
+
+    if episodes.empty:
+        st.info("No leak episodes stored for this month")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Episodes", len(episodes))
+    with col2:
+        st.metric("Total Duration", f"{episodes['duration_min'].sum():.0f} min")
+    with col3:
+        st.metric("Peak Probability", f"{episodes['peak_probability'].max():.1%}")
+
+    if not episodes["closed"].all():
+        st.caption("🔴 The latest episode is still open")
+
+    st.dataframe(
+        episodes.set_index("start")
+        .drop(columns="model_version")
+        .style.format(
+            {
+                "peak_probability": "{:.2%}",
+                "mean_probability": "{:.2%}",
+                "duration_min": "{:.1f}",
+            }
+        ),
+        use_container_width=True,
+    )
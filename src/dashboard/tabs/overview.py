@@ -1,8 +1,11 @@
 import streamlit as st
 from src.dashboard.components.charts import create_realtime_chart
+from src.dashboard.utils.figure_cache import cached_figure
 from src.dashboard.utils.helpers import get_processed_dataframes
+from src.dashboard.utils.instrumentation import traced
 
 
+@traced()
 def overview_tab(historical_df, latest_df, time_range):
     # Process dataframes
     historical_df, latest_df = get_processed_dataframes(historical_df, latest_df)
@@ -12,8 +15,15 @@ def overview_tab(historical_df, latest_df, time_range):
         st.subheader(f"📈 Trends - {time_range}")
         efficiency_cols = ["Availability(%)", "Performance(%)", "Quality(%)", "OEE(%)"]
 
-        fig_trends = create_realtime_chart(
-            historical_df, efficiency_cols, f"Efficiency Trends - {time_range}"
+        fig_trends = cached_figure(
+            "efficiency_trends",
+            st.session_state.machine_id,
+            time_range,
+            historical_df,
+            lambda: create_realtime_chart(
+                historical_df, efficiency_cols, f"Efficiency Trends - {time_range}"
+            ),
+            columns=efficiency_cols,
         )
         st.plotly_chart(fig_trends, use_container_width=True)
 
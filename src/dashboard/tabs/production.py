@@ -1,8 +1,11 @@
 import streamlit as st
 from src.dashboard.components.charts import create_realtime_chart
+from src.dashboard.utils.figure_cache import cached_figure
 from src.dashboard.utils.helpers import get_processed_dataframes
+from src.dashboard.utils.instrumentation import traced
 
 
+@traced()
 def production_tab(historical_df, latest_df, time_range):
     # Process dataframes
     historical_df, latest_df = get_processed_dataframes(historical_df, latest_df)
@@ -56,17 +59,31 @@ def production_tab(historical_df, latest_df, time_range):
 
         with col1:
             speed_cols = ["Speed(rpm)"]
-            fig_speed = create_realtime_chart(
-                historical_df, speed_cols, f"Speed Trend - {time_range}"
+            fig_speed = cached_figure(
+                "speed_trend",
+                st.session_state.machine_id,
+                time_range,
+                historical_df,
+                lambda: create_realtime_chart(
+                    historical_df, speed_cols, f"Speed Trend - {time_range}"
+                ),
+                columns=speed_cols,
             )
             st.plotly_chart(fig_speed, use_container_width=True)
 
         with col2:
             output_cols = ["Counter Output (pack)", "Counter Reject (pack)"]
-            fig_output = create_realtime_chart(
+            fig_output = cached_figure(
+                "output_trend",
+                st.session_state.machine_id,
+                time_range,
                 historical_df,
-                output_cols,
-                title=f"Output Trend - {time_range}",
-                secondary_y_cols=["Counter Reject (pack)"],
+                lambda: create_realtime_chart(
+                    historical_df,
+                    output_cols,
+                    title=f"Output Trend - {time_range}",
+                    secondary_y_cols=["Counter Reject (pack)"],
+                ),
+                columns=output_cols,
             )
             st.plotly_chart(fig_output, use_container_width=True)
@@ -0,0 +1,96 @@
+import streamlit as st
+import pandas as pd
+from src.dashboard.config.settings import MACHINES, REPORT_MONTHS
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.reports import daily_report, get_shift_report
+from src.dashboard.utils.instrumentation import traced
+
+
+def month_options():
+    current = pd.Timestamp.now().normalize().replace(day=1)
+    return [current - pd.DateOffset(months=i) for i in range(REPORT_MONTHS)]
+
+
+@traced()
+def reports_tab(uri, machine_id):
+    st.header("📋 Shift OEE Report")
+
+    month = st.selectbox(
+        "Month",
+        month_options(),
+        format_func=lambda value: value.strftime("%B %Y"),
+        key="report_month",
+    )
+    first_day = month.date()
+    last_day = min((month + pd.offsets.MonthEnd(0)).date(), pd.Timestamp.now().date())
+
+    try:
+        shifts = get_shift_report(
+            get_engine(uri),
+            machine_id,
+            MACHINES[machine_id]["table"],
+            first_day,
+            last_day,
+        )
+    except Exception as e:
+        st.error(f"❌ Error building shift report: {str(e)}")
+        return
+
+    if shifts.empty:
+        st.info("No shifts recorded in this month")
+        return
+
+    days = daily_report(shifts)
+    total_time = days["total_time_sec"].sum()
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Shifts", len(shifts))
+    with col2:
+        st.metric("Output", f"{int(days['output'].sum()):,} packs")
+    with col3:
+        st.metric("Reject", f"{int(days['reject'].sum()):,} packs")
+    with col4:
+        oee = (days["oee"] * days["total_time_sec"]).sum() / total_time
+        st.metric("OEE", f"{oee:.1f}%" if total_time else "-")
+
+    in_progress = (~shifts["finished"].astype(bool)).sum()
+    if in_progress:
+        st.caption(f"🟢 {in_progress} shift in progress, its figures are shift-to-date")
+
+    st.subheader("Per Day")
+    st.dataframe(
+        days[
+            [
+                "shifts",
+                "output",
+                "reject",
+                "downtime_sec",
+                "availability",
+                "performance",
+                "quality",
+                "oee",
+            ]
+        ].round(1),
+        use_container_width=True,
+    )
+
+    st.subheader("Per Shift")
+    st.dataframe(
+        shifts.set_index(["shift_date", "shift"])[
+            [
+                "start",
+                "end",
+                "running_rows",
+                "output",
+                "reject",
+                "downtime_sec",
+                "availability",
+                "performance",
+                "quality",
+                "oee",
+                "finished",
+            ]
+        ].round(1),
+        use_container_width=True,
+    )
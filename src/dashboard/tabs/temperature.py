@@ -1,8 +1,17 @@
 import streamlit as st
 from src.dashboard.components.charts import create_realtime_chart
+from src.dashboard.utils.figure_cache import cached_figure
 from src.dashboard.utils.helpers import get_processed_dataframes
+from src.dashboard.utils.instrumentation import traced
+from src.dashboard.utils.rolling import (
+    ROLLING_COLUMNS,
+    check_temperature_alerts,
+    get_rolling_stats,
+)
+from src.dashboard.config.settings import MACHINES, ROLLING_WINDOWS
 
 
+@traced()
 def temperature_tab(historical_df, latest_df, time_range):
     # Process dataframes
     historical_df, latest_df = get_processed_dataframes(historical_df, latest_df)
@@ -40,17 +49,44 @@ def temperature_tab(historical_df, latest_df, time_range):
                 unsafe_allow_html=True,
             )
 
+    machine = MACHINES[st.session_state.machine_id]
+    rolling = get_rolling_stats(st.session_state.machine_id)
+
     with col2:
         st.subheader("📊 Temperature Stats")
-        if not historical_df.empty:
-            temp_stats = historical_df[temp_cols].describe().loc[["mean", "min", "max"]]
-            temp_stats.index = ["Average", "Minimum", "Maximum"]
+        # Kept up to date row by row, nothing is recomputed from history here
+        window = st.radio(
+            "Window", list(ROLLING_WINDOWS), horizontal=True, key="rolling_window"
+        )
+        temp_stats = rolling.snapshot(window).loc[ROLLING_COLUMNS]
+        if temp_stats["count"].fillna(0).gt(0).any():
+            temp_stats = temp_stats.drop(columns="count").T
+            temp_stats.index = ["Average", "Std Dev", "Minimum", "Maximum", "EWMA"]
             st.dataframe(temp_stats.round(1))
+        else:
+            st.info(f"No rows in the {window} window yet")
+
+    for alert in check_temperature_alerts(rolling, machine["temp_danger_threshold"]):
+        st.warning(f"🟠 {alert}")
 
     # Temperature trend chart
     if not historical_df.empty:
         st.subheader(f"📈 Temperature Trends - {time_range}")
         if "times" in historical_df.columns:
             historical_df.set_index("times", inplace=True)
-        fig_temp = create_realtime_chart(historical_df, temp_cols, y_lim=(150, 250))
+        fig_temp = cached_figure(
+            "temperature_trends",
+            st.session_state.machine_id,
+            time_range,
+            historical_df,
+            lambda: create_realtime_chart(
+                historical_df,
+                temp_cols,
+                y_lim=(
+                    machine["temp_warning_threshold"],
+                    machine["temp_danger_threshold"],
+                ),
+            ),
+            columns=temp_cols,
+        )
         st.plotly_chart(fig_temp, use_container_width=True)
@@ -0,0 +1,124 @@
+import logging
+import os
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional
+
+import pandas as pd
+
+from src.dashboard.config.settings import ARCHIVE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def month_start(value: datetime) -> pd.Timestamp:
+    return pd.Timestamp(value).normalize().replace(day=1)
+
+
+def next_month(value: datetime) -> pd.Timestamp:
+    return month_start(value) + pd.DateOffset(months=1)
+
+
+def archive_path(table: str, month: datetime) -> str:
+    """One compressed Parquet file per table and month"""
+    return os.path.join(ARCHIVE_DIR, table, f"{month_start(month):%Y-%m}.parquet")
+
+
+def list_archived_months(table: str) -> List[pd.Timestamp]:
+    """Months of ``table`` that live in the archive, oldest first"""
+    directory = os.path.join(ARCHIVE_DIR, table)
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        pd.Timestamp(f"{name[:7]}-01")
+        for name in os.listdir(directory)
+        if name.endswith(".parquet")
+    )
+
+
+def get_archive_boundary(table: str) -> Optional[pd.Timestamp]:
+    """Rows older than this timestamp are in the archive, not the hot table"""
+    months = list_archived_months(table)
+    return next_month(months[-1]) if months else None
+
+
+def write_parquet_chunks(chunks: Iterable[pd.DataFrame], path: str) -> int:
+    """Write DataFrame chunks as row groups of one Parquet file"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+# pyarrow is only imported once the archive is read or written, the boundary
+# lookup on every historical load only lists the directory
+def _archive_dataset(table: str, start: datetime, end: datetime):
+    import pyarrow.dataset as ds
+
+    paths = [
+        archive_path(table, month)
+        for month in list_archived_months(table)
+        if month < pd.Timestamp(end) and next_month(month) > pd.Timestamp(start)
+    ]
+    return ds.dataset(paths, format="parquet") if paths else None
+
+
+def _time_filter(start: datetime, end: datetime):
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    return (ds.field("times") >= pa.scalar(pd.Timestamp(start))) & (
+        ds.field("times") < pa.scalar(pd.Timestamp(end))
+    )
+
+
+def read_archive(
+    table: str,
+    start: datetime,
+    end: datetime,
+    columns: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Archived rows of ``table`` in [start, end), oldest first"""
+    dataset = _archive_dataset(table, start, end)
+    if dataset is None:
+        return pd.DataFrame()
+
+    columns = ["times", *columns] if columns else None
+    df = dataset.to_table(columns=columns, filter=_time_filter(start, end)).to_pandas()
+    return df.sort_values("times").reset_index(drop=True)
+
+
+def iter_archive_chunks(
+    table: str,
+    start: datetime,
+    end: datetime,
+    chunksize: int = 5000,
+    columns: Optional[List[str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Archived rows in [start, end) as chunks, one month file at a time"""
+    import pyarrow.dataset as ds
+
+    for month in list_archived_months(table):
+        if month >= pd.Timestamp(end) or next_month(month) <= pd.Timestamp(start):
+            continue
+        dataset = ds.dataset(archive_path(table, month), format="parquet")
+        scanner = dataset.scanner(
+            columns=["times", *columns] if columns else None,
+            filter=_time_filter(start, end),
+            batch_size=chunksize,
+            use_threads=False,  # keep batches in file (times) order
+        )
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
@@ -0,0 +1,228 @@
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.config.settings import CACHE_MAX_MB, CACHE_TTLS
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def frame_hash(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> int:
+    """Content hash of a frame's values, index and column names"""
+    if df.empty:
+        return 0
+    frame = df[[col for col in columns if col in df.columns]] if columns else df
+    values = int(pd.util.hash_pandas_object(frame, index=True).sum())
+    return hash((values, frame.shape, tuple(frame.columns)))
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory of a cached value in bytes"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(item) for item in value.values()
+        )
+    return sys.getsizeof(value)
+
+
+class NamespaceStats:
+    def __init__(self):
+        self.entries = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expired = 0
+
+
+class CacheService:
+    """
+    Process-wide cache shared by all sessions, under one memory budget
+
+    Entries live in namespaces with their own TTL (``CACHE_TTLS``, None never
+    expires). One OrderedDict keeps every entry in LRU order, so lookups,
+    inserts and evictions are O(1). Expired entries are dropped when they are
+    read or reach the LRU end. Concurrent misses on one key wait for the first
+    builder instead of computing the value again.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = CACHE_MAX_MB * 1024**2,
+        ttls: Optional[Dict[str, Optional[float]]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self.ttls = dict(CACHE_TTLS if ttls is None else ttls)
+        self.lock = threading.Lock()
+        self.entries: OrderedDict = OrderedDict()  # (ns, key) -> (value, size, expiry)
+        self.building: Dict[Hashable, threading.Event] = {}
+        # Namespace -> callback(key), called under the lock when an entry leaves
+        self.on_drop: Dict[str, Callable[[Hashable], None]] = {}
+        self.bytes = 0
+        self.namespaces: Dict[str, NamespaceStats] = {
+            namespace: NamespaceStats() for namespace in self.ttls
+        }
+
+    def _stats(self, namespace: str) -> NamespaceStats:
+        if namespace not in self.namespaces:
+            raise KeyError(f"Unknown cache namespace: {namespace}")
+        return self.namespaces[namespace]
+
+    def _drop(self, full_key: Hashable) -> int:
+        _, size, _ = self.entries.pop(full_key)
+        stats = self.namespaces[full_key[0]]
+        stats.entries -= 1
+        stats.bytes -= size
+        self.bytes -= size
+        callback = self.on_drop.get(full_key[0])
+        if callback is not None:
+            callback(full_key[1])
+        return size
+
+    def _lookup(self, namespace: str, key: Hashable):
+        # Caller holds the lock
+        full_key = (namespace, key)
+        entry = self.entries.get(full_key)
+        stats = self._stats(namespace)
+        if entry is None:
+            stats.misses += 1
+            return _MISSING
+        value, _, expiry = entry
+        if expiry is not None and expiry <= time.monotonic():
+            self._drop(full_key)
+            stats.expired += 1
+            stats.misses += 1
+            return _MISSING
+        self.entries.move_to_end(full_key)
+        stats.hits += 1
+        return value
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            value = self._lookup(namespace, key)
+        return default if value is _MISSING else value
+
+    def set(
+        self, namespace: str, key: Hashable, value: Any, size: Optional[int] = None
+    ):
+        size = estimate_size(value) if size is None else size
+        full_key = (namespace, key)
+        with self.lock:
+            stats = self._stats(namespace)
+            if full_key in self.entries:
+                self._drop(full_key)
+            if size > self.max_bytes:
+                logger.warning(f"{namespace} entry ({size} bytes) exceeds the cache")
+                return
+
+            ttl = self.ttls[namespace]
+            expiry = time.monotonic() + ttl if ttl is not None else None
+            self.entries[full_key] = (value, size, expiry)
+            stats.entries += 1
+            stats.bytes += size
+            self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self.entries))
+                expired = self.entries[oldest][2]
+                self._drop(oldest)
+                if expired is not None and expired <= time.monotonic():
+                    self.namespaces[oldest[0]].expired += 1
+                else:
+                    self.namespaces[oldest[0]].evictions += 1
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: Hashable,
+        build: Callable[[], Any],
+        sizeof: Callable[[Any], int] = estimate_size,
+    ) -> Any:
+        """Cached value of ``key``, computed once with ``build()`` on a miss"""
+        full_key = (namespace, key)
+        while True:
+            with self.lock:
+                value = self._lookup(namespace, key)
+                if value is not _MISSING:
+                    return value
+                event = self.building.get(full_key)
+                if event is None:
+                    event = self.building[full_key] = threading.Event()
+                    break
+            # Another session is computing this value
+            event.wait()
+
+        try:
+            value = build()
+            self.set(namespace, key, value, size=sizeof(value))
+            return value
+        finally:
+            with self.lock:
+                self.building.pop(full_key, None)
+            event.set()
+
+    def delete(self, namespace: str, key: Hashable):
+        """Drop one entry, if it is cached"""
+        with self.lock:
+            if (namespace, key) in self.entries:
+                self._drop((namespace, key))
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drop every entry, or only the entries of one namespace"""
+        with self.lock:
+            for full_key in list(self.entries):
+                if namespace is None or full_key[0] == namespace:
+                    self._drop(full_key)
+
+    def stats(self) -> pd.DataFrame:
+        """Footprint and hit rate per namespace"""
+        with self.lock:
+            rows = []
+            for namespace, stats in self.namespaces.items():
+                lookups = stats.hits + stats.misses
+                rows.append(
+                    {
+                        "namespace": namespace,
+                        "ttl_s": self.ttls[namespace],
+                        "entries": stats.entries,
+                        "memory_mb": stats.bytes / 1024**2,
+                        "hits": stats.hits,
+                        "misses": stats.misses,
+                        "hit_rate": stats.hits / lookups * 100 if lookups else 0.0,
+                        "evictions": stats.evictions,
+                        "expired": stats.expired,
+                    }
+                )
+        return pd.DataFrame(rows).set_index("namespace")
+
+    def footprint(self) -> Dict[str, float]:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "memory_mb": self.bytes / 1024**2,
+                "budget_mb": self.max_bytes / 1024**2,
+            }
+
+
+# Global cache service, shared by every session of the process
+_cache = CacheService()
+
+
+def get_cache() -> CacheService:
+    return _cache
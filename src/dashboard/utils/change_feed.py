@@ -0,0 +1,455 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.dashboard.config.settings import (
+    CHANGE_FEED_BUFFER_ROWS,
+    CHANGE_FEED_POLL_SECONDS,
+    CHANGE_FEED_QUEUE_TABLE,
+    MACHINES,
+)
+from src.dashboard.utils.compact import compact_frame
+from src.dashboard.utils.database import (
+    TIME_RANGE_SECONDS,
+    check_table,
+    fetch_latest_data,
+    get_bucket_seconds,
+    get_engine,
+)
+from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.instrumentation import span
+from src.dashboard.utils.model_registry import get_model
+from src.dashboard.utils.predicting import score_frame
+from src.dashboard.utils.queries import keyset_page
+from src.dashboard.utils.shadow import get_shadow_scorer
+
+logger = logging.getLogger(__name__)
+
+
+class RecentBuffer:
+    """
+    Process-wide buffer of the newest datalog rows per machine
+
+    Every append of new rows bumps the machine's version, so sessions can tell
+    whether anything changed with a dictionary lookup instead of a query.
+    """
+
+    def __init__(self, max_rows: int = CHANGE_FEED_BUFFER_ROWS):
+        self.rows: Dict[str, deque] = {}
+        self.versions: Dict[str, int] = {}
+        self.predictions: Dict[str, Dict] = {}
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+
+    def append(self, machine_id: str, df: pd.DataFrame) -> int:
+        """Append rows (any order), ignoring rows already buffered, returns how many"""
+        if df.empty:
+            return 0
+
+        # Same columns for every row, whether it came from a query or the feed
+        df = compact_frame(df)
+        appended = 0
+        with self.lock:
+            rows = self.rows.setdefault(machine_id, deque(maxlen=self.max_rows))
+            last_time = rows[-1]["times"] if rows else None
+            for record in df.sort_values("times").to_dict("records"):
+                if last_time is None or record["times"] > last_time:
+                    rows.append(record)
+                    last_time = record["times"]
+                    appended += 1
+            # Only new rows change the version, re-read ranges rerun nobody
+            if appended:
+                self.versions[machine_id] = self.versions.get(machine_id, 0) + 1
+        return appended
+
+    def snapshot(self, machine_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Newest rows first, the same shape as ``load_latest_data``"""
+        with self.lock:
+            records = list(self.rows.get(machine_id, ()))
+        if limit:
+            records = records[-limit:]
+        return compact_frame(pd.DataFrame(records[::-1]))
+
+    def window(
+        self, machine_id: str, seconds: int, max_records: int = 1000
+    ) -> Optional[pd.DataFrame]:
+        """History is not kept here, the caller queries the database"""
+        return None
+
+    def latest_time(self, machine_id: str) -> Optional[pd.Timestamp]:
+        with self.lock:
+            rows = self.rows.get(machine_id)
+            return rows[-1]["times"] if rows else None
+
+    def version(self, machine_id: str) -> int:
+        return self.versions.get(machine_id, 0)
+
+    def set_prediction(self, machine_id: str, prediction: Dict):
+        with self.lock:
+            self.predictions[machine_id] = prediction
+
+    def latest_prediction(self, machine_id: str) -> Optional[Dict]:
+        return self.predictions.get(machine_id)
+
+
+# Global buffer shared by every session of this process
+_buffer = RecentBuffer()
+
+
+def get_buffer() -> RecentBuffer:
+    return _buffer
+
+
+def set_buffer(buffer: RecentBuffer):
+    """Swap the process buffer, e.g. for the shared memory plane"""
+    global _buffer
+    _buffer = buffer
+
+
+def buffered_results(
+    machine_id: str, time_range: str, max_records: int = 1000
+) -> Dict[str, Any]:
+    """
+    Dashboard load results the buffer can answer without a query
+
+    The shared plane holds the last day of rows, so unsampled ranges and the
+    health probe are served from memory. Anything else is left to the loader.
+    """
+    if get_bucket_seconds(time_range, max_records) is not None:
+        return {}
+    historical = _buffer.window(machine_id, TIME_RANGE_SECONDS[time_range], max_records)
+    if historical is None:
+        return {}
+    return {"historical": historical, "health": _buffer.latest_time(machine_id)}
+
+
+def buffered_fleet_latest(machine_ids: List[str], limit: int = 2) -> pd.DataFrame:
+    """``load_fleet_latest`` from the buffer, empty when a machine is missing"""
+    frames = []
+    for machine_id in machine_ids:
+        latest = _buffer.snapshot(machine_id, limit=limit)
+        if latest.empty:
+            return pd.DataFrame()
+        frames.append(latest.assign(machine_id=machine_id))
+    return pd.concat(frames, ignore_index=True)
+
+
+def score_new_rows(machine_id: str):
+    """Score the newest buffered row of a machine right after it arrives"""
+    # Two rows so the counter diff features of the newest row are correct
+    recent = _buffer.snapshot(machine_id, limit=2)
+    if recent.empty or recent["Status"].iloc[0] != 2:
+        return
+
+    try:
+        X = preprocess(recent.iloc[::-1]).iloc[[-1]]
+        started = time.perf_counter()
+        scored = score_frame(X, get_model(machine_id))
+        model_seconds = time.perf_counter() - started
+    except Exception as e:
+        logger.error(f"Change feed scoring failed for {machine_id}: {str(e)}")
+        return
+
+    _buffer.set_prediction(machine_id, scored.iloc[0].to_dict())
+
+    scorer = get_shadow_scorer()
+    if scorer is not None:
+        scorer.submit(machine_id, X, scored, model_seconds)
+
+
+class ChangeFeed:
+    """Base class: pushes new rows into the buffer and scores them"""
+
+    def __init__(self, on_rows: Optional[Callable[[str, pd.DataFrame], None]] = None):
+        self.on_rows = on_rows
+
+    def publish(self, machine_id: str, df: pd.DataFrame):
+        if _buffer.append(machine_id, df):
+            score_new_rows(machine_id)
+        if self.on_rows is not None:
+            self.on_rows(machine_id, df)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class LocalChangeFeed(ChangeFeed):
+    """In-process stand-in, rows are pushed by calling ``publish`` directly"""
+
+
+class QueueTableFeed(ChangeFeed):
+    """
+    Tails the trigger-fed queue table filled by ``install_change_triggers``
+
+    One indexed primary-key probe per interval for the whole process, instead
+    of every session re-reading the datalog tables.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        machine_ids: List[str],
+        poll_seconds: float = CHANGE_FEED_POLL_SECONDS,
+        on_rows: Optional[Callable[[str, pd.DataFrame], None]] = None,
+    ):
+        super().__init__(on_rows)
+        self.uri = uri
+        self.machine_ids = machine_ids
+        self.poll_seconds = poll_seconds
+        self.tables = {MACHINES[m]["table"]: m for m in machine_ids}
+        self.last_id = 0
+        self.last_prune = 0.0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        engine = get_engine(self.uri)
+        with engine.connect() as conn:
+            self.last_id = conn.execute(
+                text(f"SELECT COALESCE(MAX(id), 0) FROM {CHANGE_FEED_QUEUE_TABLE}")
+            ).scalar()
+
+        # Seed the buffer so sessions have full context before the first insert
+        for machine_id in self.machine_ids:
+            self.publish(
+                machine_id,
+                fetch_latest_data(self.uri, 20, MACHINES[machine_id]["table"]),
+            )
+
+        self.thread = threading.Thread(
+            target=self._run, name="pdm-change-feed", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                if time.time() - self.last_prune > 3600:
+                    self.last_prune = time.time()
+                    prune_change_queue(self.uri)
+                if not self.poll_once():
+                    self.stopped.wait(self.poll_seconds)
+            except Exception as e:
+                logger.error(f"Change feed error: {str(e)}")
+                self.stopped.wait(self.poll_seconds * 5)
+
+    def poll_once(self) -> int:
+        """Consume pending queue entries, returns how many were consumed"""
+        engine = get_engine(self.uri)
+        with engine.connect() as conn, span("change_feed_poll"):
+            changes = pd.read_sql(
+                text(
+                    f"SELECT id, source_table, row_times FROM {CHANGE_FEED_QUEUE_TABLE} "
+                    "WHERE id > :last_id ORDER BY id LIMIT 500"
+                ),
+                conn,
+                params={"last_id": self.last_id},
+            )
+            if changes.empty:
+                return 0
+
+            for table, table_changes in changes.groupby("source_table"):
+                machine_id = self.tables.get(table)
+                if machine_id is None:
+                    continue
+                rows = pd.read_sql(
+                    text(
+                        f"SELECT * FROM {check_table(table)} "
+                        "WHERE times BETWEEN :first AND :last ORDER BY times"
+                    ),
+                    conn,
+                    params={
+                        "first": table_changes["row_times"].min(),
+                        "last": table_changes["row_times"].max(),
+                    },
+                    parse_dates=["times"],
+                )
+                self.publish(machine_id, rows)
+
+        self.last_id = int(changes["id"].max())
+        return len(changes)
+
+
+class PollingFeed(ChangeFeed):
+    """
+    Polls each datalog table for rows newer than the last one it saw
+
+    For databases without the change triggers. One query per table and interval
+    for the whole process, however many sessions are open.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        machine_ids: List[str],
+        poll_seconds: float = CHANGE_FEED_POLL_SECONDS,
+        on_rows: Optional[Callable[[str, pd.DataFrame], None]] = None,
+    ):
+        super().__init__(on_rows)
+        self.uri = uri
+        self.machine_ids = machine_ids
+        self.poll_seconds = poll_seconds
+        self.last_times: Dict[str, Optional[pd.Timestamp]] = {}
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        for machine_id in self.machine_ids:
+            self.publish(
+                machine_id,
+                fetch_latest_data(self.uri, 20, MACHINES[machine_id]["table"]),
+            )
+            self.last_times[machine_id] = _buffer.latest_time(machine_id)
+
+        self.thread = threading.Thread(
+            target=self._run, name="pdm-change-feed", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.is_set():
+            try:
+                if not self.poll_once():
+                    self.stopped.wait(self.poll_seconds)
+            except Exception as e:
+                logger.error(f"Change feed error: {str(e)}")
+                self.stopped.wait(self.poll_seconds * 5)
+
+    def poll_once(self) -> int:
+        """Publish rows newer than the last seen ones, returns how many"""
+        engine = get_engine(self.uri)
+        published = 0
+        with engine.connect() as conn, span("change_feed_poll"):
+            for machine_id in self.machine_ids:
+                last_time = self.last_times.get(machine_id)
+                if last_time is None:
+                    rows = fetch_latest_data(
+                        self.uri, 20, MACHINES[machine_id]["table"]
+                    )
+                else:
+                    rows = pd.read_sql(
+                        keyset_page(
+                            MACHINES[machine_id]["table"],
+                            last_time.to_pydatetime(),
+                            None,
+                            500,
+                            inclusive=False,
+                        ),
+                        conn,
+                        parse_dates=["times"],
+                    )
+                if rows.empty:
+                    continue
+                self.publish(machine_id, rows)
+                self.last_times[machine_id] = rows["times"].max()
+                published += len(rows)
+        return published
+
+
+class SharedPlaneFeed(ChangeFeed):
+    """
+    Dashboard worker side of the shared memory plane
+
+    Attaches read-only to the segments of ``python -m src.dashboard.jobs.ingest``
+    and makes them the process buffer. The worker never queries for new rows.
+    """
+
+    def __init__(self, machine_ids: List[str]):
+        super().__init__()
+        self.machine_ids = machine_ids
+
+    def start(self):
+        from src.dashboard.utils.shared_plane import SharedRecentBuffer
+
+        set_buffer(SharedRecentBuffer(self.machine_ids))
+
+    def publish(self, machine_id: str, df: pd.DataFrame):
+        raise RuntimeError("Rows are published by the ingest process")
+
+
+def install_change_triggers(uri: str, machine_ids: List[str]):
+    """Create the queue table and AFTER INSERT triggers (MySQL)"""
+    engine = get_engine(uri)
+    with engine.begin() as conn:
+        conn.execute(text(f"""
+                CREATE TABLE IF NOT EXISTS {CHANGE_FEED_QUEUE_TABLE} (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    source_table VARCHAR(64) NOT NULL,
+                    row_times DATETIME NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    KEY idx_created_at (created_at)
+                )
+                """))
+        for machine_id in machine_ids:
+            table = check_table(MACHINES[machine_id]["table"])
+            conn.execute(text(f"DROP TRIGGER IF EXISTS trg_{table}_changes"))
+            conn.execute(text(f"""
+                    CREATE TRIGGER trg_{table}_changes AFTER INSERT ON {table}
+                    FOR EACH ROW
+                    INSERT INTO {CHANGE_FEED_QUEUE_TABLE} (source_table, row_times)
+                    VALUES ('{table}', NEW.times)
+                    """))
+
+
+def prune_change_queue(uri: str, keep_hours: int = 1):
+    """Drop consumed queue entries; every dashboard process reads the same queue"""
+    engine = get_engine(uri)
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                f"DELETE FROM {CHANGE_FEED_QUEUE_TABLE} "
+                f"WHERE created_at < NOW() - INTERVAL {int(keep_hours)} HOUR"
+            )
+        )
+
+
+_feed: Optional[ChangeFeed] = None
+_feed_lock = threading.Lock()
+
+
+def start_change_feed(
+    mode: str, uri: str, machine_ids: List[str]
+) -> Optional[ChangeFeed]:
+    """
+    Start the process-wide change feed once
+
+    ``mode`` is off, queue, poll, shared or local.
+    """
+    global _feed
+
+    if mode == "off":
+        return None
+
+    with _feed_lock:
+        if _feed is None:
+            if mode == "queue":
+                feed = QueueTableFeed(uri, machine_ids)
+            elif mode == "poll":
+                feed = PollingFeed(uri, machine_ids)
+            elif mode == "shared":
+                feed = SharedPlaneFeed(machine_ids)
+            elif mode == "local":
+                feed = LocalChangeFeed()
+            else:
+                raise ValueError(f"Unknown change feed mode: {mode}")
+            feed.start()
+            _feed = feed
+        return _feed
+
+
+def get_change_feed() -> Optional[ChangeFeed]:
+    return _feed
@@ -0,0 +1,117 @@
+import logging
+from typing import Dict
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Sensor readings and percentages need ~4 significant digits
+FLOAT32_COLUMNS = [
+    "Suhu Sealing Vertikal Bawah (oC)",
+    "Suhu Sealing Vertical Atas (oC)",
+    "Suhu Sealing Horizontal Depan/Kanan (oC)",
+    "Suhu Sealing Horizontal Belakang/Kiri (oC )",
+    "Speed(rpm)",
+    "Availability(%)",
+    "Performance(%)",
+    "Quality(%)",
+    "OEE(%)",
+]
+
+INT32_COLUMNS = ["Counter Output (pack)", "Counter Reject (pack)"]
+
+FLAG_COLUMNS = [
+    "Jaws Position",
+    "Doser Drive Enable",
+    "Sealing Enable",
+    "Machine Alarm",
+]
+
+# Fixed categories, so frames loaded separately still concat as categoricals
+CATEGORY_DTYPES = {
+    "Shift": pd.CategoricalDtype([1, 2, 3]),
+    "Status": pd.CategoricalDtype([1, 2, 3]),
+}
+
+# hh:mm:ss strings -> int32 seconds, named like the columns ``preprocess`` adds
+TIME_COLUMNS = {
+    "Downtime (hh:mm:ss)": "Downtime_sec",
+    "Output Time (hh:mm:ss)": "Output Time_sec",
+    "Total Time (hh:mm:ss)": "Total Time_sec",
+}
+
+
+def _to_int(series: pd.Series, dtype: str) -> pd.Series:
+    # Columns with gaps stay float32, nullable ints cost a mask per value
+    if series.isna().any():
+        return series.astype("float32")
+    return series.astype(dtype)
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink a datalog frame at load time
+
+    float32 sensors, int32 counters, uint8 flags, categorical Shift/Status, and
+    the hh:mm:ss strings parsed once into int32 ``*_sec`` columns (the strings
+    are dropped). Works on full or projected frames.
+    """
+    if df.empty:
+        return df
+
+    df = df.copy()
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+    for col in INT32_COLUMNS:
+        if col in df.columns:
+            df[col] = _to_int(df[col], "int32")
+    for col in FLAG_COLUMNS:
+        if col in df.columns:
+            df[col] = _to_int(df[col], "uint8")
+
+    for col, dtype in CATEGORY_DTYPES.items():
+        if col not in df.columns or isinstance(df[col].dtype, pd.CategoricalDtype):
+            continue
+        unknown = set(df[col].dropna().unique()) - set(dtype.categories)
+        if unknown:
+            logger.warning(f"Unexpected {col} values {sorted(unknown)}, kept as int")
+            df[col] = _to_int(df[col], "int8")
+        else:
+            df[col] = df[col].astype(dtype)
+
+    for col, sec_col in TIME_COLUMNS.items():
+        if col in df.columns:
+            seconds = pd.to_timedelta(df.pop(col), errors="coerce").dt.total_seconds()
+            df[sec_col] = _to_int(seconds, "int32")
+        elif sec_col in df.columns:
+            df[sec_col] = _to_int(df[sec_col], "int32")
+
+    return df
+
+
+def memory_report(frames: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+    """Rows, deep memory size and bytes per row of each named frame"""
+    rows = []
+    for name, df in frames.items():
+        size = int(df.memory_usage(deep=True).sum()) if not df.empty else 0
+        rows.append(
+            {
+                "frame": name,
+                "rows": len(df),
+                "columns": len(df.columns),
+                "memory_mb": size / 1024**2,
+                "bytes_per_row": size / len(df) if len(df) else 0.0,
+            }
+        )
+    return pd.DataFrame(rows).set_index("frame")
+
+
+def estimate_window_mb(
+    df: pd.DataFrame, days: int = 30, machines: int = 1, rows_per_day: int = 1440
+) -> float:
+    """Memory of an unsampled ``days`` window for ``machines`` lines like ``df``"""
+    if df.empty:
+        return 0.0
+    bytes_per_row = df.memory_usage(deep=True).sum() / len(df)
+    return float(bytes_per_row * rows_per_day * days * machines / 1024**2)
@@ -1,97 +1,399 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine
+from sqlalchemy.sql.expression import Select
 import streamlit as st
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Iterator, List, Optional
+from src.dashboard.config.settings import DEFAULT_MACHINE, MACHINES
+from src.dashboard.utils.compact import compact_frame
+from src.dashboard.utils.instrumentation import span, traced
+from src.dashboard.utils.queries import (
+    check_table,
+    fleet_latest,
+    keyset_page,
+    latest_rows,
+    latest_times,
+    range_rows,
+    sampled_rows,
+)
+from src.dashboard.utils.query_cache import read_sql
+from src.dashboard.utils.archive import (
+    get_archive_boundary,
+    iter_archive_chunks,
+    read_archive,
+)
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+DEFAULT_TABLE = MACHINES[DEFAULT_MACHINE]["table"]
 
-def get_time_filter_query(time_range: str) -> str:
-    """Generate SQL query based on time range selection"""
-    base_query = "SELECT * FROM datalog_ilapak3"
+# Fixed dtypes so every streamed chunk has the same schema
+DATALOG_DTYPES = {
+    "Shift": "Int64",
+    "Status": "Int64",
+    "Suhu Sealing Vertikal Bawah (oC)": "float64",
+    "Suhu Sealing Vertical Atas (oC)": "float64",
+    "Suhu Sealing Horizontal Depan/Kanan (oC)": "float64",
+    "Suhu Sealing Horizontal Belakang/Kiri (oC )": "float64",
+    "Counter Output (pack)": "Int64",
+    "Counter Reject (pack)": "Int64",
+    "Speed(rpm)": "float64",
+    "Availability(%)": "float64",
+    "Performance(%)": "float64",
+    "Quality(%)": "float64",
+    "OEE(%)": "float64",
+    "Jaws Position": "Int64",
+    "Doser Drive Enable": "Int64",
+    "Sealing Enable": "Int64",
+    "Machine Alarm": "Int64",
+    "Downtime (hh:mm:ss)": "string",
+    "Output Time (hh:mm:ss)": "string",
+    "Total Time (hh:mm:ss)": "string",
+}
+
+
+@lru_cache(maxsize=None)
+def get_engine(uri: str):
+    """Share one pooled engine per database URI across sessions"""
+    return create_engine(uri, pool_pre_ping=True, pool_recycle=300)
+
+
+TIME_RANGE_SECONDS = {
+    "Last 6 Hours": 6 * 3600,
+    "Last 24 Hours": 24 * 3600,
+    "Last 7 Days": 7 * 24 * 3600,
+    "Last 30 Days": 30 * 24 * 3600,
+}
+
+
+def get_bucket_seconds(time_range: str, max_records: int = 1000) -> Optional[int]:
+    """Sampling bucket for long ranges, None when the range is loaded in full"""
+    if time_range not in ["Last 7 Days", "Last 30 Days"]:
+        return None
+    return max(TIME_RANGE_SECONDS[time_range] // max_records, 60)
+
+
+def sample_buckets(df: pd.DataFrame, bucket_seconds: int) -> pd.DataFrame:
+    """Keep the last row of each time bucket, like the sampled SQL query"""
+    if df.empty:
+        return df
+    df = df.sort_values("times")
+    buckets = df["times"].astype("int64") // 10**9 // bucket_seconds
+    return df.groupby(buckets.values).tail(1)
 
-    time_filters = {
-        "Last 6 Hours": "6 HOUR",
-        "Last 24 Hours": "1 DAY",
-        "Last 7 Days": "7 DAY",
-        "Last 30 Days": "30 DAY",
-    }
 
-    interval = time_filters.get(time_range, "1 DAY")
+# Relative range starts are rounded down to this step (or the sampling bucket),
+# so reruns within it send the same bound parameters and share cached results
+RANGE_START_STEP_SECONDS = 60
 
-    # Add sampling for larger datasets to improve performance
-    if time_range in ["Last 7 Days", "Last 30 Days"]:
-        # Sample every 10th record for better performance
-        return f"""
-        SELECT * FROM (
-            SELECT *, ROW_NUMBER() OVER (ORDER BY times DESC) as rn 
-            FROM {base_query.replace('SELECT * FROM ', '')}
-            WHERE times >= NOW() - INTERVAL {interval}
-        ) t WHERE MOD(rn, 10) = 1 ORDER BY times DESC
-        """
-    else:
-        return f"{base_query} WHERE times >= NOW() - INTERVAL {interval} ORDER BY times DESC"
 
+def get_range_query(
+    table: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    max_records: int = 1000,
+    bucket_seconds: Optional[int] = None,
+) -> Select:
+    """Newest ``max_records`` rows in [start, end), one row per bucket if sampled"""
+    if bucket_seconds:
+        return sampled_rows(table, start, end, bucket_seconds, max_records)
+    return range_rows(table, start, end, max_records, newest_first=True)
 
-def load_latest_data(uri: str, limit: int = 20) -> pd.DataFrame:
+
+def get_time_filter_query(
+    time_range: str,
+    table: str = DEFAULT_TABLE,
+    max_records: int = 1000,
+) -> Select:
+    """Bound statement for a sidebar time range, see ``get_range_query``"""
+    bucket_seconds = get_bucket_seconds(time_range, max_records)
+    start = pd.Timestamp.now() - pd.Timedelta(
+        seconds=TIME_RANGE_SECONDS.get(time_range, 24 * 3600)
+    )
+    step = bucket_seconds or RANGE_START_STEP_SECONDS
+    return get_range_query(
+        table,
+        start.floor(f"{step}s").to_pydatetime(),
+        max_records=max_records,
+        bucket_seconds=bucket_seconds,
+    )
+
+
+@traced("load_latest_data")
+def fetch_latest_data(
+    uri: str, limit: int = 20, table: str = DEFAULT_TABLE
+) -> pd.DataFrame:
     """
-    Load latest data without caching for real-time updates
+    Query the latest rows, raising on errors (safe outside the script thread)
     """
-    try:
-        engine = create_engine(uri, pool_pre_ping=True, pool_recycle=300)
-        query = f"SELECT * FROM datalog_ilapak3 ORDER BY times DESC LIMIT {limit}"
+    engine = get_engine(uri)
+    df = read_sql(engine, latest_rows(table, limit), [check_table(table)])
 
-        with engine.connect() as conn:
-            df = pd.read_sql(query, conn, parse_dates=["times"])
+    if df.empty:
+        logger.warning("No data returned from latest data query")
+        return pd.DataFrame()
 
-        if df.empty:
-            logger.warning("No data returned from latest data query")
-            return pd.DataFrame()
+    # Sort by times descending for consistent ordering
+    df = df.sort_values("times", ascending=False).reset_index(drop=True)
+    return compact_frame(df)
 
-        # Sort by times descending for consistent ordering
-        df = df.sort_values("times", ascending=False).reset_index(drop=True)
-        return df
 
+def load_latest_data(
+    uri: str, limit: int = 20, table: str = DEFAULT_TABLE
+) -> pd.DataFrame:
+    """
+    Load latest data, cached only until the next insert (see ``QueryCache``)
+    """
+    try:
+        return fetch_latest_data(uri, limit, table)
     except Exception as e:
         logger.error(f"Error loading latest data: {str(e)}")
         st.error(f"❌ Error loading latest data: {str(e)}")
         return pd.DataFrame()
 
 
+@traced("load_historical_data")
+def fetch_historical_data(
+    uri: str, time_range: str, max_records: int = 1000, table: str = DEFAULT_TABLE
+) -> pd.DataFrame:
+    """
+    Query historical rows, raising on errors (safe outside the script thread)
+    """
+    start = pd.Timestamp.now() - pd.Timedelta(
+        seconds=TIME_RANGE_SECONDS.get(time_range, 24 * 3600)
+    )
+    df = fetch_range_data(
+        uri,
+        start.to_pydatetime(),
+        None,
+        max_records,
+        table,
+        get_bucket_seconds(time_range, max_records),
+    )
+    if df.empty:
+        logger.warning(f"No data returned for time range: {time_range}")
+    return df
+
+
+def fetch_range_data(
+    uri: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    max_records: int = 1000,
+    table: str = DEFAULT_TABLE,
+    bucket_seconds: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Newest ``max_records`` rows in [start, end), oldest first
+
+    Any range works, ``bucket_seconds`` samples the last row per bucket. Rows
+    before the archive boundary are read from the archive.
+    """
+    engine = get_engine(uri)
+    step = bucket_seconds or RANGE_START_STEP_SECONDS
+    query_start = pd.Timestamp(start).floor(f"{step}s").to_pydatetime()
+    query = get_range_query(table, query_start, end, max_records, bucket_seconds)
+    df = read_sql(engine, query, [check_table(table)])
+
+    # The query starts at the rounded start, or a cached result was read when the
+    # range started earlier. Buckets are aligned to the epoch and the newest rows
+    # are kept, so dropping the rows before ``start`` gives the exact range.
+    df = df[df["times"] >= pd.Timestamp(start)]
+
+    # Ranges reaching past the hot table are completed from the archive
+    boundary = get_archive_boundary(table)
+    if boundary is not None and pd.Timestamp(start) < boundary:
+        archive_end = boundary if end is None else min(pd.Timestamp(end), boundary)
+        with span("archive_read"):
+            archived = read_archive(table, start, archive_end)
+        if bucket_seconds:
+            archived = sample_buckets(archived, bucket_seconds)
+        if not archived.empty:
+            df = pd.concat([df, archived], ignore_index=True)
+            df = df.sort_values("times", ascending=False).head(max_records)
+
+    if df.empty:
+        return pd.DataFrame()
+
+    # Sort by times for consistent ordering
+    df = df.sort_values("times", ascending=True).reset_index(drop=True)
+    return compact_frame(df)
+
+
 def load_historical_data(
-    uri: str, time_range: str, max_records: int = 1000
+    uri: str, time_range: str, max_records: int = 1000, table: str = DEFAULT_TABLE
 ) -> pd.DataFrame:
     """
-    Load historical data without caching for real-time updates
+    Load historical data, cached only until the next insert (see ``QueryCache``)
     """
     try:
-        engine = create_engine(uri, pool_pre_ping=True, pool_recycle=300)
-        query = get_time_filter_query(time_range)
+        return fetch_historical_data(uri, time_range, max_records, table)
+    except Exception as e:
+        logger.error(f"Error loading historical data: {str(e)}")
+        st.error(f"❌ Error loading historical data: {str(e)}")
+        return pd.DataFrame()
 
-        # Add limit to prevent memory issues
-        if "LIMIT" not in query:
-            query += f" LIMIT {max_records}"
 
-        with engine.connect() as conn:
-            df = pd.read_sql(query, conn, parse_dates=["times"])
+@traced()
+def check_connection(uri: str, table: str = DEFAULT_TABLE) -> Optional[datetime]:
+    """
+    Health probe: one indexed ``MAX(times)`` lookup, returns the latest timestamp
+    """
+    engine = get_engine(uri)
+    with engine.connect() as conn, span("db_query"):
+        latest = conn.execute(latest_times([check_table(table)]))
+        return pd.to_datetime(latest.scalar())
+
+
+@traced()
+def load_fleet_latest(uri: str, machine_ids: List[str], limit: int = 2) -> pd.DataFrame:
+    """
+    Load the latest rows of several machines in a single round trip
+
+    Returns one frame with a ``machine_id`` column, newest rows first per machine.
+    """
+    if not machine_ids:
+        return pd.DataFrame()
+
+    try:
+        engine = get_engine(uri)
+        tables = {
+            machine_id: MACHINES[machine_id]["table"] for machine_id in machine_ids
+        }
+        query = fleet_latest(tables, limit)
+        df = read_sql(engine, query, list(tables.values()))
 
         if df.empty:
-            logger.warning(f"No data returned for time range: {time_range}")
+            logger.warning("No data returned from fleet query")
             return pd.DataFrame()
 
-        # Sort by times for consistent ordering
-        df = df.sort_values("times", ascending=True).reset_index(drop=True)
-        return df
+        df = df.sort_values(["machine_id", "times"], ascending=[True, False])
+        return compact_frame(df.reset_index(drop=True))
 
     except Exception as e:
-        logger.error(f"Error loading historical data: {str(e)}")
-        st.error(f"❌ Error loading historical data: {str(e)}")
+        logger.error(f"Error loading fleet data: {str(e)}")
+        st.error(f"❌ Error loading fleet data: {str(e)}")
         return pd.DataFrame()
 
 
+def read_time_range(
+    engine, table: str, start: datetime, end: datetime, lookback_rows: int = 0
+) -> pd.DataFrame:
+    """
+    Read all rows of ``table`` in [start, end), oldest first
+
+    ``lookback_rows`` extra rows before ``start`` are included so diff features
+    of the first row in the window are correct. Rows older than the archive
+    boundary are read from the archive. Errors are raised to the caller, which
+    makes this safe to use outside a Streamlit session.
+    """
+    table = check_table(table)
+
+    boundary = get_archive_boundary(table)
+    if boundary is not None and pd.Timestamp(start) < boundary:
+        with span("archive_read"):
+            archived = read_archive(table, start, min(pd.Timestamp(end), boundary))
+            if lookback_rows:
+                lookback = read_archive(
+                    table, pd.Timestamp(start) - pd.Timedelta(days=1), start
+                ).tail(lookback_rows)
+                archived = pd.concat([lookback, archived], ignore_index=True)
+        if pd.Timestamp(end) <= boundary:
+            return archived
+        hot = read_time_range(engine, table, boundary.to_pydatetime(), end)
+        return pd.concat([archived, hot], ignore_index=True)
+
+    with engine.connect() as conn, span("db_query"):
+        df = pd.read_sql(range_rows(table, start, end), conn, parse_dates=["times"])
+        if lookback_rows:
+            lookback = pd.read_sql(
+                range_rows(table, end=start, limit=lookback_rows, newest_first=True),
+                conn,
+                parse_dates=["times"],
+            )
+            if not lookback.empty:
+                df = pd.concat([lookback.iloc[::-1], df], ignore_index=True)
+
+    return df
+
+
+def apply_datalog_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast known datalog columns to their fixed dtypes"""
+    dtypes = {col: dtype for col, dtype in DATALOG_DTYPES.items() if col in df.columns}
+    return df.astype(dtypes)
+
+
+def iter_time_range_chunks(
+    engine,
+    table: str,
+    start: datetime,
+    end: datetime,
+    chunksize: int = 5000,
+    columns: Optional[List[str]] = None,
+    include_archive: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream rows of ``table`` in [start, end) as typed DataFrame chunks
+
+    Reads keyset pages of ``chunksize`` rows, so only one chunk is held in memory
+    at a time regardless of the size of the range. Archived months are streamed first
+    unless ``include_archive`` is off, which reads the hot table only.
+    """
+    table = check_table(table)
+
+    boundary = get_archive_boundary(table) if include_archive else None
+    if boundary is not None and pd.Timestamp(start) < boundary:
+        for chunk in iter_archive_chunks(
+            table, start, min(pd.Timestamp(end), boundary), chunksize, columns
+        ):
+            yield apply_datalog_dtypes(chunk)
+        start = boundary.to_pydatetime()
+        if pd.Timestamp(end) <= boundary:
+            return
+
+    if columns:
+        unknown = set(columns) - set(DATALOG_DTYPES)
+        if unknown:
+            raise ValueError(f"Unknown datalog columns: {sorted(unknown)}")
+
+    # Keyset pages: each is an indexed range scan from the last page's times, so
+    # no cursor or connection is held while the caller works on a chunk. Rows
+    # sharing the last timestamp are read again with the next page.
+    after, inclusive = start, True
+    while True:
+        page = keyset_page(table, after, end, chunksize, columns, inclusive)
+        with engine.connect() as conn:
+            chunk = pd.read_sql(page, conn, parse_dates=["times"])
+        if len(chunk) < chunksize:
+            if not chunk.empty:
+                yield apply_datalog_dtypes(chunk)
+            return
+
+        last = chunk["times"].iloc[-1]
+        head = chunk[chunk["times"] < last]
+        if head.empty:
+            # A whole page of one timestamp, read all of its rows at once
+            with engine.connect() as conn:
+                head = pd.read_sql(
+                    range_rows(
+                        table,
+                        last.to_pydatetime(),
+                        (last + pd.Timedelta(microseconds=1)).to_pydatetime(),
+                        columns=columns,
+                    ),
+                    conn,
+                    parse_dates=["times"],
+                )
+            after, inclusive = last.to_pydatetime(), False
+        else:
+            after, inclusive = last.to_pydatetime(), True
+        yield apply_datalog_dtypes(head)
+
+
 def get_data_freshness(df: pd.DataFrame) -> dict:
     """
     Check data freshness for real-time monitoring
@@ -119,7 +421,7 @@ def get_data_summary(df: pd.DataFrame) -> dict:
     if df.empty:
         return {}
 
-    numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns
+    numeric_cols = df.select_dtypes(include="number").columns
     summary = {}
 
     for col in numeric_cols:
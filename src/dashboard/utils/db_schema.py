@@ -0,0 +1,140 @@
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.sql.expression import Select
+
+from src.dashboard.config.settings import MACHINES
+from src.dashboard.utils.database import (
+    TIME_RANGE_SECONDS,
+    check_table,
+    get_engine,
+    get_time_filter_query,
+)
+from src.dashboard.utils.queries import latest_rows, latest_times
+
+logger = logging.getLogger(__name__)
+
+# Column sets the dashboard projects; a (times, ...) index covers each of them
+PROJECTIONS = {
+    "efficiency": ["Availability(%)", "Performance(%)", "Quality(%)", "OEE(%)"],
+    "temperature": [
+        "Suhu Sealing Vertikal Bawah (oC)",
+        "Suhu Sealing Vertical Atas (oC)",
+        "Suhu Sealing Horizontal Depan/Kanan (oC)",
+        "Suhu Sealing Horizontal Belakang/Kiri (oC )",
+    ],
+    "production": ["Speed(rpm)", "Counter Output (pack)", "Counter Reject (pack)"],
+}
+
+# Index name -> ordered columns, every datalog table should have these
+REQUIRED_INDEXES: Dict[str, List[str]] = {
+    "idx_times": ["times"],
+    **{f"idx_times_{name}": ["times", *cols] for name, cols in PROJECTIONS.items()},
+}
+
+
+def get_table_indexes(engine, table: str) -> Dict[str, List[str]]:
+    """Existing indexes of ``table`` as index name -> ordered columns"""
+    query = text("""
+        SELECT index_name, column_name
+        FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = :table
+        ORDER BY index_name, seq_in_index
+        """)
+    indexes: Dict[str, List[str]] = {}
+    with engine.connect() as conn:
+        for index_name, column_name in conn.execute(query, {"table": table}):
+            indexes.setdefault(index_name, []).append(column_name)
+    return indexes
+
+
+def find_missing_indexes(engine, table: str) -> Dict[str, List[str]]:
+    """Required indexes not already served by an existing index prefix"""
+    existing = list(get_table_indexes(engine, check_table(table)).values())
+    return {
+        name: columns
+        for name, columns in REQUIRED_INDEXES.items()
+        if not any(index[: len(columns)] == columns for index in existing)
+    }
+
+
+def index_ddl(table: str, name: str, columns: List[str]) -> str:
+    quoted = ", ".join(f"`{col}`" for col in columns)
+    return f"CREATE INDEX `{name}` ON `{check_table(table)}` ({quoted})"
+
+
+def create_missing_indexes(engine, table: str, dry_run: bool = True) -> List[str]:
+    """Create (or with ``dry_run`` only list) the DDL for missing indexes"""
+    statements = [
+        index_ddl(table, name, columns)
+        for name, columns in find_missing_indexes(engine, table).items()
+    ]
+    if not dry_run:
+        with engine.begin() as conn:
+            for statement in statements:
+                logger.info(statement)
+                conn.execute(text(statement))
+    return statements
+
+
+def dashboard_queries(table: str) -> List[Tuple[str, Select]]:
+    """The statements a dashboard rerun issues against ``table``"""
+    queries = [
+        ("latest", latest_rows(table, 20)),
+        ("health", latest_times([table])),
+    ]
+    for time_range in TIME_RANGE_SECONDS:
+        queries.append(
+            (f"historical {time_range}", get_time_filter_query(time_range, table))
+        )
+    return queries
+
+
+def explain_full_scans(engine, table: str) -> List[str]:
+    """EXPLAIN every dashboard query and report the ones that scan the table"""
+    warnings = []
+    with engine.connect() as conn:
+        for name, query in dashboard_queries(check_table(table)):
+            # EXPLAIN takes no bound parameters, inline the current values
+            sql = query.compile(engine, compile_kwargs={"literal_binds": True})
+            plan = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+            for step in plan:
+                # Materialised derived tables (<derived2>) are small by design
+                if step["type"] == "ALL" and not str(step["table"]).startswith("<"):
+                    warnings.append(
+                        f"{table}: '{name}' query does a full scan "
+                        f"(~{step['rows']} rows, key={step['key']})"
+                    )
+    return warnings
+
+
+_startup_check_done = False
+_startup_check_lock = threading.Lock()
+
+
+def run_startup_check(uri: str):
+    """Log missing indexes and full scans once per process, off the render path"""
+    global _startup_check_done
+
+    with _startup_check_lock:
+        if _startup_check_done:
+            return
+        _startup_check_done = True
+
+    def check():
+        try:
+            engine = get_engine(uri)
+            for machine in MACHINES.values():
+                for name in find_missing_indexes(engine, machine["table"]):
+                    logger.warning(
+                        f"{machine['table']} is missing index {name}, run "
+                        "python -m src.dashboard.jobs.indexes --apply"
+                    )
+                for warning in explain_full_scans(engine, machine["table"]):
+                    logger.warning(warning)
+        except Exception as e:
+            logger.error(f"Index check failed: {str(e)}")
+
+    threading.Thread(target=check, name="pdm-index-check", daemon=True).start()
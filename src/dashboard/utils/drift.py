@@ -0,0 +1,251 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.config.settings import (
+    DRIFT_MIN_ROWS,
+    DRIFT_PSI_ALERT,
+    DRIFT_PSI_WARNING,
+    DRIFT_WINDOW_ROWS,
+)
+from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.model_registry import get_baseline_path
+
+logger = logging.getLogger(__name__)
+
+# Continuous features the model scales, as emitted by ``preprocess``
+DRIFT_FEATURES = [
+    "Suhu Sealing Vertikal Bawah (oC)",
+    "Suhu Sealing Vertical Atas (oC)",
+    "Suhu Sealing Horizontal Depan/Kanan (oC)",
+    "Suhu Sealing Horizontal Belakang/Kiri (oC )",
+    "Counter Output (pack)",
+    "Counter Reject (pack)",
+    "Speed(rpm)",
+    "Availability(%)",
+    "Performance(%)",
+    "Quality(%)",
+    "OEE(%)",
+    "Downtime_sec",
+    "Output Time_sec",
+    "diff_sealing_vertical",
+    "diff_sealing_horizontal",
+    "diff_output",
+    "diff_counter_output",
+    "diff_counter_reject",
+]
+
+# Flags kept per window slot, so evicting a row undoes its counts
+_OK, _MISSING, _OUT_OF_RANGE = 0, 1, 2
+
+
+def build_baseline(
+    X: pd.DataFrame, features: List[str] = DRIFT_FEATURES, bins: int = 10
+) -> Dict:
+    """Decile bins and bin proportions of preprocessed training rows"""
+    baseline = {}
+    for feature in features:
+        values = X[feature].dropna().to_numpy(dtype=float)
+        quantiles = np.linspace(0, 1, bins + 1)[1:-1]
+        # Discrete features collapse to fewer, unique edges
+        edges = np.unique(np.quantile(values, quantiles))
+        counts = np.bincount(
+            np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1
+        )
+        baseline[feature] = {
+            "edges": edges.tolist(),
+            "proportions": (counts / counts.sum()).tolist(),
+            "min": float(values.min()),
+            "max": float(values.max()),
+            "median": float(np.median(values)),
+        }
+    return baseline
+
+
+def psi(expected: np.ndarray, actual: np.ndarray, eps: float = 1e-4) -> float:
+    """Population stability index between two bin distributions"""
+    expected = np.clip(expected, eps, None)
+    actual = np.clip(actual, eps, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks(expected: np.ndarray, actual: np.ndarray) -> float:
+    """Kolmogorov-Smirnov statistic evaluated at the bin edges"""
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+class DriftMonitor:
+    """
+    Sliding-window feature histograms compared to the training baseline
+
+    Each new row updates one bin per feature and evicts the oldest row of the
+    window, so the cost per row does not depend on how much history exists.
+    """
+
+    def __init__(self, baseline: Dict, window: int = DRIFT_WINDOW_ROWS):
+        self.features = list(baseline["features"])
+        self.baseline = baseline["features"]
+        self.edges = [np.asarray(self.baseline[f]["edges"]) for f in self.features]
+        self.expected = [
+            np.asarray(self.baseline[f]["proportions"]) for f in self.features
+        ]
+        self.low = np.array([self.baseline[f]["min"] for f in self.features])
+        self.high = np.array([self.baseline[f]["max"] for f in self.features])
+
+        n_features = len(self.features)
+        n_bins = max(len(edges) + 1 for edges in self.edges)
+        self.window = window
+        self.counts = np.zeros((n_features, n_bins), dtype=np.int64)
+        self.missing = np.zeros(n_features, dtype=np.int64)
+        self.out_of_range = np.zeros(n_features, dtype=np.int64)
+        self.slot_bins = np.full((window, n_features), -1, dtype=np.int16)
+        self.slot_flags = np.zeros((window, n_features), dtype=np.int8)
+        self.size = 0
+        self.position = 0
+        self.last_time = None
+        self.lock = threading.Lock()
+
+    def _evict(self, slot: int):
+        bins = self.slot_bins[slot]
+        flags = self.slot_flags[slot]
+        valid = bins >= 0
+        self.counts[np.flatnonzero(valid), bins[valid]] -= 1
+        self.missing -= flags == _MISSING
+        self.out_of_range -= flags == _OUT_OF_RANGE
+
+    def _push(self, row: np.ndarray):
+        slot = self.position
+        if self.size == self.window:
+            self._evict(slot)
+        else:
+            self.size += 1
+
+        bins = self.slot_bins[slot]
+        flags = self.slot_flags[slot]
+        for i, value in enumerate(row):
+            if np.isnan(value):
+                bins[i] = -1
+                flags[i] = _MISSING
+                continue
+            bins[i] = np.searchsorted(self.edges[i], value, side="right")
+            flags[i] = (
+                _OUT_OF_RANGE if value < self.low[i] or value > self.high[i] else _OK
+            )
+
+        valid = bins >= 0
+        self.counts[np.flatnonzero(valid), bins[valid]] += 1
+        self.missing += flags == _MISSING
+        self.out_of_range += flags == _OUT_OF_RANGE
+        self.position = (slot + 1) % self.window
+
+    def observe(self, data: pd.DataFrame) -> int:
+        """Add raw datalog rows newer than the last seen row, returns the count"""
+        if data.empty:
+            return 0
+
+        data = data.sort_values("times")
+        with self.lock:
+            new = (
+                data["times"] > self.last_time
+                if self.last_time is not None
+                else pd.Series(True, index=data.index)
+            )
+            n_new = int(new.sum())
+            if n_new == 0:
+                return 0
+
+            # One extra row so the diff features of the first new row are right
+            X = preprocess(data.tail(n_new + 1)).tail(n_new)
+            # The model only scores running rows, so only those are monitored
+            if "Status" in X.columns:
+                X = X[X["Status"] == 2]
+            values = X.reindex(columns=self.features).to_numpy(dtype=float)
+            for row in values:
+                self._push(row)
+
+            self.last_time = data["times"].max()
+            return len(values)
+
+    def _median(self, i: int, proportions: np.ndarray) -> float:
+        # Interpolated inside the bin holding the median. Decile edges put at
+        # most ~10% in the top bin unless its lower edge is a point mass (e.g. a
+        # counter diff that is mostly 0), so that edge is the estimate there.
+        edges = np.concatenate([[self.low[i]], self.edges[i], [self.high[i]]])
+        cumulative = np.cumsum(proportions)
+        b = min(int(np.searchsorted(cumulative, 0.5)), len(proportions) - 1)
+        if b == len(proportions) - 1 and b > 0:
+            return float(edges[b])
+        before = cumulative[b - 1] if b > 0 else 0.0
+        fraction = (0.5 - before) / proportions[b] if proportions[b] else 0.0
+        return float(edges[b] + fraction * (edges[b + 1] - edges[b]))
+
+    def scores(self) -> pd.DataFrame:
+        """PSI, KS and data-quality rates per feature over the current window"""
+        rows = []
+        with self.lock:
+            for i, feature in enumerate(self.features):
+                expected = self.expected[i]
+                valid = self.size - self.missing[i]
+                actual = (
+                    self.counts[i, : len(expected)] / valid
+                    if valid
+                    else np.zeros_like(expected)
+                )
+                drift = psi(expected, actual) if valid else np.nan
+                if not valid or self.size < DRIFT_MIN_ROWS:
+                    status = "Collecting"
+                elif drift >= DRIFT_PSI_ALERT:
+                    status = "Drift"
+                elif drift >= DRIFT_PSI_WARNING:
+                    status = "Shift"
+                else:
+                    status = "Stable"
+
+                rows.append(
+                    {
+                        "feature": feature,
+                        "psi": drift,
+                        "ks": binned_ks(expected, actual) if valid else np.nan,
+                        "median": self._median(i, actual) if valid else np.nan,
+                        "baseline_median": self.baseline[feature]["median"],
+                        "missing_pct": (
+                            self.missing[i] / self.size * 100 if self.size else 0.0
+                        ),
+                        "out_of_range_pct": (
+                            self.out_of_range[i] / self.size * 100 if self.size else 0.0
+                        ),
+                        "status": status,
+                    }
+                )
+        return pd.DataFrame(rows).set_index("feature")
+
+
+# Global drift monitors, one per machine
+_monitors: Dict[str, Optional[DriftMonitor]] = {}
+_monitors_lock = threading.Lock()
+
+
+def load_baseline(path: str) -> Dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def get_drift_monitor(machine_id: str) -> Optional[DriftMonitor]:
+    """The machine's drift monitor, None when its model has no baseline"""
+    if machine_id in _monitors:
+        return _monitors[machine_id]
+
+    with _monitors_lock:
+        if machine_id not in _monitors:
+            path = get_baseline_path(machine_id)
+            if os.path.exists(path):
+                _monitors[machine_id] = DriftMonitor(load_baseline(path))
+            else:
+                logger.warning(f"No drift baseline at {path}, drift monitor is off")
+                _monitors[machine_id] = None
+        return _monitors[machine_id]
@@ -0,0 +1,333 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    func,
+    insert,
+    select,
+)
+
+from src.dashboard.config.settings import (
+    EPISODE_CLOSE_ROWS,
+    EPISODE_FIRST_SCAN_DAYS,
+    EPISODE_HOLD_PROBABILITY,
+    EPISODE_MAX_GAP_MINUTES,
+    EPISODE_OPEN_PROBABILITY,
+)
+from src.dashboard.utils.archive import read_archive
+from src.dashboard.utils.compact import FLAG_COLUMNS, FLOAT32_COLUMNS, INT32_COLUMNS
+from src.dashboard.utils.prediction_store import load_predictions
+from src.dashboard.utils.queries import keyset_page
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per leak episode of a machine and model version. The open episode of
+# a machine is stored too (closed = false) and rewritten until it closes.
+leak_episodes_table = Table(
+    "leak_episodes",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("model_version", String(32), primary_key=True),
+    Column("start", DateTime, primary_key=True),
+    Column("end", DateTime, nullable=False),
+    Column("rows", Integer, nullable=False),
+    Column("leak_rows", Integer, nullable=False),
+    Column("peak_time", DateTime, nullable=False),
+    Column("peak_prediction", String(16), nullable=False),
+    Column("peak_probability", Float, nullable=False),
+    Column("mean_probability", Float, nullable=False),
+    Column("closed", Boolean, nullable=False),
+    # Datalog row at the peak
+    Column("snapshot", JSON),
+    # Fleet-wide lookups by time; per machine the primary key serves them
+    Index("idx_leak_episodes_start", "start"),
+)
+
+# Last prediction time each machine and model version was segmented up to
+episode_progress_table = Table(
+    "leak_episode_progress",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("model_version", String(32), primary_key=True),
+    Column("scanned_until", DateTime, nullable=False),
+)
+
+EPISODE_COLUMNS = [c.name for c in leak_episodes_table.columns]
+ALARM_LABELS = {"Warning", "Leak"}
+SNAPSHOT_COLUMNS = FLOAT32_COLUMNS + INT32_COLUMNS + FLAG_COLUMNS
+
+
+def ensure_episode_tables(engine):
+    """Create the episode store if it does not exist yet"""
+    metadata.create_all(engine, tables=[leak_episodes_table, episode_progress_table])
+
+
+class EpisodeSegmenter:
+    """
+    Merges a time-ordered prediction stream into leak episodes
+
+    Feed it predictions in any number of batches; ``feed`` returns the episodes
+    that closed, ``current`` is the open one. Rows without a prediction (the
+    machine was not running) neither extend nor close an episode.
+    """
+
+    def __init__(
+        self,
+        open_probability: float = EPISODE_OPEN_PROBABILITY,
+        hold_probability: float = EPISODE_HOLD_PROBABILITY,
+        close_rows: int = EPISODE_CLOSE_ROWS,
+        max_gap: pd.Timedelta = pd.Timedelta(minutes=EPISODE_MAX_GAP_MINUTES),
+    ):
+        self.open_probability = open_probability
+        self.hold_probability = hold_probability
+        self.close_rows = close_rows
+        self.max_gap = max_gap
+        self.current: Optional[Dict] = None
+        self.quiet_rows = 0
+        self.last_time: Optional[pd.Timestamp] = None
+
+    def _close(self) -> Dict:
+        episode = self.current
+        episode["mean_probability"] = episode.pop("probability_sum") / episode["rows"]
+        episode["closed"] = True
+        self.current = None
+        self.quiet_rows = 0
+        return episode
+
+    def feed(self, predictions: pd.DataFrame) -> List[Dict]:
+        closed = []
+        for row in predictions[["times", "prediction", "probability"]].itertuples(
+            index=False
+        ):
+            if pd.isna(row.prediction):
+                continue
+            if self.current is not None and row.times - self.last_time > self.max_gap:
+                closed.append(self._close())
+            self.last_time = row.times
+
+            alarm = row.prediction in ALARM_LABELS
+            if self.current is None:
+                if alarm and row.probability >= self.open_probability:
+                    self.current = {
+                        "start": row.times,
+                        "end": row.times,
+                        "rows": 1,
+                        "leak_rows": int(row.prediction == "Leak"),
+                        "peak_time": row.times,
+                        "peak_prediction": row.prediction,
+                        "peak_probability": row.probability,
+                        "probability_sum": row.probability,
+                    }
+                continue
+
+            if alarm and row.probability >= self.hold_probability:
+                episode = self.current
+                episode["end"] = row.times
+                episode["rows"] += 1
+                episode["leak_rows"] += int(row.prediction == "Leak")
+                episode["probability_sum"] += row.probability
+                if row.probability > episode["peak_probability"]:
+                    episode["peak_time"] = row.times
+                    episode["peak_prediction"] = row.prediction
+                    episode["peak_probability"] = row.probability
+                self.quiet_rows = 0
+            else:
+                self.quiet_rows += 1
+                if self.quiet_rows >= self.close_rows:
+                    closed.append(self._close())
+        return closed
+
+    def open_episode(self) -> Optional[Dict]:
+        """Snapshot of the open episode, stored with closed = false"""
+        if self.current is None:
+            return None
+        episode = dict(self.current)
+        episode["mean_probability"] = episode.pop("probability_sum") / episode["rows"]
+        episode["closed"] = False
+        return episode
+
+
+def read_snapshot(conn, table: str, times: datetime) -> Optional[Dict]:
+    """
+    Sensor values of the datalog row at ``times``, one indexed lookup
+
+    Rows of archived months are read from the archive.
+    """
+    end = times + timedelta(seconds=1)
+    row = conn.execute(keyset_page(table, times, end, 1)).mappings().first()
+    if row is None:
+        archived = read_archive(table, times, end)
+        if archived.empty:
+            return None
+        row = archived.iloc[:1].to_dict("records")[0]
+    return {col: row[col] for col in SNAPSHOT_COLUMNS if col in row}
+
+
+def update_episodes(
+    engine,
+    machine_id: str,
+    model_version: str,
+    table: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> int:
+    """
+    Segment stored predictions that arrived since the last run
+
+    Resumes at the open episode, or after the last segmented prediction, so
+    each prediction is read about once. ``since`` re-segments from that time,
+    e.g. after a backfill rewrote older predictions. Returns the number of
+    episodes written.
+    """
+    ensure_episode_tables(engine)
+    key = and_(
+        leak_episodes_table.c.machine_id == machine_id,
+        leak_episodes_table.c.model_version == model_version,
+    )
+    progress_key = and_(
+        episode_progress_table.c.machine_id == machine_id,
+        episode_progress_table.c.model_version == model_version,
+    )
+    until = pd.Timestamp.now() if until is None else pd.Timestamp(until)
+
+    if since is None:
+        with engine.connect() as conn:
+            open_start = conn.execute(
+                select(leak_episodes_table.c.start).where(
+                    key, leak_episodes_table.c.closed.is_(False)
+                )
+            ).scalar()
+            scanned_until = conn.execute(
+                select(episode_progress_table.c.scanned_until).where(progress_key)
+            ).scalar()
+        if open_start is not None:
+            start = pd.Timestamp(open_start)
+        elif scanned_until is not None:
+            # The store ends at the last segmented prediction
+            start = pd.Timestamp(scanned_until) + pd.Timedelta(microseconds=1)
+        else:
+            start = until - pd.Timedelta(days=EPISODE_FIRST_SCAN_DAYS)
+    else:
+        # An episode running across ``since`` is rebuilt from its own start
+        with engine.connect() as conn:
+            spanning = conn.execute(
+                select(func.min(leak_episodes_table.c.start)).where(
+                    key,
+                    leak_episodes_table.c.start < since,
+                    leak_episodes_table.c.end
+                    >= pd.Timestamp(since)
+                    - pd.Timedelta(minutes=EPISODE_MAX_GAP_MINUTES),
+                )
+            ).scalar()
+        start = pd.Timestamp(spanning if spanning is not None else since)
+
+    predictions = load_predictions(
+        engine,
+        machine_id,
+        model_version,
+        start.to_pydatetime(),
+        until.to_pydatetime(),
+    )
+    segmenter = EpisodeSegmenter()
+    episodes = segmenter.feed(predictions)
+    if segmenter.current is not None:
+        episodes.append(segmenter.open_episode())
+
+    records = []
+    with engine.connect() as conn:
+        for episode in episodes:
+            record = {
+                **episode,
+                "machine_id": machine_id,
+                "model_version": model_version,
+            }
+            for col in ["start", "end", "peak_time"]:
+                record[col] = pd.Timestamp(record[col]).to_pydatetime()
+            for col in ["peak_probability", "mean_probability"]:
+                record[col] = float(record[col])
+            record["snapshot"] = read_snapshot(conn, table, record["peak_time"])
+            records.append(record)
+
+    scanned_until = predictions["times"].max() if not predictions.empty else None
+    with engine.begin() as conn:
+        # Episodes from ``start`` on are rebuilt, including the open one
+        conn.execute(
+            delete(leak_episodes_table).where(
+                key, leak_episodes_table.c.start >= start.to_pydatetime()
+            )
+        )
+        if records:
+            conn.execute(insert(leak_episodes_table), records)
+        if scanned_until is not None or since is not None:
+            conn.execute(delete(episode_progress_table).where(progress_key))
+            conn.execute(
+                insert(episode_progress_table),
+                {
+                    "machine_id": machine_id,
+                    "model_version": model_version,
+                    "scanned_until": pd.Timestamp(
+                        scanned_until if scanned_until is not None else start
+                    ).to_pydatetime(),
+                },
+            )
+
+    if records:
+        logger.info(
+            f"Stored {len(records)} leak episodes for {machine_id} "
+            f"({len(predictions)} predictions since {start})"
+        )
+    return len(records)
+
+
+def load_episodes(
+    engine,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    """Episodes of one machine starting in [start, end), oldest first"""
+    ensure_episode_tables(engine)
+    query = (
+        select(leak_episodes_table)
+        .where(
+            leak_episodes_table.c.machine_id == machine_id,
+            leak_episodes_table.c.model_version == model_version,
+            leak_episodes_table.c.start >= start,
+            leak_episodes_table.c.start < end,
+        )
+        .order_by(leak_episodes_table.c.start)
+    )
+    with engine.connect() as conn:
+        episodes = pd.read_sql(query, conn, parse_dates=["start", "end", "peak_time"])
+
+    if episodes.empty:
+        return episodes
+    episodes["duration_min"] = (
+        episodes["end"] - episodes["start"]
+    ).dt.total_seconds() / 60
+    snapshots = pd.json_normalize(
+        [
+            snapshot if isinstance(snapshot, dict) else {}
+            for snapshot in episodes["snapshot"]
+        ]
+    )
+    return pd.concat(
+        [episodes.drop(columns=["machine_id", "snapshot"]), snapshots], axis=1
+    )
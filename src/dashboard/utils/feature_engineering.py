@@ -3,6 +3,11 @@ import pandas as pd
 
 def preprocess(data: pd.DataFrame) -> pd.DataFrame:
     X = data.copy()
+    # Compacted float32 sensors are widened again. Rounding recovers the logged
+    # decimals exactly, so the model sees the same values it was trained on.
+    float32_cols = X.select_dtypes("float32").columns
+    X[float32_cols] = X[float32_cols].astype("float64").round(4)
+
     # Convert to second
     time_cols = [
         "Downtime (hh:mm:ss)",
@@ -11,7 +16,10 @@ def preprocess(data: pd.DataFrame) -> pd.DataFrame:
     ]
 
     for col in time_cols:
-        X[col.split(" (")[0] + "_sec"] = pd.to_timedelta(X[col]).dt.total_seconds()
+        # Compacted frames already carry the parsed seconds
+        sec_col = col.split(" (")[0] + "_sec"
+        if sec_col not in X.columns:
+            X[sec_col] = pd.to_timedelta(X[col]).dt.total_seconds()
 
     if "times" in X.columns:
         X["day"] = X["times"].dt.day
@@ -0,0 +1,35 @@
+from typing import Callable, Optional, Sequence
+
+import pandas as pd
+
+from src.dashboard.utils.cache import frame_hash, get_cache
+from src.dashboard.utils.instrumentation import span
+
+
+def figure_size(figure) -> int:
+    # Streamlit sends figures as JSON, so that is what an entry costs
+    return len(figure.to_json(validate=False))
+
+
+def cached_figure(
+    chart_id: str,
+    machine_id: str,
+    time_range: str,
+    df: pd.DataFrame,
+    build: Callable,
+    columns: Optional[Sequence[str]] = None,
+):
+    """
+    Figure ``chart_id`` of ``df``, built once per machine, range and data
+
+    Figures live in the "figures" namespace of the shared cache, so every
+    session showing the same chart of the same data gets the same object.
+    Cached figures are shared and must not be modified.
+    """
+    key = (chart_id, machine_id, time_range, frame_hash(df, columns))
+
+    def build_figure():
+        with span("figure_build"):
+            return build()
+
+    return get_cache().get_or_set("figures", key, build_figure, sizeof=figure_size)
@@ -0,0 +1,134 @@
+import threading
+from typing import Dict, Tuple
+
+import pandas as pd
+
+from src.dashboard.config.settings import (
+    FAST_PATH_MIN_REJECT_STD,
+    FAST_PATH_MIN_ROWS,
+    FAST_PATH_MIN_TEMP_STD,
+    FAST_PATH_SCORE_EVERY,
+    FAST_PATH_Z_THRESHOLD,
+    TEMP_DANGER_THRESHOLD,
+    TEMP_WARNING_THRESHOLD,
+)
+from src.dashboard.utils.rolling import TEMPERATURE_COLUMNS, get_rolling_stats
+
+
+def _row_time(data: pd.DataFrame):
+    # Tabs pass frames indexed by times, the app passes a times column
+    return data["times"].iloc[0] if "times" in data.columns else data.index[0]
+
+
+class FastPathGate:
+    """
+    Cheap first stage that decides whether a row needs the full model
+
+    A row goes to the model when a sealing temperature leaves the
+    [TEMP_WARNING_THRESHOLD, TEMP_DANGER_THRESHOLD) band, deviates from the
+    1 h rolling mean by FAST_PATH_Z_THRESHOLD sigma, the reject delta jumps
+    against its 1 h rolling window, and on every FAST_PATH_SCORE_EVERY-th row
+    as a safety net. Otherwise the last model result of the machine is reused.
+    """
+
+    def __init__(self, machine_id: str, score_every: int = FAST_PATH_SCORE_EVERY):
+        self.machine_id = machine_id
+        self.score_every = score_every
+        self.last_time = None
+        self.last_decision: Tuple[bool, str] = (True, "first row")
+        self.last_result = None
+        self.result_time = None
+        self.rows_since_model = 0
+        self.model_rows = 0
+        self.skipped_rows = 0
+        self.lock = threading.Lock()
+
+    def _evaluate(self, data: pd.DataFrame) -> Tuple[bool, str]:
+        row = data.iloc[0]
+
+        for col in TEMPERATURE_COLUMNS:
+            if not TEMP_WARNING_THRESHOLD <= row[col] < TEMP_DANGER_THRESHOLD:
+                return True, f"{col} outside the operating band"
+
+        # Compared to the rolling windows before this row is added to them
+        window = get_rolling_stats(self.machine_id).snapshot("1 h")
+
+        reject = window.loc["diff_counter_reject"]
+        if len(data) < 2 or reject["count"] < FAST_PATH_MIN_ROWS:
+            return True, "reject history warming up"
+        delta = row["Counter Reject (pack)"] - data.iloc[1]["Counter Reject (pack)"]
+        std = max(reject["std"], FAST_PATH_MIN_REJECT_STD)
+        if (delta - reject["mean"]) / std >= FAST_PATH_Z_THRESHOLD:
+            return True, "reject delta spike"
+
+        for col in TEMPERATURE_COLUMNS:
+            if window.loc[col, "count"] < FAST_PATH_MIN_ROWS:
+                return True, "temperature history warming up"
+            std = max(window.loc[col, "std"], FAST_PATH_MIN_TEMP_STD)
+            if abs(row[col] - window.loc[col, "mean"]) / std >= FAST_PATH_Z_THRESHOLD:
+                return True, f"{col} z-score"
+
+        if self.last_result is None:
+            return True, "no model result yet"
+        if self.rows_since_model + 1 >= self.score_every:
+            return True, f"every {self.score_every}th row"
+        return False, "steady state"
+
+    def check(self, data: pd.DataFrame) -> Tuple[bool, str]:
+        """Decide for the newest row of ``data`` (newest first), once per row"""
+        with self.lock:
+            row_time = _row_time(data)
+            # Every session reruns on the same row, only the first one decides
+            if row_time == self.last_time:
+                return self.last_decision
+
+            self.last_time = row_time
+            self.last_decision = self._evaluate(data)
+            if self.last_decision[0]:
+                self.model_rows += 1
+                self.rows_since_model = 0
+            else:
+                self.skipped_rows += 1
+                self.rows_since_model += 1
+            return self.last_decision
+
+    def reuse(self, data: pd.DataFrame):
+        """The result to reuse for the newest row, None when the model must run"""
+        needs_model, _ = self.check(data)
+        with self.lock:
+            # A row another session already scored is not scored again
+            if not needs_model or self.result_time == _row_time(data):
+                return self.last_result
+        return None
+
+    def record(self, data: pd.DataFrame, result):
+        """Keep the model result of the newest row for steady-state rows"""
+        with self.lock:
+            self.last_result = result
+            self.result_time = _row_time(data)
+
+    def stats(self) -> Dict:
+        total = self.model_rows + self.skipped_rows
+        return {
+            "model_rows": self.model_rows,
+            "skipped_rows": self.skipped_rows,
+            "skipped_pct": self.skipped_rows / total * 100 if total else 0.0,
+            "last_reason": self.last_decision[1],
+        }
+
+
+# Global fast-path gates, one per machine
+_gates: Dict[str, FastPathGate] = {}
+_gates_lock = threading.Lock()
+
+
+def get_gate(machine_id: str) -> FastPathGate:
+    with _gates_lock:
+        if machine_id not in _gates:
+            _gates[machine_id] = FastPathGate(machine_id)
+        return _gates[machine_id]
+
+
+def get_gate_stats() -> Dict[str, Dict]:
+    with _gates_lock:
+        return {machine_id: gate.stats() for machine_id, gate in _gates.items()}
@@ -16,14 +16,17 @@ def get_machine_status(df):
 
     latest = df.iloc[0]
 
-    if "Output Time (hh:mm:ss)" in df.columns:
-        df["Output Time (s)"] = df["Output Time (hh:mm:ss)"].apply(
-            convert_time_to_seconds
-        )
+    # Compacted frames carry the seconds parsed at load time
+    if "Output Time_sec" in df.columns:
+        output_time = df["Output Time_sec"]
+    elif "Output Time (hh:mm:ss)" in df.columns:
+        output_time = df["Output Time (hh:mm:ss)"].apply(convert_time_to_seconds)
+    else:
+        output_time = None
+
+    if output_time is not None:
         latest_output_time_diff = (
-            df["Output Time (s)"].iloc[0] - df["Output Time (s)"].iloc[1]
-            if len(df) > 1
-            else 0
+            output_time.iloc[0] - output_time.iloc[1] if len(df) > 1 else 0
         )
     else:
         latest_output_time_diff = 0
@@ -34,7 +37,10 @@ def get_machine_status(df):
         return "Running", "🟢", latest_output_time_diff
     elif latest["Status"] == 1 and latest["Speed(rpm)"] == 0:
         return "Idle", "🟡", latest_output_time_diff
-    elif latest["Status"] == 3 or latest["Counter Reject (pack)"].diff() > 0:
+    elif latest["Status"] == 3 or (
+        len(df) > 1
+        and df["Counter Reject (pack)"].iloc[0] > df["Counter Reject (pack)"].iloc[1]
+    ):
         return "Breakdown", "🔴", latest_output_time_diff
 
     return "Unknown", "⚪", latest_output_time_diff
@@ -54,7 +60,7 @@ def preprocess_dataframe(df: pd.DataFrame, set_index: bool = True) -> pd.DataFra
 
     df = df.copy()
 
-    numeric_cols = df.select_dtypes(include=["float64", "int64"]).columns
+    numeric_cols = df.select_dtypes(include="number").columns
     df[numeric_cols] = df[numeric_cols].fillna(method="ffill").fillna(method="bfill")
 
     # Set index jika diperlukan
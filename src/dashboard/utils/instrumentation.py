@@ -0,0 +1,242 @@
+import cProfile
+import functools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Startup phases are measured from the first import of this module, which
+# app.py does before any heavy dependency
+_process_start = time.perf_counter()
+_startup: Dict[str, float] = {}
+_startup_lock = threading.Lock()
+
+# Bucket upper bounds in seconds, same spirit as the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not thread-safe, guarded by the registry)"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside the bucket"""
+        if self.count == 0:
+            return 0.0
+
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, count in enumerate(self.counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+            if cumulative + count >= rank and count > 0:
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = upper
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """Process-wide span registry shared by every Streamlit session"""
+
+    def __init__(self):
+        self.histograms: Dict[str, Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        with self.lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.observe(seconds)
+            if error:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """Per-span count, error count and latency estimates in milliseconds"""
+        with self.lock:
+            return {
+                name: {
+                    "count": h.count,
+                    "errors": self.errors.get(name, 0),
+                    "mean_ms": h.total / h.count * 1000 if h.count else 0.0,
+                    "p50_ms": h.quantile(0.5) * 1000,
+                    "p95_ms": h.quantile(0.95) * 1000,
+                    "total_s": h.total,
+                }
+                for name, h in sorted(self.histograms.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Render all spans in the Prometheus text exposition format"""
+        lines = [
+            "# HELP pdm_span_duration_seconds Time spent in instrumented dashboard code",
+            "# TYPE pdm_span_duration_seconds histogram",
+        ]
+        with self.lock:
+            for name, h in sorted(self.histograms.items()):
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(
+                        f'pdm_span_duration_seconds_bucket{{span="{name}",le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'pdm_span_duration_seconds_bucket{{span="{name}",le="+Inf"}} {h.count}'
+                )
+                lines.append(
+                    f'pdm_span_duration_seconds_sum{{span="{name}"}} {h.total}'
+                )
+                lines.append(
+                    f'pdm_span_duration_seconds_count{{span="{name}"}} {h.count}'
+                )
+
+            lines.append("# HELP pdm_span_errors_total Instrumented calls that raised")
+            lines.append("# TYPE pdm_span_errors_total counter")
+            for name, errors in sorted(self.errors.items()):
+                lines.append(f'pdm_span_errors_total{{span="{name}"}} {errors}')
+
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.errors.clear()
+
+
+# Global metrics registry
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    return _registry
+
+
+@contextmanager
+def span(name: str):
+    """Time a block of code and record it under ``name``"""
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except Exception:
+        error = True
+        raise
+    finally:
+        _registry.observe(name, time.perf_counter() - start, error=error)
+
+
+def traced(name: Optional[str] = None):
+    """Decorator version of :func:`span`, defaults to the function name"""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def mark_startup(phase: str):
+    """Record when ``phase`` is first reached, in seconds since process start"""
+    with _startup_lock:
+        if phase in _startup:
+            return
+        elapsed = time.perf_counter() - _process_start
+        _startup[phase] = elapsed
+
+    _registry.observe(f"startup_{phase}", elapsed)
+    logger.info(f"Startup: {phase} after {elapsed:.2f}s")
+
+
+def startup_report() -> Dict[str, float]:
+    """Startup phases reached so far, in order"""
+    with _startup_lock:
+        return dict(sorted(_startup.items(), key=lambda item: item[1]))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip("/") not in ("", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = _registry.render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood the Streamlit log
+        pass
+
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int):
+    """Serve /metrics on ``port`` from a daemon thread, once per process"""
+    global _metrics_server
+
+    if not port:
+        return
+
+    with _metrics_server_lock:
+        if _metrics_server is not None:
+            return
+        try:
+            _metrics_server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        except OSError as e:
+            logger.error(f"Could not start metrics endpoint on port {port}: {str(e)}")
+            return
+
+        threading.Thread(
+            target=_metrics_server.serve_forever, name="pdm-metrics", daemon=True
+        ).start()
+        logger.info(f"Metrics endpoint listening on :{port}/metrics")
+
+
+@contextmanager
+def profile_rerun(profile_dir: Optional[str]):
+    """Dump a cProfile of the wrapped rerun into ``profile_dir`` when set"""
+    if not profile_dir:
+        yield
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, f"rerun-{time.time_ns()}.prof")
+            profiler.dump_stats(path)
+        except OSError as e:
+            logger.error(f"Could not write rerun profile: {str(e)}")
@@ -0,0 +1,93 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Dict, Optional
+
+from src.dashboard.config.settings import (
+    HEALTH_QUERY_TIMEOUT,
+    HISTORICAL_QUERY_TIMEOUT,
+    LATEST_QUERY_TIMEOUT,
+    LOADER_MAX_WORKERS,
+)
+from src.dashboard.utils.database import (
+    check_connection,
+    fetch_historical_data,
+    fetch_latest_data,
+)
+
+logger = logging.getLogger(__name__)
+
+# Shared by all sessions, bounds the number of concurrent dashboard queries
+_executor = ThreadPoolExecutor(
+    max_workers=LOADER_MAX_WORKERS, thread_name_prefix="pdm-loader"
+)
+
+
+class QueryTimeout(Exception):
+    """A dashboard query did not finish within its timeout"""
+
+
+class DashboardLoad:
+    """
+    Latest, historical and health queries running concurrently
+
+    Queries start as soon as the load is created. Results are collected in any
+    order, so the page can render the latest row while history is still loading.
+    """
+
+    timeouts = {
+        "latest": LATEST_QUERY_TIMEOUT,
+        "historical": HISTORICAL_QUERY_TIMEOUT,
+        "health": HEALTH_QUERY_TIMEOUT,
+    }
+
+    def __init__(
+        self,
+        uri: str,
+        table: str,
+        time_range: str,
+        max_records: int,
+        load_latest: bool = True,
+        preloaded: Optional[Dict[str, Any]] = None,
+    ):
+        # Results already in memory (shared data plane) are not queried
+        self.futures: Dict[str, Future] = {}
+        for name, value in (preloaded or {}).items():
+            self.futures[name] = Future()
+            self.futures[name].set_result(value)
+        if "health" not in self.futures:
+            self.futures["health"] = _executor.submit(check_connection, uri, table)
+        if "historical" not in self.futures:
+            self.futures["historical"] = _executor.submit(
+                fetch_historical_data, uri, time_range, max_records, table
+            )
+        # The change feed buffer already holds the latest rows when it is on
+        if load_latest:
+            self.futures["latest"] = _executor.submit(fetch_latest_data, uri, 20, table)
+
+    def result(self, name: str) -> Any:
+        """Wait for one query, raising QueryTimeout or the query's own error"""
+        future = self.futures[name]
+        try:
+            return future.result(timeout=self.timeouts[name])
+        except FutureTimeoutError:
+            # Drops the query if it never started; a running one is abandoned
+            future.cancel()
+            logger.warning(f"{name} query timed out after {self.timeouts[name]}s")
+            raise QueryTimeout(f"{name} query timed out after {self.timeouts[name]}s")
+
+    def cancel(self):
+        """Cancel queries that have not started yet"""
+        for future in self.futures.values():
+            future.cancel()
+
+
+def start_dashboard_load(
+    uri: str,
+    table: str,
+    time_range: str,
+    max_records: int = 1000,
+    load_latest: bool = True,
+    preloaded: Optional[Dict[str, Any]] = None,
+) -> DashboardLoad:
+    return DashboardLoad(uri, table, time_range, max_records, load_latest, preloaded)
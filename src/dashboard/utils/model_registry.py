@@ -0,0 +1,129 @@
+import logging
+import pickle
+import threading
+from typing import TYPE_CHECKING, Dict, List, Set
+
+from src.dashboard.config.settings import (
+    BASELINE_PATH_TEMPLATE,
+    MACHINES,
+    MODEL_PATH_TEMPLATE,
+)
+from src.dashboard.utils.instrumentation import mark_startup
+
+# sklearn and LightGBM are imported by unpickling, not at module import
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+logger = logging.getLogger(__name__)
+
+# Loaded models keyed by file path, so lines sharing a model share one object
+_models: Dict[str, "Pipeline"] = {}
+_models_lock = threading.Lock()
+_missing_shadows: Set[str] = set()
+
+
+def get_machine(machine_id: str) -> Dict:
+    """Look up a machine in the registry"""
+    if machine_id not in MACHINES:
+        raise KeyError(f"Unknown machine: {machine_id}")
+    return MACHINES[machine_id]
+
+
+def _artifact_path(machine_id: str, template: str) -> str:
+    machine = get_machine(machine_id)
+    version = machine["model_version"]
+    return template.format(
+        major=version.split(".")[0],
+        model=machine["model"],
+        version=version,
+    )
+
+
+def get_model_path(machine_id: str) -> str:
+    """Resolve the model pickle configured for a machine"""
+    return _artifact_path(machine_id, MODEL_PATH_TEMPLATE)
+
+
+def get_baseline_path(machine_id: str) -> str:
+    """Resolve the training baseline that belongs to a machine's model"""
+    return _artifact_path(machine_id, BASELINE_PATH_TEMPLATE)
+
+
+def _load(path: str) -> "Pipeline":
+    model = _models.get(path)
+    if model is not None:
+        return model
+
+    with _models_lock:
+        if path not in _models:
+            logger.info(f"Loading model {path}")
+            with open(path, "rb") as f:
+                _models[path] = pickle.load(f)
+        return _models[path]
+
+
+def get_model(machine_id: str) -> "Pipeline":
+    """Load the model of a machine once per process"""
+    return _load(get_model_path(machine_id))
+
+
+def get_primary_name(machine_id: str) -> str:
+    machine = get_machine(machine_id)
+    return f"{machine['model']}:{machine['model_version']}"
+
+
+def get_shadow_path(shadow: str) -> str:
+    """Resolve a shadow entry, either a .pkl path or model:version"""
+    if shadow.endswith(".pkl"):
+        return shadow
+    model, version = shadow.split(":")
+    return MODEL_PATH_TEMPLATE.format(
+        major=version.split(".")[0], model=model, version=version
+    )
+
+
+def get_shadow_models(machine_id: str) -> Dict[str, "Pipeline"]:
+    """Shadow models of a machine by name, loaded once per process"""
+    shadows = {}
+    for shadow in get_machine(machine_id)["shadows"]:
+        if shadow in _missing_shadows:
+            continue
+        try:
+            shadows[shadow] = _load(get_shadow_path(shadow))
+        except Exception as e:
+            # Logged once, a broken shadow must not slow down scoring
+            logger.error(f"Shadow model {shadow} unavailable: {str(e)}")
+            _missing_shadows.add(shadow)
+    return shadows
+
+
+def group_by_model(machine_ids: List[str]) -> Dict[str, List[str]]:
+    """Group machines by model path so each model is scored in one pass"""
+    groups: Dict[str, List[str]] = {}
+    for machine_id in machine_ids:
+        groups.setdefault(get_model_path(machine_id), []).append(machine_id)
+    return groups
+
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+
+def warm_up_models(machine_ids: List[str]):
+    """Load every configured model in a background thread, once per process"""
+    global _warm_up_started
+
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+
+    def warm_up():
+        for model_path, ids in group_by_model(machine_ids).items():
+            try:
+                get_model(ids[0])
+            except Exception as e:
+                logger.error(f"Model warm-up failed for {model_path}: {str(e)}")
+        mark_startup("model_ready")
+
+    threading.Thread(target=warm_up, name="pdm-model-warm-up", daemon=True).start()
@@ -1,68 +1,18 @@
+import time
 import pandas as pd
 import numpy as np
-from sklearn.pipeline import Pipeline
+from src.dashboard.config.settings import EXPLAIN_TOP_K, FAST_PATH_ENABLED
+from src.dashboard.utils.cache import frame_hash, get_cache
 from src.dashboard.utils.feature_engineering import preprocess
+from src.dashboard.utils.gate import get_gate
+from src.dashboard.utils.instrumentation import span, traced
+from src.dashboard.utils.model_registry import get_model, group_by_model
+from src.dashboard.utils.shadow import get_shadow_scorer
 import streamlit as st
-from typing import Dict, List, Tuple, Optional
-import threading
-import time
-
-
-class PredictionCache:
-    """Thread-safe prediction cache for better performance"""
+from typing import TYPE_CHECKING, Dict, List, Tuple, Optional
 
-    def __init__(self, max_size: int = 1000, ttl: int = 60):
-        self.cache = {}
-        self.timestamps = {}
-        self.max_size = max_size
-        self.ttl = ttl
-        self.lock = threading.Lock()
-
-    def _generate_key(self, data: pd.DataFrame) -> str:
-        """Generate cache key from DataFrame hash"""
-        try:
-            # Use first and last row data + shape as key
-            if len(data) > 0:
-                first_row = str(data.iloc[0].values)
-                last_row = str(data.iloc[-1].values) if len(data) > 1 else ""
-                return f"{len(data)}_{hash(first_row + last_row)}"
-            return "empty"
-        except:
-            return str(time.time())
-
-    def get(self, data: pd.DataFrame) -> Optional[Tuple]:
-        """Get cached prediction if available and fresh"""
-        key = self._generate_key(data)
-
-        with self.lock:
-            if key in self.cache:
-                if time.time() - self.timestamps[key] < self.ttl:
-                    return self.cache[key]
-                else:
-                    del self.cache[key]
-                    del self.timestamps[key]
-
-        return None
-
-    def set(self, data: pd.DataFrame, result: Tuple):
-        """Cache prediction result"""
-        key = self._generate_key(data)
-
-        with self.lock:
-            # Remove oldest entries if cache is full
-            if len(self.cache) >= self.max_size:
-                oldest_key = min(
-                    self.timestamps.keys(), key=lambda k: self.timestamps[k]
-                )
-                del self.cache[oldest_key]
-                del self.timestamps[oldest_key]
-
-            self.cache[key] = result
-            self.timestamps[key] = time.time()
-
-
-# Global prediction cache
-_prediction_cache = PredictionCache()
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
 
 
 def preprocess_for_inference(data: pd.DataFrame) -> pd.DataFrame:
@@ -70,84 +20,90 @@ def preprocess_for_inference(data: pd.DataFrame) -> pd.DataFrame:
     if data.empty:
         return data
 
-    # Use cached preprocessing if available
-    cache_key = f"preprocess_{hash(str(data.values.tobytes()))}"
-
-    # Check if we have processed this data recently
-    if hasattr(st.session_state, "preprocess_cache"):
-        if cache_key in st.session_state.preprocess_cache:
-            cache_time, cached_result = st.session_state.preprocess_cache[cache_key]
-            if time.time() - cache_time < 30:  # 30 second cache
-                return cached_result
-    else:
-        st.session_state.preprocess_cache = {}
-
-    # Process data
-    processed_data = preprocess(data)
-
-    # Cache result
-    st.session_state.preprocess_cache[cache_key] = (time.time(), processed_data)
-
-    # Clean old cache entries
-    current_time = time.time()
-    st.session_state.preprocess_cache = {
-        k: v
-        for k, v in st.session_state.preprocess_cache.items()
-        if current_time - v[0] < 300
-    }
-
-    return processed_data
+    def run():
+        with span("preprocess"):
+            return preprocess(data)
 
+    # Shared by all sessions, viewers of one machine preprocess the same rows
+    return get_cache().get_or_set("preprocess", frame_hash(data), run)
 
-@st.cache_data(ttl=30, max_entries=10)
-def batch_inference_cached(
-    data_hash: str,
-    _estimator: Pipeline,
-    classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
-) -> Tuple[List[str], List[float]]:
-    """Cached version of batch inference using data hash"""
-    # This function gets the actual data from session state
-    if "temp_inference_data" not in st.session_state:
-        return [], []
-
-    data = st.session_state.temp_inference_data
 
-    if data.empty:
-        return [], []
-
-    # Preprocess data
+def _predict_batches(
+    data: pd.DataFrame,
+    _estimator: "Pipeline",
+    classes: Dict,
+    machine_id: Optional[str] = None,
+) -> Tuple[List[str], List[float], pd.Series]:
     X = preprocess_for_inference(data)
 
     # Batch processing with optimized batch size
     batch_size = min(50, len(X))  # Smaller batches for better performance
     predictions = []
     probabilities = []
+    model_seconds = 0.0
 
-    try:
-        for i in range(0, len(X), batch_size):
-            batch = X.iloc[i : i + batch_size]
+    for i in range(0, len(X), batch_size):
+        batch = X.iloc[i : i + batch_size]
 
-            # Predict in batches
+        # Predict in batches
+        started = time.perf_counter()
+        with span("model_predict"):
             batch_preds = _estimator.predict(batch)
             batch_probs = _estimator.predict_proba(batch)
-
-            # Convert predictions
-            batch_pred_labels = [classes.get(pred, "Unknown") for pred in batch_preds]
-            batch_max_probs = [probs.max() for probs in batch_probs]
-
-            predictions.extend(batch_pred_labels)
-            probabilities.extend(batch_max_probs)
-
-    except Exception as e:
-        st.error(f"Error in batch inference: {str(e)}")
-        return [], []
-
-    return predictions, probabilities
-
-
+        model_seconds += time.perf_counter() - started
+
+        # Convert predictions
+        batch_pred_labels = [classes.get(pred, "Unknown") for pred in batch_preds]
+        batch_max_probs = [probs.max() for probs in batch_probs]
+
+        predictions.extend(batch_pred_labels)
+        probabilities.extend(batch_max_probs)
+
+    primary = pd.DataFrame(
+        {"prediction": predictions, "probability": probabilities}, index=X.index
+    )
+    # Explained here, so showing them costs nothing per render
+    explanations = _explain_batches(X, _estimator, primary, classes, machine_id)
+
+    # Shadow models reuse this feature matrix on their own thread
+    scorer = get_shadow_scorer()
+    if scorer is not None and machine_id is not None and len(X):
+        scorer.submit(machine_id, X, primary, model_seconds)
+
+    return predictions, probabilities, explanations
+
+
+def _explain_batches(
+    X: pd.DataFrame,
+    _estimator: "Pipeline",
+    scored: pd.DataFrame,
+    classes: Dict,
+    machine_id: Optional[str],
+) -> pd.Series:
+    """Contributions of the Warning/Leak rows, only new rows reach the model"""
+    flagged = scored["prediction"].isin(["Warning", "Leak"]).to_numpy()
+    times = X["times"] if "times" in X.columns else X.index.to_series()
+    # The history window moves by one row per refresh, rows are keyed by time
+    keys = [(machine_id, id(_estimator), time) for time in times[flagged]]
+
+    cache = get_cache()
+    contributions = [cache.get("explanations", key) for key in keys]
+    missing = [i for i, value in enumerate(contributions) if value is None]
+    if missing:
+        rows = X.index[flagged][missing]
+        explained = explain_frame(X.loc[rows], _estimator, scored.loc[rows], classes)[
+            "contributions"
+        ]
+        for i, value in zip(missing, explained):
+            cache.set("explanations", keys[i], value)
+            contributions[i] = value
+    return pd.Series(contributions, index=X.index[flagged], dtype="object")
+
+
+@traced()
 def batch_inference(
     data: pd.DataFrame,
-    _estimator: Pipeline,
+    _estimator: "Pipeline",
     classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
 ) -> Tuple[List[str], List[float]]:
     """
@@ -156,42 +112,55 @@ def batch_inference(
     if data.empty:
         return [], []
 
-    # Check cache first
-    cached_result = _prediction_cache.get(data)
-    if cached_result is not None:
-        return cached_result
-
-    # Generate hash for caching
-    data_hash = hash(str(data.values.tobytes()))
+    try:
+        predictions, probabilities, _ = _cached_batches(data, _estimator, classes)
+        return predictions, probabilities
+    except Exception as e:
+        st.error(f"Error in batch inference: {str(e)}")
+        return [], []
 
-    # Store data temporarily for cached function
-    st.session_state.temp_inference_data = data
 
-    try:
-        # Use cached function
-        predictions, probabilities = batch_inference_cached(
-            str(data_hash), _estimator, classes
-        )
+def _cached_batches(data: pd.DataFrame, _estimator: "Pipeline", classes: Dict):
+    # The estimator is loaded once per process, so its id names the model
+    key = (id(_estimator), frame_hash(data))
+    machine_id = st.session_state.get("machine_id")
+    return get_cache().get_or_set(
+        "batch_prediction",
+        key,
+        lambda: _predict_batches(data, _estimator, classes, machine_id),
+    )
 
-        # Cache the result
-        result = (predictions, probabilities)
-        _prediction_cache.set(data, result)
 
-        return result
+def batch_explanations(
+    data: pd.DataFrame,
+    _estimator: "Pipeline",
+    classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
+) -> pd.Series:
+    """
+    Top feature contributions of the Warning/Leak rows scored by ``batch_inference``
 
-    finally:
-        # Clean up temporary data
-        if "temp_inference_data" in st.session_state:
-            del st.session_state.temp_inference_data
+    Read from the same cache entry, the model is not called again.
+    """
+    if data.empty:
+        return pd.Series(dtype="object")
+    try:
+        return _cached_batches(data, _estimator, classes)[2]
+    except Exception as e:
+        st.error(f"Error loading explanations: {str(e)}")
+        return pd.Series(dtype="object")
 
 
+@traced()
 def inference(
     data: pd.DataFrame,
-    _estimator: Pipeline,
+    _estimator: "Pipeline",
     classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
+    machine_id: Optional[str] = None,
 ) -> Tuple[str, np.ndarray]:
     """
     Optimized single inference
+
+    Steady-state rows reuse the machine's last model result, see ``FastPathGate``.
     """
     if data.empty:
         return "Unknown", np.array([0, 0, 0])
@@ -201,45 +170,39 @@ def inference(
     if first_status != 2:
         return "Excluded", np.array([0, 0, 0])
 
+    machine_id = machine_id or st.session_state.get("machine_id")
+    gate = get_gate(machine_id) if FAST_PATH_ENABLED and machine_id else None
+    if gate is not None:
+        with span("fast_path"):
+            result = gate.reuse(data)
+        if result is not None:
+            return result
+
     try:
         # Use only the first row for single inference
         single_row = data.iloc[[0]]
 
         # Check if we have this exact prediction cached
-        cache_key = f"single_{hash(str(single_row.values.tobytes()))}"
-
-        if hasattr(st.session_state, "single_prediction_cache"):
-            if cache_key in st.session_state.single_prediction_cache:
-                cache_time, cached_result = st.session_state.single_prediction_cache[
-                    cache_key
-                ]
-                if (
-                    time.time() - cache_time < 15
-                ):  # 15 second cache for single predictions
-                    return cached_result
-        else:
-            st.session_state.single_prediction_cache = {}
+        cache = get_cache()
+        cache_key = (id(_estimator), frame_hash(single_row))
+        cached_result = cache.get("single_prediction", cache_key)
+        if cached_result is not None:
+            return cached_result
 
         # Preprocess single row
         X = preprocess_for_inference(single_row)
 
         # Make prediction
-        pred_num = _estimator.predict(X)[0]
+        with span("model_predict"):
+            pred_num = _estimator.predict(X)[0]
+            probs = _estimator.predict_proba(X)[0]
         pred_label = classes.get(pred_num, "Unknown")
-        probs = _estimator.predict_proba(X)[0]
 
         result = (pred_label, probs)
+        if gate is not None:
+            gate.record(data, result)
 
-        # Cache result
-        st.session_state.single_prediction_cache[cache_key] = (time.time(), result)
-
-        # Clean old cache entries
-        current_time = time.time()
-        st.session_state.single_prediction_cache = {
-            k: v
-            for k, v in st.session_state.single_prediction_cache.items()
-            if current_time - v[0] < 60
-        }
+        cache.set("single_prediction", cache_key, result)
 
         return result
 
@@ -248,6 +211,139 @@ def inference(
         return "Error", np.array([0, 0, 0])
 
 
+def score_frame(
+    X: pd.DataFrame,
+    _estimator: "Pipeline",
+    classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
+) -> pd.DataFrame:
+    """
+    Score preprocessed rows in one vectorized call, without Streamlit state
+
+    Returns the label, max probability and per-class probabilities per row.
+    """
+    with span("model_predict"):
+        probs = _estimator.predict_proba(X)
+
+    labels = [classes.get(c, "Unknown") for c in _estimator.classes_]
+    scored = pd.DataFrame(
+        probs, index=X.index, columns=[f"prob_{label.lower()}" for label in labels]
+    )
+    scored.insert(0, "prediction", np.asarray(labels)[probs.argmax(axis=1)])
+    scored.insert(1, "probability", probs.max(axis=1))
+    if "times" in X.columns:
+        scored.insert(0, "times", X["times"])
+    return scored
+
+
+def feature_names(_estimator: "Pipeline") -> List[str]:
+    """Model input columns, without the ColumnTransformer prefixes"""
+    names = _estimator.named_steps["prep"].get_feature_names_out()
+    return [name.split("__", 1)[-1] for name in names]
+
+
+def explain_frame(
+    X: pd.DataFrame,
+    _estimator: "Pipeline",
+    scored: pd.DataFrame,
+    classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
+    top_k: int = EXPLAIN_TOP_K,
+) -> pd.DataFrame:
+    """
+    Strongest feature contributions of the predicted class for Warning/Leak rows
+
+    One LightGBM ``pred_contrib`` (TreeSHAP) call for all flagged rows of ``X``;
+    ``scored`` holds their predictions on the same index. Contributions are in
+    raw score (log-odds) units, largest magnitude first.
+    """
+    flagged = scored["prediction"].isin(["Warning", "Leak"]).to_numpy()
+    rows = X.loc[flagged]
+    explained = pd.DataFrame(
+        {"prediction": scored.loc[flagged, "prediction"], "contributions": None},
+        index=rows.index,
+    )
+    if "times" in X.columns:
+        explained.insert(0, "times", rows["times"])
+    if rows.empty:
+        return explained
+
+    algo = _estimator.named_steps["algo"]
+    names = feature_names(_estimator)
+    with span("model_explain"):
+        Xt = _estimator.named_steps["prep"].transform(rows)
+        contrib = np.asarray(algo.predict(Xt, pred_contrib=True))
+
+    # (rows, classes, features + bias), the bias column is dropped
+    contrib = contrib.reshape(len(rows), len(algo.classes_), len(names) + 1)
+    codes = {label: code for code, label in classes.items()}
+    class_index = [
+        list(algo.classes_).index(codes[label]) for label in explained["prediction"]
+    ]
+    values = contrib[np.arange(len(rows)), class_index, :-1]
+    top = np.argsort(-np.abs(values), axis=1)[:, :top_k]
+
+    explained["contributions"] = [
+        {names[j]: round(float(row[j]), 4) for j in order}
+        for row, order in zip(values, top)
+    ]
+    return explained
+
+
+def format_contributions(contributions) -> str:
+    """{"Speed(rpm)": 1.2, ...} -> "Speed(rpm) +1.20, ..." for tables"""
+    if not isinstance(contributions, dict):
+        return ""
+    return ", ".join(f"{name} {value:+.2f}" for name, value in contributions.items())
+
+
+@traced()
+def fleet_inference(
+    fleet_df: pd.DataFrame,
+    classes: Dict = {0: "Normal", 1: "Warning", 2: "Leak"},
+) -> pd.DataFrame:
+    """
+    Score the latest row of every machine, one predict call per model
+
+    ``fleet_df`` is the output of ``load_fleet_latest``. Machines that are not
+    running are reported as "Excluded", like in single inference.
+    """
+    columns = ["prediction", "probability", "times"]
+    if fleet_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    # Diff features need the previous row of the same machine only
+    with span("preprocess"):
+        latest_rows = [
+            preprocess(group.sort_values("times")).iloc[[-1]]
+            for _, group in fleet_df.groupby("machine_id", sort=True)
+        ]
+    latest = pd.concat(latest_rows).set_index("machine_id")
+
+    result = pd.DataFrame(index=latest.index, columns=columns)
+    result["prediction"] = "Excluded"
+    result["probability"] = 0.0
+    result["times"] = latest["times"]
+
+    running = latest[latest["Status"] == 2]
+    for model_path, machine_ids in group_by_model(list(running.index)).items():
+        X = running.loc[machine_ids]
+        estimator = get_model(machine_ids[0])
+
+        try:
+            with span("model_predict"):
+                probs = estimator.predict_proba(X)
+        except Exception as e:
+            st.error(f"Error in fleet inference: {str(e)}")
+            result.loc[machine_ids, "prediction"] = "Error"
+            continue
+
+        result.loc[machine_ids, "prediction"] = [
+            classes.get(estimator.classes_[i], "Unknown") for i in probs.argmax(axis=1)
+        ]
+        result.loc[machine_ids, "probability"] = probs.max(axis=1)
+
+    return result
+
+
 def get_prediction_summary(predictions: List[str]) -> Dict:
     """Get summary of predictions for dashboard metrics"""
     if not predictions:
@@ -271,10 +367,6 @@ def get_prediction_summary(predictions: List[str]) -> Dict:
 
 def clear_prediction_cache():
     """Clear all prediction caches"""
-    global _prediction_cache
-    _prediction_cache = PredictionCache()
-
-    if hasattr(st.session_state, "preprocess_cache"):
-        st.session_state.preprocess_cache = {}
-    if hasattr(st.session_state, "single_prediction_cache"):
-        st.session_state.single_prediction_cache = {}
+    cache = get_cache()
+    for namespace in ["preprocess", "single_prediction", "batch_prediction"]:
+        cache.invalidate(namespace)
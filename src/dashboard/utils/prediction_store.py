@@ -0,0 +1,179 @@
+import logging
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    Float,
+    MetaData,
+    String,
+    Table,
+    and_,
+    delete,
+    insert,
+    select,
+)
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per scored datalog row, per model version
+predictions_table = Table(
+    "predictions",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("model_version", String(32), primary_key=True),
+    Column("times", DateTime, primary_key=True),
+    Column("prediction", String(16), nullable=False),
+    Column("probability", Float, nullable=False),
+    Column("prob_normal", Float),
+    Column("prob_warning", Float),
+    Column("prob_leak", Float),
+)
+
+# Top feature contributions of the Warning/Leak rows, next to their prediction
+explanations_table = Table(
+    "prediction_explanations",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("model_version", String(32), primary_key=True),
+    Column("times", DateTime, primary_key=True),
+    Column("prediction", String(16), nullable=False),
+    # {feature: contribution} of the predicted class, largest magnitude first
+    Column("contributions", JSON, nullable=False),
+)
+
+PREDICTION_COLUMNS = [c.name for c in predictions_table.columns]
+EXPLANATION_COLUMNS = [c.name for c in explanations_table.columns]
+
+
+def ensure_prediction_table(engine):
+    """Create the prediction store if it does not exist yet"""
+    metadata.create_all(engine, tables=[predictions_table, explanations_table])
+
+
+def _replace_window(
+    conn,
+    table: Table,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+    frame: pd.DataFrame,
+) -> int:
+    window = and_(
+        table.c.machine_id == machine_id,
+        table.c.model_version == model_version,
+        table.c.times >= start,
+        table.c.times < end,
+    )
+
+    records = frame.assign(machine_id=machine_id, model_version=model_version)[
+        [c.name for c in table.columns]
+    ].to_dict("records")
+    for record in records:
+        record["times"] = pd.Timestamp(record["times"]).to_pydatetime()
+
+    conn.execute(delete(table).where(window))
+    if records:
+        conn.execute(insert(table), records)
+    return len(records)
+
+
+def save_predictions(
+    engine,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+    predictions: pd.DataFrame,
+) -> int:
+    """
+    Replace the stored predictions of one machine in [start, end)
+
+    Deleting the window first makes re-running a partition idempotent.
+    """
+    with engine.begin() as conn:
+        return _replace_window(
+            conn, predictions_table, machine_id, model_version, start, end, predictions
+        )
+
+
+def save_scored_partition(
+    engine,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+    predictions: pd.DataFrame,
+    explanations: pd.DataFrame,
+) -> int:
+    """
+    Replace predictions and explanations of one machine in [start, end)
+
+    One transaction, so a failed partition leaves neither half behind. Returns
+    the number of predictions written.
+    """
+    with engine.begin() as conn:
+        written = _replace_window(
+            conn, predictions_table, machine_id, model_version, start, end, predictions
+        )
+        _replace_window(
+            conn,
+            explanations_table,
+            machine_id,
+            model_version,
+            start,
+            end,
+            explanations,
+        )
+    return written
+
+
+def load_predictions(
+    engine,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    """Load stored predictions of one machine in [start, end), oldest first"""
+    query = (
+        select(predictions_table)
+        .where(
+            predictions_table.c.machine_id == machine_id,
+            predictions_table.c.model_version == model_version,
+            predictions_table.c.times >= start,
+            predictions_table.c.times < end,
+        )
+        .order_by(predictions_table.c.times)
+    )
+
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, parse_dates=["times"])
+
+
+def load_explanations(
+    engine,
+    machine_id: str,
+    model_version: str,
+    start: datetime,
+    end: datetime,
+) -> pd.DataFrame:
+    """Load stored explanations of one machine in [start, end), oldest first"""
+    query = (
+        select(explanations_table)
+        .where(
+            explanations_table.c.machine_id == machine_id,
+            explanations_table.c.model_version == model_version,
+            explanations_table.c.times >= start,
+            explanations_table.c.times < end,
+        )
+        .order_by(explanations_table.c.times)
+    )
+
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, parse_dates=["times"])
@@ -0,0 +1,185 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, bindparam, column, func, literal, select, table
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import (
+    FunctionElement,
+    Select,
+    TableClause,
+    literal_column,
+)
+
+from src.dashboard.config.settings import MACHINES
+
+KNOWN_TABLES = {machine["table"] for machine in MACHINES.values()}
+
+
+def check_table(table: str) -> str:
+    """Only allow table names from the machine registry into SQL text"""
+    if table not in KNOWN_TABLES:
+        raise ValueError(f"Table {table} is not in the machine registry")
+    return table
+
+
+class time_bucket(FunctionElement):
+    """Epoch-aligned bucket number of a timestamp, ``seconds`` wide"""
+
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(time_bucket, "mysql")
+def _mysql_time_bucket(element, compiler, **kw):
+    times, seconds = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"FLOOR(UNIX_TIMESTAMP({times}) / {seconds})"
+
+
+@compiles(time_bucket, "sqlite")
+def _sqlite_time_bucket(element, compiler, **kw):
+    # Integer division, the bucket width is bound as an integer
+    times, seconds = (compiler.process(arg, **kw) for arg in element.clauses)
+    return f"CAST(strftime('%s', {times}) AS INTEGER) / {seconds}"
+
+
+def datalog_table(name: str, columns: Optional[List[str]] = None) -> TableClause:
+    """A registered datalog table, with ``times`` and the projected columns"""
+    columns = [col for col in columns or [] if col != "times"]
+    return table(check_table(name), column("times"), *[column(c) for c in columns])
+
+
+def _projection(source: TableClause, columns: Optional[List[str]]) -> List:
+    # Quoting of names like "Speed(rpm)" is left to the dialect
+    if not columns:
+        return [literal_column(f"{source.name}.*")]
+    return [source.c.times, *[source.c[col] for col in columns if col != "times"]]
+
+
+def _window(
+    source: TableClause, start: Optional[datetime], end: Optional[datetime]
+) -> List:
+    conditions = []
+    if start is not None:
+        conditions.append(source.c.times >= bindparam("start", start))
+    if end is not None:
+        conditions.append(source.c.times < bindparam("end", end))
+    return conditions
+
+
+def latest_rows(
+    table_name: str, limit: int, columns: Optional[List[str]] = None
+) -> Select:
+    """The newest ``limit`` rows, newest first"""
+    source = datalog_table(table_name, columns)
+    return (
+        select(*_projection(source, columns))
+        .select_from(source)
+        .order_by(source.c.times.desc())
+        .limit(bindparam("limit", int(limit)))
+    )
+
+
+def range_rows(
+    table_name: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None,
+    columns: Optional[List[str]] = None,
+    newest_first: bool = False,
+) -> Select:
+    """
+    Rows in [start, end), either bound may be open
+
+    With ``limit`` and ``newest_first`` the newest rows of the range are kept.
+    """
+    source = datalog_table(table_name, columns)
+    order = source.c.times.desc() if newest_first else source.c.times
+    query = (
+        select(*_projection(source, columns))
+        .select_from(source)
+        .where(*_window(source, start, end))
+        .order_by(order)
+    )
+    if limit is not None:
+        query = query.limit(bindparam("limit", int(limit)))
+    return query
+
+
+def sampled_rows(
+    table_name: str,
+    start: datetime,
+    end: Optional[datetime],
+    bucket_seconds: int,
+    limit: int,
+    columns: Optional[List[str]] = None,
+) -> Select:
+    """
+    The last row of each ``bucket_seconds`` bucket in [start, end), newest first
+
+    The inner GROUP BY only reads the times index, so the full rows of the range
+    are never sorted. Buckets are aligned to the epoch, not to ``start``.
+    """
+    source = datalog_table(table_name, columns)
+    rows = source.alias("d")
+    times = datalog_table(table_name).alias("t")
+    buckets = (
+        select(func.max(times.c.times).label("times"))
+        .where(*_window(times, start, end))
+        .group_by(time_bucket(times.c.times, bindparam("bucket", int(bucket_seconds))))
+        .subquery("b")
+    )
+    return (
+        select(*_projection(rows, columns))
+        .select_from(rows.join(buckets, rows.c.times == buckets.c.times))
+        .order_by(rows.c.times.desc())
+        .limit(bindparam("limit", int(limit)))
+    )
+
+
+def keyset_page(
+    table_name: str,
+    after: datetime,
+    end: Optional[datetime],
+    page_size: int,
+    columns: Optional[List[str]] = None,
+    inclusive: bool = True,
+) -> Select:
+    """
+    One page of rows from ``after`` on, oldest first
+
+    Each page is an index range scan that starts where the last one ended, so
+    deep pages cost the same as the first and no cursor stays open in between.
+    """
+    source = datalog_table(table_name, columns)
+    lower = bindparam("after", after)
+    condition = source.c.times >= lower if inclusive else source.c.times > lower
+    return (
+        select(*_projection(source, columns))
+        .select_from(source)
+        .where(condition, *_window(source, None, end))
+        .order_by(source.c.times)
+        .limit(bindparam("limit", int(page_size)))
+    )
+
+
+def latest_times(table_names: List[str]) -> Select:
+    """``MAX(times)`` of each table, one indexed lookup per table in one statement"""
+    probes = [
+        select(func.max(datalog_table(name).c.times)).scalar_subquery().label(name)
+        for name in table_names
+    ]
+    return select(*probes)
+
+
+def fleet_latest(machine_tables: Dict[str, str], limit: int) -> Select:
+    """The newest ``limit`` rows of several machines, with a machine_id column"""
+    members = []
+    for machine_id, table_name in machine_tables.items():
+        # Wrapped, so ORDER BY/LIMIT stay per table in MySQL and SQLite alike
+        newest = latest_rows(table_name, limit).subquery("newest")
+        members.append(
+            select(
+                literal(machine_id).label("machine_id"), literal_column("newest.*")
+            ).select_from(newest)
+        )
+    return members[0].union_all(*members[1:]) if len(members) > 1 else members[0]
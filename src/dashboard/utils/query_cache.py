@@ -0,0 +1,123 @@
+import logging
+import re
+import threading
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+from sqlalchemy.sql.expression import Executable
+
+from src.dashboard.config.settings import QUERY_CACHE_ENABLED
+from src.dashboard.utils.cache import CacheService, get_cache
+from src.dashboard.utils.instrumentation import span
+from src.dashboard.utils.queries import latest_times
+
+logger = logging.getLogger(__name__)
+
+NAMESPACE = "queries"
+# Bound parameters that move with relative time ranges
+RANGE_PARAMS = {"start", "end"}
+
+
+def normalize_sql(query: str) -> str:
+    """One spelling per statement: whitespace collapsed, trailing semicolon dropped"""
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+
+class QueryCache:
+    """
+    Datalog query results, valid until the data version of their tables changes
+
+    The version is the latest ``times`` of every table a query reads, fetched with
+    one indexed ``MAX(times)`` probe per read. Between inserts, identical queries
+    from every session and tab are served from memory; the first read after an
+    insert runs the query again, so a result is never older than the data. Rows
+    written with an older ``times`` than the newest row (late backfills) do not
+    change the version.
+
+    Results live in the shared cache (``queries`` namespace) and callers must not
+    modify them in place.
+    """
+
+    def __init__(self, cache: Optional[CacheService] = None):
+        self.cache = cache or get_cache()
+        self.lock = threading.Lock()
+        # Statement -> range bounds -> data version of its cached entry. Only
+        # cached entries are listed: the cache reports the ones it drops.
+        self.versions: Dict[Hashable, Dict[Tuple, Tuple]] = {}
+        self.cache.on_drop[NAMESPACE] = self._forget
+
+    def _forget(self, key: Tuple):
+        # Called under the cache lock, never calls back into the cache
+        statement, bounds, version = key[:3], key[3], key[4]
+        with self.lock:
+            entries = self.versions.get(statement)
+            if entries is not None and entries.get(bounds) == version:
+                del entries[bounds]
+                if not entries:
+                    del self.versions[statement]
+
+    def data_version(self, engine, tables: Sequence[str]) -> Tuple:
+        """Latest ``times`` per table, in one round trip"""
+        with engine.connect() as conn, span("db_version_probe"):
+            return tuple(conn.execute(latest_times(list(tables))).one())
+
+    def read_sql(
+        self,
+        engine,
+        query: Executable,
+        tables: Sequence[str],
+        parse_dates: List[str] = ["times"],
+    ) -> pd.DataFrame:
+        """``pd.read_sql`` of a bound statement over ``tables``, cached per data version"""
+        compiled = query.compile(dialect=engine.dialect)
+        params = compiled.params
+        # Engines are shared per URI (get_engine), so the engine names the database
+        statement = (
+            id(engine),
+            normalize_sql(str(compiled)),
+            tuple(sorted((k, v) for k, v in params.items() if k not in RANGE_PARAMS)),
+        )
+        bounds = tuple((k, params[k]) for k in sorted(RANGE_PARAMS) if k in params)
+        version = self.data_version(engine, tables)
+
+        # Entries of the statement at an older version can no longer be hit: the
+        # same bounds would be read at the new version, and relative ranges move
+        # their start on, so those results are dropped now instead of by the LRU
+        with self.lock:
+            entries = self.versions.setdefault(statement, {})
+            stale = [(b, v) for b, v in entries.items() if v != version]
+        for stale_bounds, stale_version in stale:
+            self.cache.delete(NAMESPACE, (*statement, stale_bounds, stale_version))
+
+        def run():
+            with engine.connect() as conn, span("db_query"):
+                return pd.read_sql(query, conn, parse_dates=parse_dates)
+
+        def build():
+            result = run()
+            with self.lock:
+                self.versions.setdefault(statement, {})[bounds] = version
+            return result
+
+        return self.cache.get_or_set(NAMESPACE, (*statement, bounds, version), build)
+
+
+# Global query cache, shared by every session of the process
+_query_cache = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    return _query_cache
+
+
+def read_sql(
+    engine,
+    query: Executable,
+    tables: Sequence[str],
+    parse_dates: List[str] = ["times"],
+) -> pd.DataFrame:
+    """Datalog read through the query cache, or straight to the database when off"""
+    if QUERY_CACHE_ENABLED:
+        return _query_cache.read_sql(engine, query, tables, parse_dates)
+    with engine.connect() as conn, span("db_query"):
+        return pd.read_sql(query, conn, parse_dates=parse_dates)
@@ -0,0 +1,105 @@
+import random
+from typing import Optional
+
+import pandas as pd
+
+from src.dashboard.config.settings import (
+    DATALOG_INTERVAL_SECONDS,
+    DEFAULT_REFRESH_INTERVAL,
+    MIN_REFRESH_INTERVAL,
+    PUSH_REFRESH_INTERVAL,
+    REFRESH_JITTER,
+    REFRESH_MAX_INTERVAL,
+)
+
+MODE_LIVE = "live"
+MODE_BACKOFF = "backoff"
+MODE_PUSH = "push"
+
+
+class RefreshScheduler:
+    """
+    Per-session owner of every automatic refresh decision
+
+    - live: data is fresh, refresh just after the next datalog row is due
+    - backoff: data is stale, double the interval on every empty timer tick
+    - push: the change feed reruns the page, the timer is only a safety net
+
+    Intervals are jittered so sessions opened together do not query together.
+    """
+
+    def __init__(
+        self,
+        base_interval: int = DEFAULT_REFRESH_INTERVAL,
+        max_interval: int = REFRESH_MAX_INTERVAL,
+        jitter: float = REFRESH_JITTER,
+        rng: Optional[random.Random] = None,
+    ):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.mode = MODE_LIVE
+        self.backoff_level = 0
+        self.last_data_time = None
+        self.last_tick_count = 0
+        self.interval = base_interval
+
+    def interval_ms(self) -> int:
+        """Interval to hand to the autorefresh timer for this rerun"""
+        return int(self.interval * 1000)
+
+    def observe(
+        self,
+        latest_time: Optional[pd.Timestamp],
+        is_fresh: bool,
+        tick_count: int = 0,
+        push: bool = False,
+        now: Optional[pd.Timestamp] = None,
+    ) -> float:
+        """Update the mode after a rerun, returns the next interval in seconds"""
+        # Datalog times are naive local times, like pd.Timestamp.now()
+        now = pd.Timestamp.now() if now is None else now
+        timer_tick = tick_count != self.last_tick_count
+        self.last_tick_count = tick_count
+
+        new_data = latest_time is not None and (
+            self.last_data_time is None or latest_time > self.last_data_time
+        )
+        if new_data:
+            # Fast path: any new row resets the backoff immediately
+            self.last_data_time = latest_time
+            self.backoff_level = 0
+
+        if push:
+            self.mode = MODE_PUSH
+            interval = PUSH_REFRESH_INTERVAL
+        elif is_fresh:
+            self.mode = MODE_LIVE
+            # Wake up shortly after the next row should have been written
+            next_row_due = (
+                DATALOG_INTERVAL_SECONDS + 5 - (now - latest_time).total_seconds()
+                if latest_time is not None
+                else self.base_interval
+            )
+            interval = min(max(next_row_due, MIN_REFRESH_INTERVAL), self.base_interval)
+        else:
+            self.mode = MODE_BACKOFF
+            # Only timer ticks count, so widget clicks do not grow the backoff
+            if timer_tick and not new_data:
+                self.backoff_level = min(self.backoff_level + 1, 10)
+            interval = min(
+                self.base_interval * 2**self.backoff_level, self.max_interval
+            )
+
+        self.interval = interval * (1 + self.rng.uniform(-self.jitter, self.jitter))
+        return self.interval
+
+    def describe(self) -> str:
+        if self.mode == MODE_PUSH:
+            return (
+                f"⚡ Push updates (safety refresh every {self.interval / 60:.0f} min)"
+            )
+        if self.mode == MODE_BACKOFF:
+            return f"🟠 Source stale, backing off (next check in {self.interval:.0f}s)"
+        return f"🟢 Live (next refresh in {self.interval:.0f}s)"
@@ -0,0 +1,212 @@
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import create_engine, inspect, text
+
+from src.dashboard.config.settings import (
+    MACHINES,
+    REPLAY_HISTORY_HOURS,
+    REPLAY_MAX_GAP_SECONDS,
+)
+from src.dashboard.utils.compact import FLOAT32_COLUMNS, TIME_COLUMNS
+from src.dashboard.utils.database import DATALOG_DTYPES
+
+logger = logging.getLogger(__name__)
+
+# Condition labels of the replay CSV: -1 stopped, 0 normal, 1 warning (only
+# while stopped), 2 leak (only while running)
+LEAK_CONDITION = 2
+
+# Fanned-out machines replay the same rows with their temperatures nudged, so
+# caches keyed by data content do not collapse them into one machine
+TEMPERATURE_COLUMNS = [col for col in FLOAT32_COLUMNS if col.startswith("Suhu")]
+MACHINE_TEMPERATURE_STEP = 0.1  # °C per machine
+
+
+def seconds_to_hhmmss(seconds: pd.Series) -> pd.Series:
+    """int seconds -> the "hh:mm:ss" strings the PLC logger writes"""
+    seconds = seconds.fillna(0).astype("int64")
+    parts = [seconds // 3600, seconds % 3600 // 60, seconds % 60]
+    hours, minutes, secs = (part.astype(str).str.zfill(2) for part in parts)
+    return hours + ":" + minutes + ":" + secs
+
+
+def load_replay_rows(csv_path: str) -> pd.DataFrame:
+    """
+    Replay CSV as datalog rows, oldest first
+
+    The converted ``*_sec`` columns are written back as hh:mm:ss strings and the
+    training-only columns are dropped, except the ``Condition`` label.
+    """
+    df = pd.read_csv(csv_path, parse_dates=["times"]).sort_values("times")
+    for col, sec_col in TIME_COLUMNS.items():
+        if col not in df.columns and sec_col in df.columns:
+            df[col] = seconds_to_hhmmss(df[sec_col])
+
+    columns = ["times", *[col for col in DATALOG_DTYPES if col in df.columns]]
+    return df[columns + ["Condition"]].reset_index(drop=True)
+
+
+def replay_plan(
+    times: pd.Series, history: pd.Timedelta, now: pd.Timestamp
+) -> Tuple[int, pd.Timedelta]:
+    """
+    First streamed row and the shift applied to every timestamp
+
+    Streaming starts at the first row after ``history`` whose time of day is the
+    current one. The shift is a whole number of days, so Shift columns keep
+    matching the clock.
+    """
+    eligible = times >= times.iloc[0] + history
+    if not eligible.any():
+        raise ValueError("The replay CSV is shorter than the requested history")
+
+    time_of_day = times - times.dt.normalize()
+    candidates = np.flatnonzero(eligible & (time_of_day >= now - now.normalize()))
+    start = candidates[0] if len(candidates) else np.flatnonzero(eligible)[0]
+    return int(start), now.normalize() - times.iloc[start].normalize()
+
+
+class Replayer:
+    """
+    Streams replay rows into the datalog tables at ``speed`` times real time
+
+    Every machine gets the same rows, written in one transaction per row. Gaps
+    in the CSV are capped at ``max_gap`` wall-clock seconds. Above 1x the
+    replayed clock runs ahead of the wall clock. The replayer uses its own
+    engine, so its inserts are not counted as dashboard queries.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        rows: pd.DataFrame,
+        machine_ids: List[str],
+        speed: float = 1.0,
+        history_hours: float = REPLAY_HISTORY_HOURS,
+        max_gap: float = REPLAY_MAX_GAP_SECONDS,
+        on_write: Optional[Callable[[str, pd.DataFrame, float], None]] = None,
+    ):
+        self.engine = create_engine(uri)
+        self.machine_ids = machine_ids
+        self.speed = speed
+        self.on_write = on_write
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.written = 0
+        # Leak onsets as they are written: machine_id, times, written_at
+        self.onsets: List[Dict] = []
+
+        start, offset = replay_plan(
+            rows["times"], pd.Timedelta(hours=history_hours), pd.Timestamp.now()
+        )
+        rows = rows.assign(times=rows["times"] + offset)
+        leak = rows["Condition"] == LEAK_CONDITION
+        self.onset = (leak & ~leak.shift(fill_value=False)).to_numpy()
+        rows = rows.drop(columns="Condition")
+
+        history_start = rows["times"].iloc[start] - pd.Timedelta(hours=history_hours)
+        self.history = rows.iloc[:start][rows["times"].iloc[:start] >= history_start]
+        self.rows = rows.iloc[start:]
+        self.onset = self.onset[start:]
+
+        gaps = self.rows["times"].diff().dt.total_seconds().fillna(0).to_numpy()
+        self.due = np.cumsum(np.minimum(gaps / speed, max_gap))
+
+    def machine_rows(self, machine_id: str, rows: pd.DataFrame) -> pd.DataFrame:
+        step = self.machine_ids.index(machine_id) * MACHINE_TEMPERATURE_STEP
+        if not step:
+            return rows
+        return rows.assign(
+            **{col: (rows[col] + step).round(1) for col in TEMPERATURE_COLUMNS}
+        )
+
+    def prepare(self, reset: bool = False):
+        """
+        Create the datalog tables and write the history rows
+
+        Tables that already hold rows are only replaced with ``reset``.
+        """
+        if self.engine.dialect.name == "sqlite":
+            os.makedirs(os.path.dirname(self.engine.url.database) or ".", exist_ok=True)
+            # Dashboard sessions keep reading while the replay writes
+            with self.engine.begin() as conn:
+                conn.execute(text("PRAGMA journal_mode=WAL"))
+
+        for machine_id in self.machine_ids:
+            table = MACHINES[machine_id]["table"]
+            if inspect(self.engine).has_table(table):
+                if reset:
+                    with self.engine.begin() as conn:
+                        conn.execute(text(f"DROP TABLE {table}"))
+                else:
+                    with self.engine.connect() as conn:
+                        rows = conn.execute(text(f"SELECT COUNT(*) FROM {table}"))
+                        if rows.scalar():
+                            raise ValueError(
+                                f"{table} already has rows, use --reset to replace it"
+                            )
+
+            with self.engine.begin() as conn:
+                history = self.machine_rows(machine_id, self.history)
+                history.head(0).to_sql(table, conn, if_exists="append", index=False)
+                conn.execute(text(f"CREATE INDEX idx_{table}_times ON {table} (times)"))
+                history.to_sql(
+                    table, conn, if_exists="append", index=False, chunksize=1000
+                )
+            logger.info(f"Wrote {len(self.history)} history rows into {table}")
+
+    def run(self):
+        """Stream the rows until the CSV ends or ``stop`` is called"""
+        started = time.monotonic()
+        for i in range(len(self.rows)):
+            if self.stopped.wait(max(self.due[i] - (time.monotonic() - started), 0)):
+                return
+
+            row = self.rows.iloc[[i]]
+            written = {
+                machine_id: self.machine_rows(machine_id, row)
+                for machine_id in self.machine_ids
+            }
+            with self.engine.begin() as conn:
+                for machine_id, machine_row in written.items():
+                    machine_row.to_sql(
+                        MACHINES[machine_id]["table"],
+                        conn,
+                        if_exists="append",
+                        index=False,
+                    )
+            written_at = time.time()
+
+            with self.lock:
+                self.written += 1
+                if self.onset[i]:
+                    self.onsets.extend(
+                        {
+                            "machine_id": machine_id,
+                            "times": row["times"].iloc[0],
+                            "written_at": written_at,
+                        }
+                        for machine_id in self.machine_ids
+                    )
+            if self.on_write is not None:
+                for machine_id, machine_row in written.items():
+                    self.on_write(machine_id, machine_row, written_at)
+
+        logger.info(f"Replay finished after {len(self.rows)} rows")
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="pdm-replay", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.engine.dispose()
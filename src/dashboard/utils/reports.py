@@ -0,0 +1,331 @@
+import logging
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    Float,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    select,
+)
+
+from src.dashboard.config.settings import REPORT_SHIFT_CLOSE_HOURS
+from src.dashboard.utils.compact import compact_frame
+from src.dashboard.utils.database import iter_time_range_chunks
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per finished shift, written once and never recomputed
+shift_reports_table = Table(
+    "shift_reports",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("shift_date", Date, primary_key=True),
+    Column("shift", Integer, primary_key=True),
+    Column("start", DateTime, nullable=False),
+    Column("end", DateTime, nullable=False),
+    Column("rows", Integer, nullable=False),
+    Column("running_rows", Integer, nullable=False),
+    Column("output", Integer),
+    Column("reject", Integer),
+    Column("downtime_sec", Integer),
+    Column("output_time_sec", Integer),
+    Column("total_time_sec", Integer),
+    Column("availability", Float),
+    Column("performance", Float),
+    Column("quality", Float),
+    Column("oee", Float),
+)
+
+REPORT_COLUMNS = [c.name for c in shift_reports_table.columns]
+SHIFT_KEY = ["shift_date", "shift"]
+
+# Counters and timers are shift-to-date on the PLC, the last row of a shift
+# holds its totals
+CUMULATIVE_COLUMNS = {
+    "Counter Output (pack)": "output",
+    "Counter Reject (pack)": "reject",
+    "Downtime_sec": "downtime_sec",
+    "Output Time_sec": "output_time_sec",
+    "Total Time_sec": "total_time_sec",
+    "Availability(%)": "availability",
+    "Performance(%)": "performance",
+    "Quality(%)": "quality",
+    "OEE(%)": "oee",
+}
+
+# Datalog columns to stream, the hh:mm:ss timers become ``*_sec`` on compaction
+SOURCE_COLUMNS = [
+    "Shift",
+    "Status",
+    "Counter Output (pack)",
+    "Counter Reject (pack)",
+    "Downtime (hh:mm:ss)",
+    "Output Time (hh:mm:ss)",
+    "Total Time (hh:mm:ss)",
+    "Availability(%)",
+    "Performance(%)",
+    "Quality(%)",
+    "OEE(%)",
+]
+
+# Percentages are averaged over the shifts of a day weighted by shift time
+WEIGHTED_KPIS = ["availability", "performance", "oee"]
+
+
+def ensure_report_table(engine):
+    """Create the shift report store if it does not exist yet"""
+    metadata.create_all(engine, tables=[shift_reports_table])
+
+
+def shift_dates(df: pd.DataFrame) -> pd.Series:
+    """Production date of each row, Shift 3 after midnight belongs to the day before"""
+    times = df["times"]
+    after_midnight = (df["Shift"].astype("int8") == 3) & (times.dt.hour < 12)
+    return (times - pd.to_timedelta(after_midnight.astype(int), unit="D")).dt.date
+
+
+def summarize_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Partial per-shift aggregates of one time-ordered chunk"""
+    chunk = compact_frame(chunk).dropna(subset=["Shift"])
+    if chunk.empty:
+        return pd.DataFrame()
+
+    frame = chunk[[col for col in CUMULATIVE_COLUMNS if col in chunk.columns]].rename(
+        columns=CUMULATIVE_COLUMNS
+    )
+    frame["shift_date"] = shift_dates(chunk)
+    frame["shift"] = chunk["Shift"].astype("int8")
+    frame["start"] = chunk["times"]
+    frame["end"] = chunk["times"]
+    frame["rows"] = 1
+    frame["running_rows"] = (chunk["Status"].astype("float") == 2).astype(int)
+
+    aggregations = {
+        "start": "min",
+        "end": "max",
+        "rows": "sum",
+        "running_rows": "sum",
+        **{col: "last" for col in CUMULATIVE_COLUMNS.values() if col in frame},
+    }
+    return frame.groupby(SHIFT_KEY, sort=False).agg(aggregations)
+
+
+def rollup_shifts(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Per-shift KPIs of a stream of datalog chunks
+
+    Each chunk is reduced with a single group-by, shifts split across chunks are
+    merged from the partials, so memory stays at one chunk whatever the range.
+    """
+    partials = [summarize_chunk(chunk) for chunk in chunks]
+    partials = [partial for partial in partials if not partial.empty]
+    if not partials:
+        return pd.DataFrame(columns=REPORT_COLUMNS[1:])
+
+    merged = pd.concat(partials)
+    aggregations = {
+        col: {"start": "min", "end": "max", "rows": "sum", "running_rows": "sum"}.get(
+            col, "last"
+        )
+        for col in merged.columns
+    }
+    shifts = merged.groupby(level=SHIFT_KEY, sort=False).agg(aggregations)
+    shifts = shifts.reset_index().sort_values("start").reset_index(drop=True)
+
+    # float32 from compaction, widened so stored percentages read back as logged
+    percentages = ["availability", "performance", "quality", "oee"]
+    shifts[percentages] = shifts[percentages].astype("float64").round(4)
+
+    # Quality from the counters, the PLC percentage is rounded to 0.1
+    good = shifts["output"] - shifts["reject"]
+    shifts["quality"] = (
+        100 * good / shifts["output"].where(shifts["output"] > 0)
+    ).fillna(shifts["quality"])
+    return shifts
+
+
+def mark_finished(shifts: pd.DataFrame, now: Optional[datetime] = None) -> pd.Series:
+    """A shift is finished once a later shift has rows or its slot is long over"""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    followed = pd.Series(True, index=shifts.index)
+    if len(shifts):
+        followed.iloc[-1] = False
+    stale = now - shifts["end"] > pd.Timedelta(hours=REPORT_SHIFT_CLOSE_HOURS)
+    return followed | stale
+
+
+def save_shift_reports(engine, machine_id: str, shifts: pd.DataFrame) -> int:
+    """Store finished shifts, each key is written once, returns the rows added"""
+    if shifts.empty:
+        return 0
+
+    records = shifts.assign(machine_id=machine_id)[REPORT_COLUMNS].to_dict("records")
+    for record in records:
+        record["start"] = pd.Timestamp(record["start"]).to_pydatetime()
+        record["end"] = pd.Timestamp(record["end"]).to_pydatetime()
+        for key, value in record.items():
+            if hasattr(value, "item"):
+                record[key] = None if pd.isna(value) else value.item()
+
+    # The reports job and open Reports tabs may store the same shift at once,
+    # keys that are already stored are left as they are
+    query = (
+        insert(shift_reports_table)
+        .prefix_with("IGNORE", dialect="mysql")
+        .prefix_with("OR IGNORE", dialect="sqlite")
+    )
+    with engine.begin() as conn:
+        inserted = conn.execute(query, records).rowcount
+    return inserted if inserted >= 0 else len(records)
+
+
+def load_shift_reports(
+    engine, machine_id: str, first_day: date, last_day: date
+) -> pd.DataFrame:
+    """Stored shifts of one machine with production dates in [first_day, last_day]"""
+    query = (
+        select(shift_reports_table)
+        .where(
+            shift_reports_table.c.machine_id == machine_id,
+            shift_reports_table.c.shift_date >= first_day,
+            shift_reports_table.c.shift_date <= last_day,
+        )
+        .order_by(shift_reports_table.c.start)
+    )
+    with engine.connect() as conn:
+        stored = pd.read_sql(query, conn, parse_dates=["start", "end"])
+    stored["shift_date"] = pd.to_datetime(stored["shift_date"]).dt.date
+    return stored.drop(columns="machine_id")
+
+
+def scan_window(first_day: date, last_day: date) -> Tuple[datetime, datetime]:
+    """Datalog time range holding every shift of the production dates"""
+    start = pd.Timestamp(first_day) - pd.Timedelta(hours=12)
+    end = pd.Timestamp(last_day) + pd.Timedelta(days=1, hours=12)
+    return start.to_pydatetime(), end.to_pydatetime()
+
+
+# Reports of ranges whose every shift is closed never change again
+_closed_reports: Dict[tuple, pd.DataFrame] = {}
+_closed_reports_lock = threading.Lock()
+
+
+def get_shift_report(
+    engine,
+    machine_id: str,
+    table: str,
+    first_day: date,
+    last_day: date,
+    now: Optional[datetime] = None,
+) -> pd.DataFrame:
+    """
+    Per-shift KPIs for production dates [first_day, last_day]
+
+    Finished shifts come from the report store, the datalog is only scanned for
+    shifts not stored yet, which after the first call is the in-progress shift
+    plus the edge of the window. Newly finished shifts are stored on the way.
+    Ranges that are entirely closed are answered from memory after one build.
+    """
+    start, end = scan_window(first_day, last_day)
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    closed = now - pd.Timestamp(end) > pd.Timedelta(hours=REPORT_SHIFT_CLOSE_HOURS)
+    key = (str(engine.url), machine_id, first_day, last_day)
+    if closed:
+        with _closed_reports_lock:
+            if key in _closed_reports:
+                return _closed_reports[key].copy()
+
+    ensure_report_table(engine)
+    stored = load_shift_reports(engine, machine_id, first_day, last_day)
+
+    windows = [(start, end)]
+    if not stored.empty:
+        # A shift of the first day starts within a day of the window start
+        first_stored = stored["start"].min()
+        windows = [(stored["end"].max().to_pydatetime(), end)]
+        if first_stored - pd.Timestamp(start) > pd.Timedelta(days=1):
+            windows.insert(0, (start, first_stored.to_pydatetime()))
+
+    fresh = []
+    for window_start, window_end in windows:
+        shifts = rollup_shifts(
+            iter_time_range_chunks(
+                engine, table, window_start, window_end, columns=SOURCE_COLUMNS
+            )
+        )
+        if shifts.empty:
+            continue
+        shifts["finished"] = mark_finished(shifts, now)
+        in_range = shifts["shift_date"].between(first_day, last_day)
+        known = shifts.set_index(SHIFT_KEY).index.isin(
+            stored.set_index(SHIFT_KEY).index
+        )
+        fresh.append(shifts[in_range & ~known])
+
+    fresh = pd.concat(fresh) if fresh else pd.DataFrame(columns=REPORT_COLUMNS[1:])
+    if not fresh.empty:
+        finished = fresh[fresh["finished"].astype(bool)]
+        saved = save_shift_reports(
+            engine, machine_id, finished.drop(columns="finished")
+        )
+        if saved:
+            logger.info(f"Stored {saved} finished shift reports for {machine_id}")
+
+    stored["finished"] = True
+    parts = [part for part in (stored, fresh) if not part.empty]
+    report = pd.concat(parts, ignore_index=True) if parts else stored
+    report = report.sort_values("start").reset_index(drop=True)
+    if closed:
+        with _closed_reports_lock:
+            _closed_reports[key] = report
+    return report.copy()
+
+
+def daily_report(shifts: pd.DataFrame) -> pd.DataFrame:
+    """Per-day KPIs from the shift rows, percentages weighted by shift time"""
+    if shifts.empty:
+        return pd.DataFrame()
+
+    weights = shifts["total_time_sec"].fillna(0)
+    weighted = shifts[WEIGHTED_KPIS].mul(weights, axis=0)
+    frame = pd.concat(
+        [
+            shifts[
+                [
+                    "shift_date",
+                    "rows",
+                    "running_rows",
+                    "output",
+                    "reject",
+                    "downtime_sec",
+                    "output_time_sec",
+                    "total_time_sec",
+                ]
+            ],
+            weighted,
+        ],
+        axis=1,
+    )
+    days = frame.groupby("shift_date").sum()
+    days["shifts"] = shifts.groupby("shift_date").size()
+
+    total = days["total_time_sec"].where(days["total_time_sec"] > 0)
+    for kpi in WEIGHTED_KPIS:
+        days[kpi] = days[kpi] / total
+    days["quality"] = (
+        100
+        * (days["output"] - days["reject"])
+        / days["output"].where(days["output"] > 0)
+    )
+    return days
@@ -0,0 +1,219 @@
+import math
+import threading
+from collections import deque
+from typing import Dict, List
+
+import pandas as pd
+
+from src.dashboard.config.settings import (
+    DATALOG_INTERVAL_SECONDS,
+    ROLLING_ALERT_SIGMA,
+    ROLLING_SHIFT_WINDOW,
+    ROLLING_WINDOWS,
+)
+
+TEMPERATURE_COLUMNS = [
+    "Suhu Sealing Vertikal Bawah (oC)",
+    "Suhu Sealing Vertical Atas (oC)",
+    "Suhu Sealing Horizontal Depan/Kanan (oC)",
+    "Suhu Sealing Horizontal Belakang/Kiri (oC )",
+]
+
+ROLLING_COLUMNS = TEMPERATURE_COLUMNS + [
+    "diff_sealing_vertical",
+    "diff_sealing_horizontal",
+]
+
+# Also tracked for the fast-path gate, not shown with the temperatures
+TRACKED_COLUMNS = ROLLING_COLUMNS + ["diff_counter_reject"]
+
+
+class RollingWindow:
+    """
+    Mean, variance, min, max and EWMA of one series over a time window
+
+    Values sit in a bounded buffer; a push evicts rows that left the window
+    (or overflow the buffer) and updates every statistic in amortised O(1).
+    Min and max come from monotonic queues instead of rescanning the buffer.
+    """
+
+    def __init__(self, seconds: int, capacity: int):
+        self.window = pd.Timedelta(seconds=seconds)
+        self.capacity = capacity
+        self.alpha = 2 / (capacity + 1)
+        self.reset()
+
+    def reset(self):
+        self.values = deque()  # (time, seq, value)
+        self.min_queue = deque()  # (seq, value), values increasing
+        self.max_queue = deque()  # (seq, value), values decreasing
+        self.seq = 0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = None
+
+    def _pop(self):
+        _, seq, value = self.values.popleft()
+        # Welford update in reverse
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / self.count
+            self.m2 -= delta * (value - self.mean)
+        if self.min_queue[0][0] == seq:
+            self.min_queue.popleft()
+        if self.max_queue[0][0] == seq:
+            self.max_queue.popleft()
+
+    def push(self, time: pd.Timestamp, value: float):
+        if value is None or math.isnan(value):
+            return
+
+        cutoff = time - self.window
+        while self.values and (
+            len(self.values) >= self.capacity or self.values[0][0] <= cutoff
+        ):
+            self._pop()
+
+        self.seq += 1
+        self.values.append((time, self.seq, value))
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        while self.min_queue and self.min_queue[-1][1] >= value:
+            self.min_queue.pop()
+        self.min_queue.append((self.seq, value))
+        while self.max_queue and self.max_queue[-1][1] <= value:
+            self.max_queue.pop()
+        self.max_queue.append((self.seq, value))
+
+        self.ewma = (
+            value if self.ewma is None else self.ewma + self.alpha * (value - self.ewma)
+        )
+
+    def stats(self) -> Dict:
+        if not self.count:
+            return {"count": 0}
+        variance = max(self.m2, 0.0) / (self.count - 1) if self.count > 1 else 0.0
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": math.sqrt(variance),
+            "min": self.min_queue[0][1],
+            "max": self.max_queue[0][1],
+            "ewma": self.ewma,
+        }
+
+
+class RollingStats:
+    """Rolling windows of every sealing temperature column of one machine"""
+
+    def __init__(self, windows: Dict[str, int] = ROLLING_WINDOWS):
+        self.windows = {
+            name: {
+                col: RollingWindow(
+                    seconds, capacity=seconds // DATALOG_INTERVAL_SECONDS + 1
+                )
+                for col in TRACKED_COLUMNS
+            }
+            for name, seconds in windows.items()
+        }
+        self.last_time = None
+        self.last_reject = None
+        self.shift = None
+        self.lock = threading.Lock()
+
+    def observe(self, data: pd.DataFrame) -> int:
+        """Add raw datalog rows newer than the last seen row, returns the count"""
+        if data.empty:
+            return 0
+
+        with self.lock:
+            data = data.sort_values("times")
+            if self.last_time is not None:
+                data = data[data["times"] > self.last_time]
+            if data.empty:
+                return 0
+
+            values = data[TEMPERATURE_COLUMNS].astype(float)
+            values["diff_sealing_vertical"] = (
+                values["Suhu Sealing Vertical Atas (oC)"]
+                - values["Suhu Sealing Vertikal Bawah (oC)"]
+            )
+            values["diff_sealing_horizontal"] = (
+                values["Suhu Sealing Horizontal Depan/Kanan (oC)"]
+                - values["Suhu Sealing Horizontal Belakang/Kiri (oC )"]
+            )
+            reject = data["Counter Reject (pack)"].astype(float)
+            values["diff_counter_reject"] = reject.diff().to_numpy()
+            if self.last_reject is not None:
+                values.iloc[0, -1] = reject.iloc[0] - self.last_reject
+            self.last_reject = reject.iloc[-1]
+            shifts = data["Shift"] if "Shift" in data.columns else None
+
+            for i, (time, row) in enumerate(zip(data["times"], values.to_numpy())):
+                if shifts is not None:
+                    shift = shifts.iloc[i]
+                    if self.shift is not None and shift != self.shift:
+                        for window in self.windows.get(
+                            ROLLING_SHIFT_WINDOW, {}
+                        ).values():
+                            window.reset()
+                    self.shift = shift
+                for columns in self.windows.values():
+                    for col, value in zip(TRACKED_COLUMNS, row):
+                        columns[col].push(time, value)
+
+            self.last_time = data["times"].iloc[-1]
+            return len(data)
+
+    def snapshot(self, window: str) -> pd.DataFrame:
+        """Statistics of one window, one row per tracked column"""
+        with self.lock:
+            rows = {col: w.stats() for col, w in self.windows[window].items()}
+        columns = ["count", "mean", "std", "min", "max", "ewma"]
+        return pd.DataFrame.from_dict(rows, orient="index").reindex(columns=columns)
+
+
+def check_temperature_alerts(
+    stats: RollingStats,
+    danger_threshold: float,
+    sigma: float = ROLLING_ALERT_SIGMA,
+) -> List[str]:
+    """Alert rules evaluated on the rolling windows, not on raw rows"""
+    short, long = stats.snapshot("5 min"), stats.snapshot("1 h")
+    alerts = []
+    for col in TEMPERATURE_COLUMNS:
+        if not short.loc[col, "count"]:
+            continue
+        name = col.replace(" (oC)", "").replace(" (oC )", "")
+        if short.loc[col, "max"] >= danger_threshold:
+            alerts.append(
+                f"{name} reached {short.loc[col, 'max']:.1f} °C in the last 5 min "
+                f"(danger {danger_threshold} °C)"
+            )
+        std = long.loc[col, "std"]
+        if long.loc[col, "count"] > 10 and std > 0:
+            deviation = (short.loc[col, "mean"] - long.loc[col, "mean"]) / std
+            if abs(deviation) >= sigma:
+                alerts.append(
+                    f"{name} 5 min mean is {deviation:+.1f}σ away from the 1 h mean"
+                )
+    return alerts
+
+
+# Global rolling statistics, one per machine
+_rolling_stats: Dict[str, RollingStats] = {}
+_rolling_stats_lock = threading.Lock()
+
+
+def get_rolling_stats(machine_id: str) -> RollingStats:
+    with _rolling_stats_lock:
+        if machine_id not in _rolling_stats:
+            _rolling_stats[machine_id] = RollingStats()
+        return _rolling_stats[machine_id]
@@ -0,0 +1,302 @@
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    MetaData,
+    String,
+    Table,
+    func,
+    insert,
+    select,
+)
+
+from src.dashboard.config.settings import DB_URI, MACHINES, SHADOW_QUEUE_SIZE
+from src.dashboard.utils.database import get_engine
+from src.dashboard.utils.model_registry import get_primary_name, get_shadow_models
+
+logger = logging.getLogger(__name__)
+
+metadata = MetaData()
+
+# One row per shadow-scored datalog row, next to the primary model's result
+shadow_predictions_table = Table(
+    "shadow_predictions",
+    metadata,
+    Column("machine_id", String(32), primary_key=True),
+    Column("model", String(128), primary_key=True),
+    Column("times", DateTime, primary_key=True),
+    Column("prediction", String(16), nullable=False),
+    Column("probability", Float, nullable=False),
+    Column("primary_model", String(64), nullable=False),
+    Column("primary_prediction", String(16)),
+    Column("primary_probability", Float),
+    # Model time per row of the batch, in microseconds
+    Column("latency_us", Float),
+    Column("primary_latency_us", Float),
+)
+
+SHADOW_COLUMNS = [c.name for c in shadow_predictions_table.columns]
+
+# Every dashboard process (and the ingest job) scores shadows on its own, rows
+# another process logged first are kept as they are
+insert_shadow_rows = (
+    insert(shadow_predictions_table)
+    .prefix_with("IGNORE", dialect="mysql")
+    .prefix_with("OR IGNORE", dialect="sqlite")
+)
+
+
+def ensure_shadow_table(engine):
+    """Create the shadow prediction log if it does not exist yet"""
+    metadata.create_all(engine, tables=[shadow_predictions_table])
+
+
+class ShadowStats:
+    def __init__(self):
+        self.rows = 0
+        self.agreed = 0
+        self.seconds = 0.0
+        self.primary_seconds = 0.0
+        self.errors = 0
+
+
+class ShadowScorer:
+    """
+    Scores a machine's shadow models on the primary model's feature matrix
+
+    ``submit`` only queues the batch, one worker thread scores it off the render
+    path. When the worker falls behind new batches are dropped, never waited
+    for. Rows already logged for a shadow are skipped, so overlapping history
+    windows cost nothing twice: rows newer than the last logged one need no
+    lookup, older ones are checked against the log.
+    """
+
+    def __init__(self, uri: str = DB_URI, queue_size: int = SHADOW_QUEUE_SIZE):
+        self.uri = uri
+        self.queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.lock = threading.Lock()
+        self.stats: Dict[Tuple[str, str], ShadowStats] = {}
+        self.last_times: Dict[Tuple[str, str], Optional[pd.Timestamp]] = {}
+        self.dropped = 0
+        self.table_ready = False
+        self.thread = threading.Thread(
+            target=self._run, name="pdm-shadow-scorer", daemon=True
+        )
+        self.thread.start()
+
+    def submit(
+        self,
+        machine_id: str,
+        X: pd.DataFrame,
+        primary: pd.DataFrame,
+        primary_seconds: float,
+    ):
+        """
+        Queue preprocessed rows with the primary result (prediction and
+        probability columns, same index) and the primary's model time
+        """
+        if X.empty or not MACHINES[machine_id]["shadows"]:
+            return
+        try:
+            self.queue.put_nowait((machine_id, X, primary, primary_seconds))
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                self.score(*job)
+            except Exception as e:
+                logger.error(f"Shadow scoring failed: {str(e)}")
+            finally:
+                self.queue.task_done()
+
+    def _last_time(self, engine, key: Tuple[str, str]) -> Optional[pd.Timestamp]:
+        # Loaded from the log once, so a restart does not score rows again
+        if key not in self.last_times:
+            with engine.connect() as conn:
+                latest = conn.execute(
+                    select(func.max(shadow_predictions_table.c.times)).where(
+                        shadow_predictions_table.c.machine_id == key[0],
+                        shadow_predictions_table.c.model == key[1],
+                    )
+                ).scalar()
+            self.last_times[key] = None if latest is None else pd.Timestamp(latest)
+        return self.last_times[key]
+
+    def _logged_times(self, engine, key: Tuple[str, str], times: pd.Series):
+        """Times of ``times`` already in the log for this machine and shadow"""
+        with engine.connect() as conn:
+            logged = conn.execute(
+                select(shadow_predictions_table.c.times).where(
+                    shadow_predictions_table.c.machine_id == key[0],
+                    shadow_predictions_table.c.model == key[1],
+                    shadow_predictions_table.c.times >= times.min().to_pydatetime(),
+                    shadow_predictions_table.c.times <= times.max().to_pydatetime(),
+                )
+            ).scalars()
+            return pd.to_datetime(list(logged))
+
+    def score(
+        self,
+        machine_id: str,
+        X: pd.DataFrame,
+        primary: pd.DataFrame,
+        primary_seconds: float,
+    ) -> int:
+        """Score and log one batch with every shadow, returns rows logged"""
+        # Imported here, predicting submits its batches to this module
+        from src.dashboard.utils.predicting import score_frame
+
+        engine = get_engine(self.uri)
+        if not self.table_ready:
+            ensure_shadow_table(engine)
+            self.table_ready = True
+
+        if "times" not in X.columns:
+            # The Leakage tab scores frames indexed by time
+            X = X.assign(times=X.index)
+        logged = 0
+        primary_us = primary_seconds / len(X) * 1e6
+        for name, model in get_shadow_models(machine_id).items():
+            key = (machine_id, name)
+            stats = self.stats.setdefault(key, ShadowStats())
+            last_time = self._last_time(engine, key)
+            rows = X
+            if last_time is not None:
+                older = X["times"] <= last_time
+                if older.any():
+                    done = self._logged_times(engine, key, X.loc[older, "times"])
+                    rows = X[~(older & X["times"].isin(done))]
+            if rows.empty:
+                continue
+
+            started = time.perf_counter()
+            try:
+                scored = score_frame(rows, model)
+            except Exception as e:
+                logger.error(f"Shadow {name} failed for {machine_id}: {str(e)}")
+                with self.lock:
+                    stats.errors += 1
+                continue
+            seconds = time.perf_counter() - started
+
+            matched = primary.loc[rows.index]
+            log = pd.DataFrame(
+                {
+                    "machine_id": machine_id,
+                    "model": name,
+                    "times": rows["times"],
+                    "prediction": scored["prediction"],
+                    "probability": scored["probability"],
+                    "primary_model": get_primary_name(machine_id),
+                    "primary_prediction": matched["prediction"],
+                    "primary_probability": matched["probability"],
+                    "latency_us": seconds / len(rows) * 1e6,
+                    "primary_latency_us": primary_us,
+                }
+            )[SHADOW_COLUMNS]
+            records = log.to_dict("records")
+            for record in records:
+                record["times"] = pd.Timestamp(record["times"]).to_pydatetime()
+            with engine.begin() as conn:
+                inserted = conn.execute(insert_shadow_rows, records).rowcount
+
+            with self.lock:
+                stats.rows += len(rows)
+                stats.agreed += int(
+                    (log["prediction"] == log["primary_prediction"]).sum()
+                )
+                stats.seconds += seconds
+                stats.primary_seconds += primary_us * len(rows) / 1e6
+            newest = rows["times"].max()
+            self.last_times[key] = (
+                newest if last_time is None else max(newest, last_time)
+            )
+            logged += inserted if inserted >= 0 else len(rows)
+        return logged
+
+    def summary(self) -> pd.DataFrame:
+        """Agreement with the primary model and model time per row, per shadow"""
+        with self.lock:
+            rows = [
+                {
+                    "machine_id": machine_id,
+                    "shadow": name,
+                    "rows": stats.rows,
+                    "agreement_pct": (
+                        stats.agreed / stats.rows * 100 if stats.rows else 0.0
+                    ),
+                    "shadow_us_per_row": (
+                        stats.seconds / stats.rows * 1e6 if stats.rows else 0.0
+                    ),
+                    "primary_us_per_row": (
+                        stats.primary_seconds / stats.rows * 1e6 if stats.rows else 0.0
+                    ),
+                    "errors": stats.errors,
+                }
+                for (machine_id, name), stats in self.stats.items()
+            ]
+        return pd.DataFrame(rows)
+
+
+def load_shadow_comparison(engine, machine_id: str, start, end) -> pd.DataFrame:
+    """
+    Logged shadow results of one machine in [start, end), summarised per model
+
+    Agreement with the primary model, label counts and model time per row.
+    """
+    ensure_shadow_table(engine)
+    query = select(shadow_predictions_table).where(
+        shadow_predictions_table.c.machine_id == machine_id,
+        shadow_predictions_table.c.times >= start,
+        shadow_predictions_table.c.times < end,
+    )
+    with engine.connect() as conn:
+        log = pd.read_sql(query, conn, parse_dates=["times"])
+    if log.empty:
+        return pd.DataFrame()
+
+    log["agreed"] = log["prediction"] == log["primary_prediction"]
+    summary = log.groupby("model").agg(
+        rows=("times", "size"),
+        agreement_pct=("agreed", "mean"),
+        shadow_us_per_row=("latency_us", "mean"),
+        primary_us_per_row=("primary_latency_us", "mean"),
+    )
+    summary["agreement_pct"] *= 100
+    labels = (
+        log.pivot_table(
+            index="model", columns="prediction", values="times", aggfunc="size"
+        )
+        .fillna(0)
+        .astype(int)
+        .add_prefix("shadow_")
+    )
+    return summary.join(labels)
+
+
+# Global shadow scorer, started on the first batch of a machine with shadows
+_scorer: Optional[ShadowScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_shadow_scorer() -> Optional[ShadowScorer]:
+    """The process-wide scorer, None when no machine has shadow models"""
+    global _scorer
+
+    if not any(machine["shadows"] for machine in MACHINES.values()):
+        return None
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = ShadowScorer()
+        return _scorer
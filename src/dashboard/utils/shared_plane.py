@@ -0,0 +1,375 @@
+import logging
+import os
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.dashboard.config.settings import SHARED_PLANE_PREFIX, SHARED_PLANE_ROWS
+from src.dashboard.utils.compact import (
+    FLAG_COLUMNS,
+    FLOAT32_COLUMNS,
+    INT32_COLUMNS,
+    TIME_COLUMNS,
+    compact_frame,
+)
+
+logger = logging.getLogger(__name__)
+
+# Every compacted datalog column is stored as float64, so gaps survive as NaN and
+# readers get the usual dtypes back from ``compact_frame``
+PLANE_COLUMNS = [
+    "Shift",
+    "Status",
+    *FLOAT32_COLUMNS,
+    *INT32_COLUMNS,
+    *FLAG_COLUMNS,
+    *TIME_COLUMNS.values(),
+]
+ROW_DTYPE = np.dtype([("times", "i8")] + [(col, "f8") for col in PLANE_COLUMNS])
+
+PREDICTION_LABELS = ["Normal", "Warning", "Leak"]
+# times (ns), label index, probability, prob_normal, prob_warning, prob_leak
+PREDICTION_FIELDS = 6
+
+# Header slots, int64. GENERATION identifies the ingest process that created
+# the segment, RETIRED is set before the segment is unlinked.
+SEQ, COUNT, HEAD, COVERED_FROM, GENERATION, RETIRED = range(6)
+HEADER_SLOTS = 8
+
+# A sequence number still odd after this long belongs to a writer that died
+# mid-write, readers then fall back to the database
+READ_TIMEOUT_SECONDS = 0.1
+# How often readers check that their segment is still the one under its name
+GENERATION_CHECK_SECONDS = 1.0
+
+
+def segment_name(machine_id: str) -> str:
+    return f"{SHARED_PLANE_PREFIX}_{machine_id}"
+
+
+def segment_size(capacity: int) -> int:
+    return HEADER_SLOTS * 8 + capacity * ROW_DTYPE.itemsize + PREDICTION_FIELDS * 8
+
+
+class _Segment:
+    """Numpy views over one machine's shared memory block"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, capacity: int, writable: bool):
+        self.capacity = capacity
+        buf = shm.buf
+        rows_offset = HEADER_SLOTS * 8
+        pred_offset = rows_offset + capacity * ROW_DTYPE.itemsize
+        self.header = np.ndarray((HEADER_SLOTS,), "i8", buf, 0)
+        self.rows = np.ndarray((capacity,), ROW_DTYPE, buf, rows_offset)
+        self.prediction = np.ndarray((PREDICTION_FIELDS,), "f8", buf, pred_offset)
+        if not writable:
+            for view in (self.header, self.rows, self.prediction):
+                view.flags.writeable = False
+        # Odd sequence number a read already timed out on
+        self.stalled_seq: Optional[int] = None
+        self.checked = time.monotonic()
+        # Set last, so a retired segment releases its views before the mapping
+        # when it is garbage collected
+        self.shm = shm
+
+
+class SharedRecentBuffer:
+    """
+    RecentBuffer with its rows in ``multiprocessing.shared_memory``
+
+    The ingest process creates one segment per machine and is the only writer.
+    Dashboard workers attach read-only; a snapshot copies just the rows it asks
+    for out of zero-copy NumPy views. Writers bump a sequence number before and
+    after each write (seqlock), readers retry when it moved or is odd.
+
+    A restarted ingest process retires the old segments and creates new ones;
+    workers see the RETIRED flag and attach to the new ones. While a machine
+    has no live segment, reads come back empty and the caller queries.
+    """
+
+    def __init__(
+        self,
+        machine_ids: List[str],
+        capacity: int = SHARED_PLANE_ROWS,
+        create: bool = False,
+    ):
+        self.create = create
+        self.lock = threading.Lock()
+        self.segments: Dict[str, _Segment] = {}
+        generation = time.time_ns()
+        for machine_id in machine_ids:
+            if create:
+                shm = self._create(segment_name(machine_id), segment_size(capacity))
+                segment = _Segment(shm, capacity, writable=True)
+                segment.header[:] = 0
+                segment.header[COVERED_FROM] = np.iinfo("i8").max
+                segment.header[GENERATION] = generation
+                segment.prediction[:] = np.nan
+                self.segments[machine_id] = segment
+            else:
+                self.segments[machine_id] = self._attach(machine_id)
+
+    @staticmethod
+    def _open(name: str) -> shared_memory.SharedMemory:
+        """Open an existing block without handing it to the resource tracker"""
+        try:
+            return shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Python < 3.13 always registers the block, and the tracker would
+            # unlink it when this process exits
+            shm = shared_memory.SharedMemory(name=name)
+            if os.name == "posix":
+                resource_tracker.unregister(f"/{shm.name}", "shared_memory")
+            return shm
+
+    def _attach(self, machine_id: str) -> _Segment:
+        shm = self._open(segment_name(machine_id))
+        capacity = (shm.size - segment_size(0)) // ROW_DTYPE.itemsize
+        return _Segment(shm, capacity, writable=False)
+
+    @staticmethod
+    def _create(name: str, size: int) -> shared_memory.SharedMemory:
+        try:
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # Left behind by an ingest process that did not shut down cleanly.
+            # Workers may still be attached, retire it so they move on.
+            stale = shared_memory.SharedMemory(name=name)
+            if stale.size >= HEADER_SLOTS * 8:
+                np.ndarray((HEADER_SLOTS,), "i8", stale.buf, 0)[RETIRED] = 1
+            stale.close()
+            stale.unlink()
+            return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+    def _segment(self, machine_id: str) -> Optional[_Segment]:
+        """
+        The machine's live segment, attaching again after an ingest restart
+
+        A clean restart retires the old segment at once. After a crash the old
+        block is only unlinked, so the name is checked for a new generation
+        every ``GENERATION_CHECK_SECONDS``.
+        """
+        segment = self.segments.get(machine_id)
+        if self.create or self._current(segment):
+            return segment
+
+        with self.lock:
+            segment = self.segments.get(machine_id)
+            if self._current(segment):
+                return segment
+            try:
+                shm = self._open(segment_name(machine_id))
+            except FileNotFoundError:
+                # Ingest is down, the old mapping is left to the views using it
+                self.segments.pop(machine_id, None)
+                return None
+
+            header = np.ndarray((HEADER_SLOTS,), "i8", shm.buf, 0)
+            generation, retired = int(header[GENERATION]), bool(header[RETIRED])
+            del header
+            if segment is not None and generation == segment.header[GENERATION]:
+                shm.close()
+                segment.checked = time.monotonic()
+                return segment
+            if retired:
+                shm.close()
+                self.segments.pop(machine_id, None)
+                return None
+
+            capacity = (shm.size - segment_size(0)) // ROW_DTYPE.itemsize
+            attached = _Segment(shm, capacity, writable=False)
+            logger.info(
+                f"Attached to shared plane generation {generation} of {machine_id}"
+            )
+            self.segments[machine_id] = attached
+            return attached
+
+    @staticmethod
+    def _current(segment: Optional[_Segment]) -> bool:
+        return (
+            segment is not None
+            and not segment.header[RETIRED]
+            and time.monotonic() - segment.checked < GENERATION_CHECK_SECONDS
+        )
+
+    def _read(self, segment: _Segment, read, default=None):
+        """
+        Run ``read`` until it saw a consistent segment
+
+        Returns ``default`` when the sequence number stays odd, a writer died
+        in the middle of a write; later reads of that state return at once.
+        """
+        deadline = time.monotonic() + READ_TIMEOUT_SECONDS
+        while True:
+            seq = int(segment.header[SEQ])
+            if seq % 2 == 0:
+                result = read()
+                if int(segment.header[SEQ]) == seq:
+                    return result
+            elif seq == segment.stalled_seq or time.monotonic() > deadline:
+                if segment.stalled_seq != seq:
+                    logger.warning("Shared plane writer stalled mid-write")
+                    segment.stalled_seq = seq
+                return default
+            time.sleep(0)
+
+    def _ordered(self, segment: _Segment, limit: Optional[int] = None) -> np.ndarray:
+        # Oldest first copy of the newest ``limit`` rows
+        count, head = int(segment.header[COUNT]), int(segment.header[HEAD])
+        n = count if limit is None else min(limit, count)
+        index = (head - n + np.arange(n)) % segment.capacity
+        return segment.rows[index]
+
+    def append(self, machine_id: str, df: pd.DataFrame, covered_from=None) -> int:
+        """
+        Append rows (any order) newer than the buffered ones, writer only,
+        returns how many
+
+        ``covered_from`` marks the start of a complete seed load, history windows
+        are only served from the ring when it holds every row since then.
+        """
+        if df.empty:
+            return 0
+        segment = self.segments[machine_id]
+        df = compact_frame(df).sort_values("times")
+
+        records = np.zeros(len(df), ROW_DTYPE)
+        records["times"] = df["times"].to_numpy("datetime64[ns]").astype("i8")
+        for col in PLANE_COLUMNS:
+            if col in df.columns:
+                records[col] = df[col].astype("float64").to_numpy()
+            else:
+                records[col] = np.nan
+
+        with self.lock:
+            header = segment.header
+            if header[COUNT]:
+                last = segment.rows[(header[HEAD] - 1) % segment.capacity]["times"]
+                records = records[records["times"] > last]
+            records = records[-segment.capacity :]
+            if not len(records):
+                return 0
+
+            header[SEQ] += 1
+            index = (header[HEAD] + np.arange(len(records))) % segment.capacity
+            segment.rows[index] = records
+            header[HEAD] = (header[HEAD] + len(records)) % segment.capacity
+            header[COUNT] = min(header[COUNT] + len(records), segment.capacity)
+            # COVERED_FROM: every row since this time is in the ring
+            if covered_from is not None:
+                header[COVERED_FROM] = min(
+                    header[COVERED_FROM], pd.Timestamp(covered_from).value
+                )
+            if header[COUNT] == segment.capacity:
+                # Wrapped: the oldest rows were overwritten by contiguous ones
+                header[COVERED_FROM] = segment.rows[header[HEAD]]["times"]
+            header[SEQ] += 1
+        return len(records)
+
+    def _to_frame(self, records: np.ndarray) -> pd.DataFrame:
+        if not len(records):
+            return pd.DataFrame()
+        df = pd.DataFrame(records[::-1])
+        df["times"] = pd.to_datetime(df["times"])
+        return compact_frame(df)
+
+    def snapshot(self, machine_id: str, limit: Optional[int] = None) -> pd.DataFrame:
+        """Newest rows first, the same shape as ``load_latest_data``"""
+        segment = self._segment(machine_id)
+        if segment is None:
+            return pd.DataFrame()
+        return self._to_frame(
+            self._read(
+                segment, lambda: self._ordered(segment, limit), np.zeros(0, ROW_DTYPE)
+            )
+        )
+
+    def window(
+        self, machine_id: str, seconds: int, max_records: int = 1000
+    ) -> Optional[pd.DataFrame]:
+        """
+        Newest ``max_records`` rows of the last ``seconds``, oldest first, like
+        ``fetch_historical_data`` for unsampled ranges
+
+        None when the buffer does not reach that far back, so the caller queries.
+        """
+        segment = self._segment(machine_id)
+        if segment is None:
+            return None
+
+        # Same range as the SQL query, which is relative to NOW()
+        start = (pd.Timestamp.now() - pd.Timedelta(seconds=seconds)).value
+
+        def read():
+            if segment.header[COVERED_FROM] > start:
+                return None
+            records = self._ordered(segment)
+            return records[records["times"] >= start][-max_records:]
+
+        records = self._read(segment, read)
+        if records is None:
+            return None
+        return self._to_frame(records).iloc[::-1].reset_index(drop=True)
+
+    def latest_time(self, machine_id: str) -> Optional[pd.Timestamp]:
+        latest = self.snapshot(machine_id, limit=1)
+        return None if latest.empty else latest["times"].iloc[0]
+
+    def version(self, machine_id: str) -> int:
+        # Changes with every write and with every new generation of the segment
+        segment = self._segment(machine_id)
+        if segment is None:
+            return 0
+        return int(segment.header[GENERATION]) + int(segment.header[SEQ]) // 2
+
+    def set_prediction(self, machine_id: str, prediction: Dict):
+        """Publish the latest scored row, writer only"""
+        segment = self.segments[machine_id]
+        values = [
+            pd.Timestamp(prediction["times"]).value,
+            PREDICTION_LABELS.index(prediction["prediction"]),
+            prediction["probability"],
+            *[
+                prediction.get(f"prob_{label.lower()}", np.nan)
+                for label in PREDICTION_LABELS
+            ],
+        ]
+        with self.lock:
+            segment.header[SEQ] += 1
+            segment.prediction[:] = values
+            segment.header[SEQ] += 1
+
+    def latest_prediction(self, machine_id: str) -> Optional[Dict]:
+        segment = self._segment(machine_id)
+        if segment is None:
+            return None
+        values = self._read(segment, lambda: segment.prediction.copy())
+        if values is None or np.isnan(values[0]):
+            return None
+        prediction = {
+            "times": pd.Timestamp(int(values[0])),
+            "prediction": PREDICTION_LABELS[int(values[1])],
+            "probability": float(values[2]),
+        }
+        for label, value in zip(PREDICTION_LABELS, values[3:]):
+            prediction[f"prob_{label.lower()}"] = float(value)
+        return prediction
+
+    def memory_bytes(self) -> int:
+        return sum(segment.shm.size for segment in self.segments.values())
+
+    def close(self):
+        """Detach, and with the creating process also free the segments"""
+        for segment in self.segments.values():
+            # Views must go before the mapping can be closed
+            if self.create:
+                segment.header[RETIRED] = 1
+            segment.header = segment.rows = segment.prediction = None
+            segment.shm.close()
+            if self.create:
+                segment.shm.unlink()
+        self.segments = {}
@@ -0,0 +1,40 @@
+from datetime import date, datetime
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+from src.dashboard.config.settings import REPLAY_CSV
+from src.dashboard.jobs.backfill import load_checkpoint, run_backfill
+from src.dashboard.utils.prediction_store import load_explanations, load_predictions
+from src.dashboard.utils.replay import load_replay_rows
+
+# The model scores every row of this day of the replay CSV as Normal
+ALL_NORMAL_DAY = date(2025, 5, 5)
+
+
+def test_backfill_all_normal_day(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'datalog.db'}"
+    engine = create_engine(uri)
+    rows = load_replay_rows(REPLAY_CSV).drop(columns="Condition")
+    rows[rows["times"].dt.date == ALL_NORMAL_DAY].to_sql(
+        "datalog_ilapak3", engine, index=False
+    )
+    checkpoint = str(tmp_path / "checkpoint.json")
+
+    written = run_backfill(
+        uri,
+        ["ilapak3"],
+        ALL_NORMAL_DAY,
+        date(2025, 5, 6),
+        workers=1,
+        checkpoint=checkpoint,
+    )
+
+    start = datetime(2025, 5, 5)
+    end = datetime(2025, 5, 6)
+    predictions = load_predictions(engine, "ilapak3", "v1.0.0", start, end)
+    assert written == len(predictions) > 0
+    assert (predictions["prediction"] == "Normal").all()
+    assert load_explanations(engine, "ilapak3", "v1.0.0", start, end).empty
+    assert load_checkpoint(checkpoint) == {"ilapak3|2025-05-05"}
+    assert pd.Timestamp(predictions["times"].min()).date() == ALL_NORMAL_DAY